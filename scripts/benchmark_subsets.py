@@ -0,0 +1,156 @@
+"""Benchmarks the subset generators used to rebuild smallest_door_records.
+
+Compares the original bit-mask power_set_max against bounded_subsets on a synthetic door corpus, timing the same
+explode-and-rank query that rebuild_smallest_door_records runs. Everything happens in a transaction that is rolled
+back, so the script is safe to run against any database that has the bounded_subsets migration applied.
+
+Usage:
+    python scripts/benchmark_subsets.py --builds 2000 --max-restrictions 12
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import Connection, create_engine, make_url, text
+
+LEGACY_POWER_SET_MAX = """
+CREATE FUNCTION pg_temp.legacy_power_set_max(txt text[], max_k int DEFAULT 8)
+RETURNS SETOF text[] LANGUAGE plpgsql IMMUTABLE AS
+$$
+DECLARE
+    n     int := array_length(txt, 1);
+    mask  int;
+BEGIN
+    IF n IS NULL OR n = 0 THEN
+        RETURN NEXT ARRAY[]::text[];
+        RETURN;
+    END IF;
+
+    FOR mask IN 0 .. (1 << n) - 1 LOOP
+        IF (
+             SELECT COUNT(*)
+             FROM   generate_series(0, n - 1) g
+             WHERE  ((mask >> g) & 1) = 1
+           ) > max_k THEN
+            CONTINUE;
+        END IF;
+
+        RETURN NEXT coalesce(
+            (SELECT array_agg(txt[i] ORDER BY i)
+             FROM generate_subscripts(txt, 1) AS i
+             WHERE (mask >> (i - 1)) & 1 = 1),
+            ARRAY[]::text[]
+        );
+    END LOOP;
+END;
+$$;
+"""
+
+SYNTHETIC_CORPUS = """
+CREATE TEMPORARY TABLE synthetic_doors ON COMMIT DROP AS
+SELECT g                                             AS build_id,
+       (ARRAY['Door', 'Trapdoor', 'Skydoor'])[1 + g % 3] AS orientation,
+       2 + g % 4                                     AS door_width,
+       2 + (g / 4) % 4                               AS door_height,
+       1                                             AS door_depth,
+       ARRAY['Regular']::text[]                      AS types,
+       ARRAY(
+           SELECT 'restriction ' || r
+           FROM   generate_series(1, 1 + (g * 7919) % :max_restrictions) AS r
+           ORDER  BY 1
+       )                                             AS restrictions,
+       10 + (g * 104729) % 1000                      AS volume
+FROM   generate_series(1, :builds) AS g;
+"""
+
+REBUILD_QUERY = """
+WITH exploded AS (
+    SELECT d.*, ps AS restriction_subset
+    FROM   synthetic_doors d
+    CROSS  JOIN LATERAL {function}(d.restrictions, :max_k) ps
+), ranked AS (
+    SELECT *,
+           ROW_NUMBER() OVER (
+               PARTITION BY types, orientation, door_width, door_height, door_depth, restriction_subset
+               ORDER BY volume, build_id
+           ) AS rn
+    FROM   exploded
+)
+SELECT count(*) FROM ranked WHERE rn = 1;
+"""
+
+FUNCTIONS = {
+    "legacy power_set_max": "pg_temp.legacy_power_set_max",
+    "bounded_subsets": "public.bounded_subsets",
+}
+
+
+def time_rebuild(conn: Connection, function: str, *, max_k: int, repeat: int) -> tuple[list[float], int]:
+    """Runs the rebuild query `repeat` times, returning the durations and the number of records produced."""
+    durations: list[float] = []
+    records = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = conn.execute(text(REBUILD_QUERY.format(function=function)), {"max_k": max_k}).scalar_one()
+        durations.append(time.perf_counter() - start)
+    return durations, records
+
+
+def check_equivalent(conn: Connection, *, max_k: int) -> None:
+    """Raises if the two generators do not produce the same subsets for the corpus."""
+    stmt = text(
+        """
+        SELECT count(*) FROM (
+            (SELECT d.build_id, ps FROM synthetic_doors d, pg_temp.legacy_power_set_max(d.restrictions, :max_k) ps
+             EXCEPT ALL
+             SELECT d.build_id, ps FROM synthetic_doors d, public.bounded_subsets(d.restrictions, :max_k) ps)
+            UNION ALL
+            (SELECT d.build_id, ps FROM synthetic_doors d, public.bounded_subsets(d.restrictions, :max_k) ps
+             EXCEPT ALL
+             SELECT d.build_id, ps FROM synthetic_doors d, pg_temp.legacy_power_set_max(d.restrictions, :max_k) ps)
+        ) AS differences
+        """
+    )
+    differences = conn.execute(stmt, {"max_k": max_k}).scalar_one()
+    if differences:
+        msg = f"The subset generators disagree on {differences} subsets."
+        raise RuntimeError(msg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, default=1000, help="Number of synthetic doors.")
+    parser.add_argument("--max-restrictions", type=int, default=12, help="Maximum restrictions per door.")
+    parser.add_argument("--max-k", type=int, default=8, help="Maximum subset size, as used by the records.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per generator.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.environ.get("DATABASE_URL")
+    driver_sync = os.environ.get("DB_DRIVER_SYNC")
+    if not database_url or not driver_sync:
+        msg = "Specify DATABASE_URL and DB_DRIVER_SYNC either with a .env file or environment variables."
+        raise RuntimeError(msg)
+    base = make_url(database_url)
+    engine = create_engine(base.set(drivername=f"{base.drivername}+{driver_sync}"))
+
+    with engine.connect() as conn:
+        conn.execute(text(LEGACY_POWER_SET_MAX))
+        conn.execute(text(SYNTHETIC_CORPUS), {"builds": args.builds, "max_restrictions": args.max_restrictions})
+        check_equivalent(conn, max_k=args.max_k)
+
+        print(f"{args.builds} doors, up to {args.max_restrictions} restrictions each, subsets of size <= {args.max_k}")
+        for name, function in FUNCTIONS.items():
+            durations, records = time_rebuild(conn, function, max_k=args.max_k, repeat=args.repeat)
+            print(
+                f"{name:>22}: median {statistics.median(durations):.3f}s, "
+                f"min {min(durations):.3f}s over {args.repeat} runs ({records} records)"
+            )
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,9 +18,12 @@
 
 # Note that every import to a package that imports back RedstoneSquid (even if it is just in TYPE_CHECKING)
 # will create an import cycle from the view of a static type checker, which slows down type checking significantly.
-from squid.bot._types import MessageableChannel
+from squid.bot.message_resolver import MessageResolver
 from squid.bot.submission.build_handler import BuildHandler
 from squid.bot.utils import RunningMessage
+from squid.bot.voting.journal import VoteJournal
+from squid.bot.voting.registry import VoteSessionRegistry
+from squid.bot.voting.vote_session import upsert_votes
 from squid.db import DatabaseManager
 from squid.db.builds import Build, clean_locks
 from squid.db.schema import Base
@@ -98,6 +101,13 @@ def __init__(
         self.owner_server_id = config.get("owner_server_id")
         self.source_code_url = config.get("source_code_url")
         self.print_tracebacks = config.get("print_tracebacks", False)
+        self.message_resolver = MessageResolver(self)
+        """Finds messages by id, avoiding API calls."""
+        self.vote_sessions = VoteSessionRegistry()
+        """The open vote sessions, loaded by the voting cog."""
+        self.vote_sessions.register_caches(self.db.invalidation)
+        self.vote_journal = VoteJournal(upsert_votes)
+        """Votes waiting to be written to the database."""
 
     @override
     async def setup_hook(self) -> None:
@@ -121,6 +131,34 @@ async def setup_hook(self) -> None:
         await asyncio.gather(*(self.load_extension(ext) for ext in extensions))
         self.call_supabase_to_prevent_deactivation.start()
 
+        self.db.embeddings.start()
+        self.db.listener.start()
+        stale = await self.db.embeddings.enqueue_stale()
+        if stale:
+            logger.info("Queued %s builds with stale embeddings for re-embedding.", stale)
+
+    @override
+    async def close(self) -> None:
+        # A failing step must not keep the others, and the discord session, from being closed
+        async def save_query_embeddings() -> None:
+            self.db.query_embeddings.save()
+
+        steps: list[Callable[[], Awaitable[None]]] = [
+            self.vote_journal.close,
+            self.db.embeddings.stop,
+            self.db.listener.stop,
+            self.db.vectors.close,
+            save_query_embeddings,
+        ]
+        try:
+            for step in steps:
+                try:
+                    await step()
+                except Exception:
+                    logger.exception("Failed to shut down %s.", step.__qualname__)
+        finally:
+            await super().close()
+
     @tasks.loop(hours=24)
     async def call_supabase_to_prevent_deactivation(self):
         """Supabase deactivates a database in the free tier if it's not used for 7 days."""
@@ -133,28 +171,22 @@ async def clean_dangling_build_locks(self):
 
     async def get_or_fetch_message(self, channel_id: int, message_id: int) -> discord.Message | None:
         """
-        Fetches a message from the cache or the API.
+        Fetches a message from the cache or the API, see `MessageResolver.fetch`.
 
         Raises:
-            ValueError: The channel is not a MessageableChannel and thus no message can exist in it.
+            TypeError: The channel is not a MessageableChannel and thus no message can exist in it.
             discord.HTTPException: Fetching the channel or message failed.
-            discord.Forbidden: The bot does not have permission to fetch the channel or message.
-            discord.NotFound: The channel or message was not found.
+            discord.NotFound: The channel was not found.
         """
-        channel = self.get_channel(channel_id)
-        if channel is None:
-            channel = await self.fetch_channel(channel_id)
-        if not isinstance(channel, MessageableChannel):
-            msg = "Channel is not a messageable channel."
-            raise TypeError(msg)
-        try:
-            return await channel.fetch_message(message_id)
-        except discord.NotFound:
-            logger.debug("Message %s not found in channel %s.", message_id, channel_id)
-            await DatabaseManager().message.untrack_message(message_id)
-        except discord.Forbidden:
-            pass
-        return None
+        return await self.message_resolver.fetch(channel_id, message_id)
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        """Drop edited messages from the message cache, so they are fetched again when needed."""
+        self.message_resolver.forget(payload.message_id)
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        """Remember deleted messages, so they are never fetched."""
+        self.message_resolver.forget(payload.message_id, deleted=True)
 
     def get_running_message(
         self,
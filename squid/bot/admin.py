@@ -7,7 +7,6 @@
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context, Greedy
-from rapidfuzz import process
 
 from squid.bot import utils
 from squid.bot.utils import check_is_owner_server, check_is_staff
@@ -79,8 +78,12 @@ async def add_restriction_alias(self, ctx: Context[BotT], restriction: str, alia
         async with self.bot.get_running_message(ctx) as sent_message:
             try:
                 await self.bot.db.build_tags.add_restriction_alias(restriction, alias)
-            except RestrictionNotFound:
-                await sent_message.edit(embed=utils.error_embed("Error", f"No restriction named '{restriction}'."))
+            except RestrictionNotFound as e:
+                description = f"No restriction named '{restriction}'."
+                if e.suggestions:
+                    suggestions = ", ".join(f"'{name}'" for name in e.suggestions)
+                    description += f" Did you mean {suggestions}?"
+                await sent_message.edit(embed=utils.error_embed("Error", description))
             except AliasAlreadyAdded:
                 await sent_message.edit(embed=utils.info_embed("Already added", "Alias already on this restriction."))
             except AliasTakenByOther as e:
@@ -101,15 +104,8 @@ async def restriction_autocomplete(
         if not current:
             return []
 
-        restrictions = await self.bot.db.build_tags.fetch_all_restrictions()
-        restriction_names = [r.name for r in restrictions]
-        matches = process.extract(
-            current,
-            restriction_names,
-            limit=25,
-            score_cutoff=30,
-        )
-        return [app_commands.Choice(name=match[0], value=match[0]) for match in matches]
+        matches = await self.bot.db.build_tags.resolve_restriction(current, limit=25, score_cutoff=30)
+        return [app_commands.Choice(name=match.restriction.name, value=match.restriction.name) for match in matches]
 
     @commands.hybrid_command(name="archive")
     @check_is_staff()
@@ -0,0 +1,148 @@
+"""Resolves discord message ids into messages, avoiding API calls wherever possible."""
+
+import asyncio
+import contextlib
+import logging
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import discord
+
+from squid.bot._types import MessageableChannel
+
+if TYPE_CHECKING:
+    import squid.bot
+
+logger = logging.getLogger(__name__)
+
+
+class MessageResolver:
+    """Finds messages by id, in order of cost:
+
+    1. discord.py's message cache, which holds recent messages including the ones the bot just sent.
+    2. Our own LRU cache of messages that were fetched before.
+    3. The API, with at most `max_concurrency_per_channel` fetches running per channel. Concurrent requests for the
+       same message share one fetch.
+
+    Messages that were not found are remembered, so deleted messages are never fetched twice. If a message is only
+    needed to be edited, deleted or reacted to, use `partial` instead, which never calls the API.
+    """
+
+    def __init__(
+        self, bot: "squid.bot.RedstoneSquid", *, max_size: int = 1024, max_concurrency_per_channel: int = 4
+    ) -> None:
+        """Initializes the resolver.
+
+        Args:
+            bot: The bot to fetch messages with.
+            max_size: The maximum number of messages kept in the LRU cache, and of deleted message ids remembered.
+            max_concurrency_per_channel: The maximum number of messages fetched at once from a single channel.
+        """
+        self.bot = bot
+        self.max_size = max_size
+        self.max_concurrency_per_channel = max_concurrency_per_channel
+        self._messages: OrderedDict[int, discord.Message] = OrderedDict()
+        self._missing: OrderedDict[int, None] = OrderedDict()
+        self._channels: dict[int, MessageableChannel] = {}
+        self._channel_limits: defaultdict[int, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_concurrency_per_channel)
+        )
+        self._in_flight: dict[int, asyncio.Task[discord.Message | None]] = {}
+
+    def partial(self, channel_id: int, message_id: int) -> discord.PartialMessage:
+        """A message that can be edited, deleted or reacted to, without fetching it."""
+        return self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+
+    def get(self, message_id: int) -> discord.Message | None:
+        """Gets a message from the caches, without calling the API."""
+        # discord.py has no public way to look up its message cache by id
+        if (message := self.bot._connection._get_message(message_id)) is not None:  # pyright: ignore[reportPrivateUsage]
+            return message
+        if (message := self._messages.get(message_id)) is not None:
+            self._messages.move_to_end(message_id)
+        return message
+
+    def remember(self, message: discord.Message) -> None:
+        """Adds a message to the cache."""
+        self._messages[message.id] = message
+        self._messages.move_to_end(message.id)
+        if len(self._messages) > self.max_size:
+            self._messages.popitem(last=False)
+
+    def forget(self, message_id: int, *, deleted: bool = False) -> None:
+        """Removes a message from the cache, e.g. because it was edited.
+
+        Args:
+            message_id: The id of the message.
+            deleted: Whether the message was deleted, so that it is never fetched again.
+        """
+        self._messages.pop(message_id, None)
+        if deleted:
+            self._missing[message_id] = None
+            if len(self._missing) > self.max_size:
+                self._missing.popitem(last=False)
+
+    async def mark_deleted(self, message_id: int) -> None:
+        """Remembers that a message no longer exists, and stops tracking it in the database."""
+        self.forget(message_id, deleted=True)
+        # Messages of other users, like the original message of a build, are not tracked
+        with contextlib.suppress(ValueError):
+            await self.bot.db.message.untrack_message(message_id)
+
+    async def fetch(self, channel_id: int, message_id: int) -> discord.Message | None:
+        """Gets a message from the caches, or fetches it from the API.
+
+        Returns:
+            The message, or None if it does not exist or the bot is not allowed to read it.
+
+        Raises:
+            TypeError: The channel is not a MessageableChannel and thus no message can exist in it.
+            discord.HTTPException: Fetching the channel or message failed.
+            discord.NotFound: The channel was not found.
+        """
+        if message_id in self._missing:
+            return None
+        if (message := self.get(message_id)) is not None:
+            return message
+        if (task := self._in_flight.get(message_id)) is None:
+            task = asyncio.create_task(self._fetch(channel_id, message_id))
+            self._in_flight[message_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(message_id, None))
+        return await asyncio.shield(task)
+
+    async def fetch_many(self, messages: Iterable[tuple[int, int]]) -> dict[int, discord.Message]:
+        """Gets many messages at once, see `fetch`.
+
+        Args:
+            messages: (channel_id, message_id) of each message.
+
+        Returns:
+            The messages that were found, by id.
+        """
+        found = await asyncio.gather(*(self.fetch(channel_id, message_id) for channel_id, message_id in messages))
+        return {message.id: message for message in found if message is not None}
+
+    async def _get_channel(self, channel_id: int) -> MessageableChannel:
+        channel = self.bot.get_channel(channel_id) or self._channels.get(channel_id)
+        if channel is None:
+            channel = await self.bot.fetch_channel(channel_id)
+        if not isinstance(channel, MessageableChannel):
+            msg = "Channel is not a messageable channel."
+            raise TypeError(msg)
+        self._channels[channel_id] = channel
+        return channel
+
+    async def _fetch(self, channel_id: int, message_id: int) -> discord.Message | None:
+        channel = await self._get_channel(channel_id)
+        async with self._channel_limits[channel_id]:
+            try:
+                message = await channel.fetch_message(message_id)
+            except discord.NotFound:
+                logger.debug("Message %s not found in channel %s.", message_id, channel_id)
+                await self.mark_deleted(message_id)
+                return None
+            except discord.Forbidden:
+                return None
+        self.remember(message)
+        return message
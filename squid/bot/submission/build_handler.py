@@ -106,20 +106,24 @@ async def get_original_message(self) -> discord.Message | None:
             return await self.bot.get_or_fetch_message(self.build.original_channel_id, self.build.original_message_id)
         return None
 
+    async def _get_display_message_rows(self) -> Sequence[Message]:
+        """Get the database records of all messages from the bot that are related to this build."""
+        assert self.bot.user is not None, "Bot should be logged in"
+        stmt = select(Message).where(
+            Message.build_id == self.build.id, Message.author_id == self.bot.user.id, Message.channel_id.is_not(None)
+        )
+        async with self.bot.db.async_session() as session:
+            result = await session.execute(stmt)
+            return result.scalars().all()
+
     async def get_display_messages(self) -> list[discord.Message]:
         """Get all messages from the bot that are related to this build.
 
         This does not include messages from other users, only the bot's messages.
         """
-        assert self.bot.user is not None, "Bot should be logged in"
-        stmt = select(Message).where(Message.build_id == self.build.id, Message.author_id == self.bot.user.id)
-        async with self.bot.db.async_session() as session:
-            result = await session.execute(stmt)
-            messages: Sequence[Message] = result.scalars().all()
-        maybe_messages = await asyncio.gather(
-            *(self.bot.get_or_fetch_message(row.channel_id, row.id) for row in messages if row.channel_id is not None)
-        )
-        return [msg for msg in maybe_messages if msg is not None]
+        rows = await self._get_display_message_rows()
+        messages = await self.bot.message_resolver.fetch_many((row.channel_id, row.id) for row in rows)  # pyright: ignore[reportArgumentType]
+        return list(messages.values())
 
     async def update_messages(self) -> None:
         """Updates all messages which for this build."""
@@ -129,15 +133,21 @@ async def update_messages(self) -> None:
 
         # Get all messages for a build
         async with asyncio.TaskGroup() as tg:
-            msg_task = tg.create_task(self.get_display_messages())
+            rows_task = tg.create_task(self._get_display_message_rows())
             em_task = tg.create_task(self.generate_embed())
 
-        messages = await msg_task
+        # The messages are only edited, so they do not need to be fetched
+        resolver = self.bot.message_resolver
+        messages = [resolver.partial(row.channel_id, row.id) for row in await rows_task]  # pyright: ignore[reportArgumentType]
         em = await em_task
 
-        async def _update_single_message(message: discord.Message):
-            await message.edit(content=self.build.original_link, embed=em)
-            await self.bot.db.message.update_message_edited_time(message)
+        async def _update_single_message(message: discord.PartialMessage):
+            try:
+                await message.edit(content=self.build.original_link, embed=em)
+            except discord.NotFound:
+                await resolver.mark_deleted(message.id)
+                return
+            await self.bot.db.message.update_message_edited_time(message.id)
 
         await asyncio.gather(*(_update_single_message(message) for message in messages))
 
@@ -147,6 +157,8 @@ async def _insert_video_preview(self, preview_url: str) -> None:
             stmt = insert(BuildLink).values(build_id=self.build.id, url=preview_url, media_type="image")
             await session.execute(stmt)
             await session.commit()
+        assert self.build.id is not None
+        self.bot.db.build.cache.invalidate(self.build.id)
 
     async def generate_embed(self) -> discord.Embed:
         """Generates an embed for the build."""
@@ -197,7 +209,7 @@ async def get_description(self) -> str | None:  # type: ignore
         if build.component_restrictions and build.component_restrictions[0] != "None":
             desc.append(", ".join(build.component_restrictions))
 
-        if await DatabaseManager().get_or_fetch_newest_version(edition="Java") not in build.versions:
+        if not build.works_in(await DatabaseManager().get_or_fetch_newest_version(edition="Java")):
             desc.append("**Broken** in current (Java) version.")
 
         if "Locational" in build.miscellaneous_restrictions:
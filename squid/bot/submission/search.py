@@ -2,25 +2,22 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
-import os
 from typing import TYPE_CHECKING
 
-import vecs
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Cog, Context, hybrid_group, when_mentioned
 from discord.utils import escape_markdown
-from openai import AsyncOpenAI
 from sqlalchemy import select
 
 from squid.bot import utils
 from squid.bot.submission.ui.components import DynamicBuildEditButton
 from squid.bot.submission.ui.views import BuildInfoView
 from squid.bot.utils import RunningMessage
+from squid.db.build_query import BuildQuery
 from squid.db.builds import Build
-from squid.db.schema import Restriction, RestrictionAlias, Status, Type
+from squid.db.schema import RecordCategoryLiteral, Status, Type
 
 if TYPE_CHECKING:
     import squid.bot
@@ -34,28 +31,38 @@ def __init__(self, bot: BotT):
         self.bot = bot
 
     @commands.hybrid_command("search_using_sucky_embeddings")
-    @app_commands.describe(query="Whatever you want to search for.")
-    async def search_builds(self, ctx: Context[BotT], query: str):
+    @app_commands.describe(query="Whatever you want to search for.", page="The page of results to show.")
+    async def search_builds(self, ctx: Context[BotT], query: str, page: commands.Range[int, 1] = 1):
         """Searches for a build with natural language."""
         await ctx.defer()
-        client = AsyncOpenAI()
-        response = await client.embeddings.create(input=query, model="text-embedding-3-small")
-        query_vec = response.data[0].embedding
-        vx = vecs.create_client(os.environ["DB_CONNECTION"])
-        build_vecs = vx.get_or_create_collection(name="builds", dimension=1536)
-        result: list[str] = build_vecs.query(query_vec, limit=1)  # type: ignore
-        assert len(result) == 1
-        build_id = int(result[0])
-        build = await Build.from_id(build_id)
-        assert build is not None
-        await ctx.send(content=build.original_link, embed=await self.bot.for_build(build).generate_embed())
+        results = await self.bot.db.build_search.search(query, page=page)
+        if not results.hits:
+            return await ctx.send(embed=utils.error_embed("No results found", "No builds match that query."))
+
+        builds = await self.bot.db.build.get_builds_by_id([hit.build_id for hit in results.hits])
+        top_hit, top_build = results.hits[0], builds[0]
+        if top_build is None:
+            return await ctx.send(embed=utils.error_embed("No results found", "No builds match that query."))
+
+        content = f"Top match (score: {top_hit.score:.2f})"
+        if top_build.original_link:
+            content += f"\n{top_build.original_link}"
+        others = [
+            f"{build.title} (ID: {build.id}) (score: {hit.score:.2f})"
+            for hit, build in zip(results.hits[1:], builds[1:], strict=True)
+            if build is not None
+        ]
+        if others:
+            content += "\n\nOther results:\n" + "\n".join(others)
+        content += f"\n\nPage {results.page}/{results.page_count}"
+        return await ctx.send(content=content, embed=await self.bot.for_build(top_build).generate_embed())
 
     @commands.hybrid_command("search")
-    @app_commands.describe(query="The record's title.")
-    async def search_records(self, ctx: Context[BotT], query: str):
+    @app_commands.describe(query="The record's title.", record_category="The kind of record to search for.")
+    async def search_records(self, ctx: Context[BotT], query: str, record_category: RecordCategoryLiteral = "Smallest"):
         """Searches for a **record** by title."""
         async with RunningMessage(ctx) as sent_message:
-            matches = await self.bot.db.build.search_smallest_door_records(query, limit=11)
+            matches = await self.bot.db.build.search_door_records(record_category, query, limit=11)
             if not matches:
                 return await sent_message.edit(
                     embed=utils.error_embed("No results found", "No records match that query.")
@@ -92,26 +99,19 @@ async def search_records(self, ctx: Context[BotT], query: str):
 
     @commands.command("search_restrictions")
     async def search_restrictions(self, ctx: Context[BotT], query: str | None):
-        """This runs a substring search on the restriction names."""
-        async with RunningMessage(ctx) as sent_message, self.bot.db.async_session() as session:
-            stmt = select(Restriction)
-            alias_stmt = select(RestrictionAlias)
-
+        """This runs a typo-tolerant search on the restriction names and aliases."""
+        async with RunningMessage(ctx) as sent_message:
+            build_tags = self.bot.db.build_tags
             if query:
-                stmt = stmt.where(Restriction.name.ilike(f"%{query}%"))
-                alias_stmt = alias_stmt.where(RestrictionAlias.alias.ilike(f"%{query}%"))
-
-            restrictions_task = session.execute(stmt)
-            aliases_task = session.execute(alias_stmt)
-
-            restrictions, aliases = await asyncio.gather(restrictions_task, aliases_task)
-            restrictions = restrictions.scalars().all()
-            aliases = aliases.scalars().all()
-
-            description = "\n".join([f"{r.id}: {r.name}" for r in restrictions])
-            description += "\n"
-            description += "\n".join([f"{a.restriction_id}: {a.alias} (alias)" for a in aliases])
-            await sent_message.edit(embed=utils.info_embed("Restrictions", description))
+                matches = await build_tags.resolve_restriction(query, limit=25, score_cutoff=50)
+                description = "\n".join(
+                    f"{m.restriction.id}: {m.matched}{' (alias)' if m.is_alias else ''} ({m.score:.0f}%)"
+                    for m in matches
+                )
+            else:
+                restrictions = await build_tags.fetch_all_restrictions()
+                description = "\n".join(f"{r.id}: {r.name}" for r in restrictions)
+            await sent_message.edit(embed=utils.info_embed("Restrictions", description or "No restrictions found."))
 
     @commands.hybrid_command()
     async def list_patterns(self, ctx: Context[BotT]):
@@ -133,9 +133,7 @@ async def build_hybrid_group(self, ctx: Context[BotT]):
     async def get_pending_submissions(self, ctx: Context[BotT]):
         """Shows an overview of all submitted builds pending review."""
         async with self.bot.get_running_message(ctx) as sent_message:
-            pending_submissions = await self.bot.db.build.get_builds_by_filter(
-                filter={"submission_status": Status.PENDING}
-            )
+            pending_submissions = await self.bot.db.build.get_builds(BuildQuery().where_status(Status.PENDING))
 
             if len(pending_submissions) == 0:
                 desc = "No open submissions."
@@ -5,7 +5,7 @@
 
 import discord
 from discord import Message, app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord.ext.commands import (
     Cog,
     Context,
@@ -33,7 +33,6 @@ class BuildSubmitCog[BotT: "squid.bot.RedstoneSquid"](Cog, name="Build"):
 
     def __init__(self, bot: BotT):
         self.bot = bot
-        self.update_record_titles.start()
 
     @commands.hybrid_group(name="submit")
     async def submit_group(self, ctx: Context[BotT]):
@@ -248,10 +247,6 @@ async def recalc(self, ctx: Context[BotT], message: discord.Message):
         await self.infer_build_from_message(message)
         await ctx.send("Build recalculated.", ephemeral=True)
 
-    @tasks.loop(minutes=5.0)
-    async def update_record_titles(self):
-        await self.bot.db.build.update_smallest_door_records_without_title()
-
 
 async def setup(bot: "squid.bot.RedstoneSquid"):
     """Called by discord.py when the cog is added to the bot via bot.load_extension."""
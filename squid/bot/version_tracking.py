@@ -10,6 +10,7 @@
 
 from squid.bot.utils import check_is_owner_server, check_is_staff
 from squid.db import DatabaseManager
+from squid.db.invalidation import Invalidation
 from squid.db.schema import Version
 from squid.utils import parse_version_string
 
@@ -40,7 +41,9 @@ async def add_version(self, ctx: commands.Context, edition: Literal["Java", "Bed
             result = await session.execute(stmt)
             await session.commit()
             version = result.scalar_one()
-            await ctx.send(f"Version added successfully: {version}")
+        # Don't wait for the invalidation bus, the version should be usable right away
+        await db.invalidation.publish(Invalidation("versions", frozenset({edition})))
+        await ctx.send(f"Version added successfully: {version}")
 
     @Cog.listener(name="on_message")
     async def on_message_version_add(self, message: discord.Message):
@@ -67,7 +70,8 @@ async def on_message_version_add(self, message: discord.Message):
             result = await session.execute(stmt)
             await session.commit()
             version = result.scalar_one()
-            await self.bot.get_channel(channel_id).send(f"Version added successfully: {version}")  # type: ignore
+        await db.invalidation.publish(Invalidation("versions", frozenset({edition})))
+        await self.bot.get_channel(channel_id).send(f"Version added successfully: {version}")  # type: ignore
 
 
 async def setup(bot: "squid.bot.RedstoneSquid"):
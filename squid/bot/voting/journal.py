@@ -0,0 +1,92 @@
+"""Buffers vote changes in memory and writes them to the database in batches."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+type VoteChange = tuple[int, int, float | None]
+"""(vote_session_id, user_id, weight), where a weight of None removes the vote."""
+
+
+class VoteJournal:
+    """A write-behind buffer for votes.
+
+    Votes are recorded synchronously and written together, `flush_interval` seconds after the first unwritten vote, in
+    one multi-row upsert. Only the latest vote of each user in each session is kept, and flushes never overlap, so a
+    user toggling their vote quickly always ends up with their last vote stored.
+
+    Anything that depends on the stored votes, like closing a vote session, must `flush` first.
+    """
+
+    def __init__(
+        self, write: Callable[[Sequence[VoteChange]], Awaitable[None]], *, flush_interval: float = 2.0
+    ) -> None:
+        """Initializes the journal.
+
+        Args:
+            write: Upserts a batch of votes, each (session, user) pair at most once.
+            flush_interval: How long to wait for more votes before writing them, in seconds.
+        """
+        self.write = write
+        self.flush_interval = flush_interval
+        self._pending: dict[tuple[int, int], float | None] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        """The number of votes that have not been written yet."""
+        return len(self._pending)
+
+    def pending_votes(self, vote_session_id: int) -> dict[int, float | None]:
+        """The votes of a vote session that have not been written yet, by user id."""
+        return {
+            user_id: weight for (session_id, user_id), weight in self._pending.items() if session_id == vote_session_id
+        }
+
+    def record(self, vote_session_id: int, user_id: int, weight: float | None) -> None:
+        """Records a vote, replacing the user's unwritten vote in the same session."""
+        self._pending[vote_session_id, user_id] = weight
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self, vote_session_id: int | None = None) -> None:
+        """Writes the unwritten votes now.
+
+        Args:
+            vote_session_id: Only write the votes of this vote session. If None, write every vote.
+
+        Raises:
+            Exception: Whatever `write` raised. The votes that failed to be written are kept for the next flush.
+        """
+        async with self._flush_lock:
+            if vote_session_id is None:
+                batch, self._pending = self._pending, {}
+            else:
+                keys = [key for key in self._pending if key[0] == vote_session_id]
+                batch = {key: self._pending.pop(key) for key in keys}
+            if not batch:
+                return
+            try:
+                await self.write([(session_id, user_id, weight) for (session_id, user_id), weight in batch.items()])
+            except BaseException:  # Also when cancelled by close(), which flushes again
+                # Put the votes back, unless the user voted again in the meantime
+                for key, weight in batch.items():
+                    self._pending.setdefault(key, weight)
+                raise
+
+    async def close(self) -> None:
+        """Stops the background flushing and writes every remaining vote."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write %s votes, retrying later.", len(self._pending))
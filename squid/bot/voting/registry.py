@@ -0,0 +1,111 @@
+"""Keeps every open vote session in memory, so that reactions can be routed without touching the database."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TYPE_CHECKING
+
+from squid.bot.voting.vote_session import AbstractVoteSession, BuildVoteSession, DeleteLogVoteSession
+from squid.db.invalidation import Invalidation, InvalidationBus
+
+if TYPE_CHECKING:
+    import squid.bot
+
+logger = logging.getLogger(__name__)
+
+
+class VoteSessionRegistry:
+    """The open vote sessions, indexed by the ids of their messages.
+
+    The registry is loaded once with `hydrate` and then kept up to date by the vote sessions themselves, which
+    register when they are created and unregister when they close. It holds every open session, so a message that is
+    not in the registry is not a vote message, and answering that costs a single dictionary lookup.
+
+    Changes made to the database by anything else, like edits to a build being voted on or votes and closes from
+    another process, are applied to the registered sessions through `register_caches`.
+    """
+
+    def __init__(self) -> None:
+        self._by_message: dict[int, AbstractVoteSession] = {}
+        self._by_id: dict[int, AbstractVoteSession] = {}
+        self._hydrated = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def hydrated(self) -> bool:
+        """Whether the open vote sessions have been loaded from the database."""
+        return self._hydrated.is_set()
+
+    async def hydrate(self, bot: "squid.bot.RedstoneSquid") -> None:
+        """Loads every open vote session from the database.
+
+        Sessions registered before this finishes are kept, so sessions created during startup are not lost.
+        """
+        try:
+            build_sessions, delete_log_sessions = await asyncio.gather(
+                BuildVoteSession.get_open_vote_sessions(bot), DeleteLogVoteSession.get_open_vote_sessions(bot)
+            )
+        except Exception:
+            # Do not leave reactions waiting forever, sessions created from now on still work
+            logger.exception("Failed to load the open vote sessions.")
+            self._hydrated.set()
+            return
+        for session in [*build_sessions, *delete_log_sessions]:
+            if session.id is None or session.id not in self._by_id:
+                self.add(session)
+        self._hydrated.set()
+        logger.info("Loaded %s open vote sessions.", len(self))
+
+    async def get(self, message_id: int) -> AbstractVoteSession | None:
+        """Gets the open vote session that a message belongs to, waiting for `hydrate` to finish if needed."""
+        if not self._hydrated.is_set():
+            await self._hydrated.wait()
+        return self._by_message.get(message_id)
+
+    def add(self, session: AbstractVoteSession) -> None:
+        """Registers an open vote session, or the new messages of an already registered one."""
+        if session.is_closed:
+            return
+        if session.id is not None:
+            self._by_id[session.id] = session
+        for message_id in session.message_ids:
+            self._by_message[message_id] = session
+
+    def remove(self, session: AbstractVoteSession) -> None:
+        """Unregisters a vote session, usually because it closed."""
+        if session.id is not None:
+            self._by_id.pop(session.id, None)
+        for message_id in session.message_ids:
+            if self._by_message.get(message_id) is session:
+                del self._by_message[message_id]
+
+    def register_caches(self, bus: InvalidationBus) -> None:
+        """Reloads the registered sessions when the database rows they were loaded from change."""
+        bus.register("builds", self._reload_builds)
+        bus.register("votes", self._reload_votes)
+        bus.register("vote_sessions", self._reload_status)
+
+    async def _reload_builds(self, invalidation: Invalidation) -> None:
+        sessions = [
+            session
+            for session in self._by_id.values()
+            if isinstance(session, BuildVoteSession) and invalidation.affects(session.build.id)
+        ]
+        await self._reload(sessions, BuildVoteSession.reload_build)
+
+    async def _reload_votes(self, invalidation: Invalidation) -> None:
+        sessions = [session for session in self._by_id.values() if invalidation.affects(session.id)]
+        await self._reload(sessions, AbstractVoteSession.reload_votes)
+
+    async def _reload_status(self, invalidation: Invalidation) -> None:
+        sessions = [session for session in self._by_id.values() if invalidation.affects(session.id)]
+        await self._reload(sessions, AbstractVoteSession.reload_status)
+
+    @staticmethod
+    async def _reload[S: AbstractVoteSession](sessions: Sequence[S], reload: Callable[[S], Awaitable[None]]) -> None:
+        results = await asyncio.gather(*(reload(session) for session in sessions), return_exceptions=True)
+        for session, result in zip(sessions, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error("Failed to reload vote session %s.", session.id, exc_info=result)
@@ -2,17 +2,14 @@
 
 import asyncio
 import logging
-from typing import TYPE_CHECKING, Any, Literal, cast
+from typing import TYPE_CHECKING, Any, cast, override
 
 import discord
 from discord.ext.commands import Cog, Context, hybrid_command
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
 from squid.bot._types import GuildMessageable
 from squid.bot.utils.permissions import is_staff, is_trusted_or_staff
-from squid.bot.voting.vote_session import AbstractVoteSession, BuildVoteSession, DeleteLogVoteSession
-from squid.db.schema import Message, VoteSession
+from squid.bot.voting.vote_session import DeleteLogVoteSession
 
 if TYPE_CHECKING:
     import squid.bot
@@ -31,50 +28,19 @@ def __init__(self, bot: BotT):
         self.bot = bot
         self._background_tasks: set[asyncio.Task[Any]] = set()
 
+    @override
+    async def cog_load(self) -> None:
+        """Loads the open vote sessions in the background, reactions wait for it to finish."""
+        hydrate_task = asyncio.create_task(self.bot.vote_sessions.hydrate(self.bot))
+        self._background_tasks.add(hydrate_task)
+        hydrate_task.add_done_callback(self._background_tasks.discard)
+
     async def get_voting_weight(self, server_id: int | None, user_id: int) -> float:
         """Get the voting weight of a user."""
         if await is_staff(self.bot, server_id, user_id):
             return 3
         return 1
 
-    async def get_vote_session(
-        self, message_id: int, *, status: Literal["open", "closed"] | None = None
-    ) -> AbstractVoteSession | None:
-        """Gets a vote session from the database.
-
-        Args:
-            message_id: The message ID of the vote session.
-            status: The status of the vote session. If None, it will get any status.
-        """
-        async with self.bot.db.async_session() as session:
-            stmt = (
-                select(Message)
-                .options(selectinload(Message.vote_session))
-                .where(Message.id == message_id, Message.purpose == "vote")
-            )
-            if status is not None:
-                stmt = stmt.where(Message.vote_session.has(VoteSession.status == status))
-
-            result = await session.execute(stmt)
-            message = result.scalar_one_or_none()
-
-            if message is None or message.vote_session is None:
-                return None
-
-            vote_session_id = message.vote_session_id
-            assert vote_session_id is not None, (
-                "Vote session ID should not be None because we selected messages with the vote purpose."
-            )
-            kind = message.vote_session.kind
-
-            if kind == "build":
-                return await BuildVoteSession.from_id(self.bot, vote_session_id)
-            if kind == "delete_log":
-                return await DeleteLogVoteSession.from_id(self.bot, vote_session_id)
-            logger.error("Unknown vote session kind: %s", kind)
-            msg = f"Unknown vote session kind: {kind}"
-            raise NotImplementedError(msg)
-
     @Cog.listener(name="on_raw_reaction_add")
     async def update_vote_sessions(self, payload: discord.RawReactionActionEvent):
         """Handles reactions to update vote counts anonymously."""
@@ -82,13 +48,13 @@ async def update_vote_sessions(self, payload: discord.RawReactionActionEvent):
         if payload.user_id == self.bot.user.id:  # type: ignore
             return
 
-        vote_session = await self.get_vote_session(payload.message_id, status="open")
+        vote_session = await self.bot.vote_sessions.get(payload.message_id)
         if vote_session is None:
             return
 
         # Remove the user's reaction to keep votes anonymous
         channel = cast(GuildMessageable, self.bot.get_channel(payload.channel_id))
-        message = await channel.fetch_message(payload.message_id)
+        message = channel.get_partial_message(payload.message_id)
         user = self.bot.get_user(payload.user_id)
         assert user is not None
         remove_reaction_task = asyncio.create_task(message.remove_reaction(payload.emoji, user))
@@ -123,7 +89,7 @@ async def update_vote_sessions(self, payload: discord.RawReactionActionEvent):
             vote_session[user_id] = -weight if original_vote != -weight else 0
         else:
             return
-        await vote_session.update_messages()
+        vote_session.schedule_render()
 
     @hybrid_command(name="start_vote")
     async def start_vote(self, ctx: Context[BotT], target_message: discord.Message):
@@ -3,9 +3,10 @@
 import asyncio
 import contextlib
 import inspect
+import logging
 from abc import ABC, abstractmethod
 from asyncio import Task
-from collections.abc import Iterable
+from collections.abc import Awaitable, Callable, Iterable, Sequence
 from textwrap import dedent
 from types import MethodType
 from typing import TYPE_CHECKING, Any, ClassVar, Literal, Self, cast, final, override
@@ -14,6 +15,7 @@
 from sqlalchemy import insert, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from squid.bot.voting.journal import VoteChange
 from squid.db import DatabaseManager
 from squid.db.builds import Build
 from squid.db.schema import BuildVoteSession as SQLBuildVoteSession
@@ -23,6 +25,7 @@
 if TYPE_CHECKING:
     import squid.bot
 
+logger = logging.getLogger(__name__)
 
 APPROVE_EMOJIS = ["👍", "✅"]
 DENY_EMOJIS = ["👎", "❌"]
@@ -75,18 +78,36 @@ async def track_vote_session(
     return session_id
 
 
-async def close_vote_session(vote_session_id: int, result: VoteSessionResultLiteral) -> None:
-    """Close a vote session in the database.
+async def close_vote_session(
+    vote_session_id: int,
+    result: VoteSessionResultLiteral,
+    *,
+    on_close: Callable[[], Awaitable[None]] | None = None,
+) -> bool:
+    """Close a vote session in the database, if it is still open.
 
     Args:
         vote_session_id: The id of the vote session.
         result: The finalized result of the vote session.
+        on_close: Called once the vote session is closed, before the close is committed. If it raises, the close is
+            rolled back. Concurrent calls wait for it to finish, since the vote session row stays locked until then.
+
+    Returns:
+        Whether this call closed the vote session. Only one of any number of concurrent calls returns True.
     """
     db = DatabaseManager()
     async with db.async_session() as session:
-        stmt = update(VoteSession).where(VoteSession.id == vote_session_id).values(status="closed", result=result)
-        await session.execute(stmt)
+        stmt = (
+            update(VoteSession)
+            .where(VoteSession.id == vote_session_id, VoteSession.status == "open")
+            .values(status="closed", result=result)
+            .returning(VoteSession.id)
+        )
+        closed = (await session.execute(stmt)).scalar_one_or_none() is not None
+        if closed and on_close is not None:
+            await on_close()
         await session.commit()
+    return closed
 
 
 async def upsert_vote(vote_session_id: int, user_id: int, weight: float | None) -> None:
@@ -97,16 +118,27 @@ async def upsert_vote(vote_session_id: int, user_id: int, weight: float | None)
         user_id: The id of the user voting.
         weight: The weight of the vote. None to remove the vote.
     """
+    await upsert_votes([(vote_session_id, user_id, weight)])
+
+
+async def upsert_votes(votes: Sequence[VoteChange]) -> None:
+    """Upsert many votes in the database with a single statement.
+
+    Args:
+        votes: (vote_session_id, user_id, weight) of each vote. A (vote_session_id, user_id) pair may only appear once.
+    """
+    if not votes:
+        return
     db = DatabaseManager()
     async with db.async_session() as session:
-        stmt = (
-            pg_insert(Vote)
-            .values(
-                vote_session_id=vote_session_id,
-                user_id=user_id,
-                weight=weight,
-            )
-            .on_conflict_do_update(index_elements=[Vote.vote_session_id, Vote.user_id], set_=dict(weight=weight))
+        stmt = pg_insert(Vote).values(
+            [
+                {"vote_session_id": vote_session_id, "user_id": user_id, "weight": weight}
+                for vote_session_id, user_id, weight in votes
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Vote.vote_session_id, Vote.user_id], set_={"weight": stmt.excluded.weight}
         )
         await session.execute(stmt)
         await session.commit()
@@ -127,6 +159,8 @@ class AbstractVoteSession(ABC):
     """
 
     kind: ClassVar[VoteKindLiteral]
+    render_delay: ClassVar[float] = 1.5
+    """How long, in seconds, `schedule_render` waits to collect more votes before rendering them all at once."""
 
     def __init__(
         self,
@@ -176,7 +210,13 @@ def __init__(
         self.pass_threshold = pass_threshold
         self.fail_threshold = fail_threshold
         self._votes: dict[int, float] = {}  # Dict of user_id: weight
+        # Running sums of the positive and negative weights in _votes, kept up to date by _apply_vote
+        self._upvotes: float = 0
+        self._downvotes: float = 0
         self._tasks: set[Task[Any]] = set()
+        self._render_task: Task[None] | None = None
+        self._render_pending = False
+        self._render_lock = asyncio.Lock()
 
     @classmethod
     @abstractmethod
@@ -188,6 +228,7 @@ async def create(cls: type[Self], *args: Any, **kwargs: Any) -> Self:
         self._allow_init = True
         self.__init__(*args, **kwargs)
         await self._async_init()
+        self.bot.vote_sessions.add(self)
         return self
 
     @abstractmethod
@@ -251,18 +292,70 @@ async def from_id(cls: type[Self], bot: "squid.bot.RedstoneSquid", vote_session_
 
     @property
     def upvotes(self) -> float:
-        """Calculate the upvotes"""
-        return sum(vote for vote in self._votes.values() if vote > 0)
+        """The sum of the positive votes"""
+        return self._upvotes
 
     @property
     def downvotes(self) -> float:
-        """Calculate the downvotes"""
-        return -sum(vote for vote in self._votes.values() if vote < 0)
+        """The sum of the negative votes, as a positive number"""
+        return -self._downvotes
 
     @property
     def net_votes(self) -> float:
-        """Calculate the net votes"""
-        return sum(self._votes.values())
+        """The sum of all votes"""
+        return self._upvotes + self._downvotes
+
+    def _apply_vote(self, user_id: int, weight: float | None) -> None:
+        """Replace the vote of a user, updating the running sums."""
+        previous = self._votes.pop(user_id, None)
+        if previous is not None:
+            if previous > 0:
+                self._upvotes -= previous
+            else:
+                self._downvotes -= previous
+        if weight is not None:
+            self._votes[user_id] = weight
+            if weight > 0:
+                self._upvotes += weight
+            else:
+                self._downvotes += weight
+
+    def _load_votes(self, votes: Iterable[tuple[int, float | None]]) -> None:
+        """Replace every vote with the given (user_id, weight) pairs, e.g. when loading from the database."""
+        self._votes.clear()
+        self._upvotes = self._downvotes = 0
+        for user_id, weight in votes:
+            self._apply_vote(user_id, weight)
+
+    @final
+    async def _claim_close(self, on_close: Callable[[], Awaitable[None]] | None = None) -> bool:
+        """Mark the vote session as closed, both here and in the database.
+
+        Args:
+            on_close: Acts on the result, only if this call closed the vote session. If it raises, the vote session
+                is not closed, so the next vote tries closing it again.
+
+        Returns:
+            Whether this call closed the vote session. Only the call that closed it may act on the result.
+        """
+        if self.is_closed:
+            return False
+        # No await before this, so a single process never closes a session twice
+        self.is_closed = True
+        self.bot.vote_sessions.remove(self)
+        try:
+            if self.id is None:
+                if on_close is not None:
+                    await on_close()
+                return True
+            await self.bot.vote_journal.flush(self.id)
+            # Another process may have closed it already, the database decides who wins
+            return await close_vote_session(self.id, self.result, on_close=on_close)
+        except BaseException:
+            # Still open in the database, so reopen it here and let the next vote try closing it again
+            self.is_closed = False
+            self.bot.vote_sessions.add(self)
+            raise
 
     @final
     @property
@@ -305,15 +398,12 @@ async def fetch_messages(self) -> set[discord.Message]:
             messages_record = result.scalars().all()
 
             cached_ids = {message.id for message in self._messages}
-            new_messages = await asyncio.gather(
-                *(
-                    self.bot.get_or_fetch_message(record.channel_id, record.id)
-                    for record in messages_record
-                    if record.id not in cached_ids and record.channel_id is not None
-                )
+            new_messages = await self.bot.message_resolver.fetch_many(
+                (record.channel_id, record.id)
+                for record in messages_record
+                if record.id not in cached_ids and record.channel_id is not None
             )
-            new_messages = (message for message in new_messages if message is not None)
-            self._messages.update(new_messages)
+            self._messages.update(new_messages.values())
             assert len(self._messages) == len(self.message_ids)
             return self._messages
 
@@ -321,16 +411,40 @@ async def fetch_messages(self) -> set[discord.Message]:
     async def update_messages(self) -> None:
         """Update the messages with an embed of new vote counts"""
 
+    def schedule_render(self) -> None:
+        """Re-render the messages soon, coalescing every call made within `render_delay` into a single render.
+
+        Use this instead of `update_messages` for changes that come in bursts, like votes.
+        """
+        self._render_pending = True
+        if self._render_task is None or self._render_task.done():
+            self._render_task = asyncio.create_task(self._render_loop())
+
+    async def _render_loop(self) -> None:
+        # Keeps rendering until no render was requested while the previous one was running
+        while self._render_pending:
+            await asyncio.sleep(self.render_delay)
+            if not self._render_pending:
+                return  # Already rendered by render()
+            self._render_pending = False
+            try:
+                await self.render()
+            except Exception:
+                # Nothing awaits this task, the next vote renders the messages again
+                logger.exception("Failed to render vote session %s.", self.id)
+
+    async def render(self) -> None:
+        """Render the messages now. Renders never overlap, so the last render started is the one that stays."""
+        self._render_pending = False
+        async with self._render_lock:
+            await self.update_messages()
+
     @abstractmethod
     async def close(self) -> None:
         """Close the vote session"""
-        self.is_closed = True
-        # Wait for any pending vote operations
-        if self._tasks:
-            await asyncio.gather(*self._tasks, return_exceptions=False)
-        await self.update_messages()
-        assert self.id is not None
-        await close_vote_session(self.id, self.result)
+        if not await self._claim_close():
+            return
+        await self.render()
 
     def __getitem__(self, user_id: int) -> float | None:
         return self._votes.get(user_id)
@@ -343,37 +457,56 @@ def __setitem__(self, user_id: int, weight: float | None) -> None:
         if self.is_closed:
             return
 
-        if weight is None:
-            self._votes.pop(user_id, None)
-        else:
-            self._votes[user_id] = weight
+        self._apply_vote(user_id, weight)
+        # Written in batches by the journal, close() flushes it before the session is closed in the database
+        if self.id is not None:
+            self.bot.vote_journal.record(self.id, user_id, weight)
 
         if not self.fail_threshold < self.net_votes < self.pass_threshold:
             task = asyncio.create_task(self.close())
             self._tasks.add(task)
             task.add_done_callback(self._tasks.discard)
 
-        # Create tasks for the updates
-        if self.id is not None:
-            db_task = asyncio.create_task(upsert_vote(self.id, user_id, weight))
-            self._tasks.add(db_task)
-            db_task.add_done_callback(self._tasks.discard)
-
     async def set_vote(self, user_id: int, weight: int | None) -> None:
         """Set a vote for a user with proper database tracking."""
         if self.is_closed:
             return
 
-        if weight is None:
-            self._votes.pop(user_id, None)
-        else:
-            self._votes[user_id] = weight
+        self._apply_vote(user_id, weight)
+        if self.id is not None:
+            self.bot.vote_journal.record(self.id, user_id, weight)
 
         if not self.fail_threshold < self.net_votes < self.pass_threshold:
             await self.close()
+        elif self.id is not None:
+            await self.bot.vote_journal.flush(self.id)
 
-        if self.id is not None:
-            await upsert_vote(self.id, user_id, weight)
+    async def reload_votes(self) -> None:
+        """Reload the votes from the database, to pick up votes cast through another process.
+
+        Votes recorded here but not written yet are newer than the database, so they are kept.
+        """
+        if self.id is None or self.is_closed:
+            return
+        async with self.bot.db.async_session() as session:
+            stmt = select(Vote.user_id, Vote.weight).where(Vote.vote_session_id == self.id)
+            votes: dict[int, float | None] = dict((await session.execute(stmt)).tuples().all())
+        if self.is_closed:
+            return
+        votes.update(self.bot.vote_journal.pending_votes(self.id))
+        self._load_votes(votes.items())
+        self.schedule_render()
+
+    async def reload_status(self) -> None:
+        """Stop taking votes if the vote session was closed in the database, e.g. by another process."""
+        if self.id is None or self.is_closed:
+            return
+        async with self.bot.db.async_session() as session:
+            status = await session.scalar(select(VoteSession.status).where(VoteSession.id == self.id))
+        if status != "open" and not self.is_closed:
+            # The process that closed it acted on the result, so there is nothing left to do here
+            self.is_closed = True
+            self.bot.vote_sessions.remove(self)
 
 
 @final
@@ -407,6 +540,8 @@ def __init__(
         super().__init__(bot, messages, author_id, pass_threshold, fail_threshold)
         self.build = build
         self.type = type
+        self._static_embed: discord.Embed | None = None
+        """The build embed without the vote counts."""
 
     @classmethod
     @override
@@ -492,7 +627,7 @@ async def _from_domain(cls, bot: "squid.bot.RedstoneSquid", record: SQLBuildVote
         )
         # We can skip _async_init because we already have the id and everything has been tracked before
         self.id = record.id
-        self._votes = {vote.user_id: vote.weight for vote in record.votes}
+        self._load_votes((vote.user_id, vote.weight) for vote in record.votes)
         self.is_closed = record.status == "closed"
 
         return self
@@ -506,11 +641,16 @@ async def send_message(self, channel: discord.abc.Messageable) -> discord.Messag
             message, purpose="vote", build_id=self.build.id, vote_session_id=self.id
         )
         self._messages.add(message)
+        self.message_ids.add(message.id)
+        self.bot.vote_sessions.add(self)
         return message
 
     @override
     async def update_messages(self):
-        embed = await self.bot.for_build(self.build).generate_embed()
+        # Generating the build embed may fetch website previews, so only the vote counts are redone for each render
+        if self._static_embed is None:
+            self._static_embed = await self.bot.for_build(self.build).generate_embed()
+        embed = self._static_embed.copy()
         embed.add_field(name="", value="", inline=False)  # Add a blank field to separate the vote count
         embed.add_field(name="Accept", value=f"{self.upvotes}/{self.pass_threshold}", inline=True)
         embed.add_field(name="Deny", value=f"{self.downvotes}/{-self.fail_threshold}", inline=True)
@@ -520,20 +660,31 @@ async def update_messages(self):
 
     @override
     async def close(self) -> None:
-        if self.is_closed:
+        async def apply_result() -> None:
+            if self.result == "approved":
+                await self.build.confirm()
+            else:
+                await self.build.deny()
+
+        # The build is confirmed or denied before the close is committed, so a failure leaves both pending
+        if not await self._claim_close(apply_result):
             return
-
-        self.is_closed = True
-        if self.result == "approved":
-            await self.build.confirm()
-        else:
-            await self.build.deny()
         # TODO: decide whether to delete the messages or not
 
-        await self.update_messages()
+        self._static_embed = None  # The build changed status
+        await self.render()
 
-        if self.id is not None:
-            await close_vote_session(self.id, self.result)
+    async def reload_build(self) -> None:
+        """Reload the build after it was saved, so the messages and the result use its current state."""
+        # The build of an update vote is the proposed edit, which is not saved until the vote passes
+        if self.type != "add" or self.build.id is None or self.is_closed:
+            return
+        build = await self.bot.db.build.get_by_id(self.build.id)
+        if build is None or self.is_closed:
+            return
+        self.build = build
+        self._static_embed = None
+        self.schedule_render()
 
     @classmethod
     async def get_open_vote_sessions(
@@ -647,7 +798,7 @@ async def _from_domain(
         self.id = (
             record.vote_session_id
         )  # We can skip _async_init because we already have the id and everything has been tracked before
-        self._votes = {vote.user_id: vote.weight for vote in record.votes}
+        self._load_votes((vote.user_id, vote.weight) for vote in record.votes)
         self.is_closed = record.status == "closed"
         return self
 
@@ -698,16 +849,12 @@ async def update_messages(self) -> None:
 
     @override
     async def close(self) -> None:
-        if self.is_closed:
+        if not await self._claim_close():
             return
 
-        self.is_closed = True
         if self.result == "approved":
             await self.target_message.delete()
-        await self.update_messages()
-
-        if self.id is not None:
-            await close_vote_session(self.id, self.result)
+        await self.render()
 
     @classmethod
     async def get_open_vote_sessions(
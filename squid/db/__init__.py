@@ -14,15 +14,21 @@
 from supabase.lib.client_options import AsyncClientOptions
 
 from squid.db.build_manager import BuildManager
+from squid.db.build_search import BuildSearch
 from squid.db.build_tags import BuildTagsManager
+from squid.db.embeddings import EmbeddingPipeline, QueryEmbeddingCache
 from squid.db.inspect_db import is_sane_database
+from squid.db.invalidation import Invalidation, InvalidationBus
+from squid.db.listener import NotificationListener
 from squid.db.message import MessageService
 from squid.db.repos.message_repository import MessageRepository
 from squid.db.repos.user_repository import UserRepository
 from squid.db.schema import Version
 from squid.db.server_settings import ServerSettingManager
 from squid.db.services.user_service import UserService
-from squid.utils import get_version_string, parse_version_string
+from squid.db.vector_store import VectorStore
+from squid.db.version_resolver import EDITIONS, VersionResolver
+from squid.utils import get_version_string
 
 
 class DatabaseManager(AsyncClient):
@@ -102,6 +108,26 @@ def __init__(
         self.server_setting = ServerSettingManager(self.async_session)
         self.build_tags = BuildTagsManager(self.async_session)
         self.build = BuildManager(self.async_session)
+        self.vectors = VectorStore()
+        self.embeddings = EmbeddingPipeline(self.async_session, self.build, self.vectors)
+        self.build.embedding_pipeline = self.embeddings
+        self.query_embeddings = QueryEmbeddingCache(path=os.environ.get("QUERY_EMBEDDING_CACHE_PATH"))
+        self.build_search = BuildSearch(self.build, self.vectors, self.query_embeddings)
+        # get_or_fetch_versions_list is looked up on every call, so overriding it on the instance also takes effect here
+        self.version_resolver = VersionResolver(lambda edition: self.get_or_fetch_versions_list(edition))
+
+        # Notifications are only sent by committed transactions, and missed ones are caught up on every reconnect
+        self.listener = NotificationListener(database_url)
+        self.listener.subscribe("door_records", self.build.handle_door_records_notification)
+        self.listener.on_reconnect(self.build.resync_door_records)
+
+        # Caches are kept until the tables they were loaded from change
+        self.invalidation = InvalidationBus()
+        self.invalidation.attach(self.listener)
+        self.invalidation.register("versions", self._invalidate_versions)
+        self.build_tags.register_caches(self.invalidation)
+        self.build.register_caches(self.invalidation)
+        self.server_setting.register_caches(self.invalidation)
 
     def validate_database_consistency(self, base_cls: type[DeclarativeBase]) -> None:
         """Validates that the database schema is consistent with the expected schema."""
@@ -109,10 +135,18 @@ def validate_database_consistency(self, base_cls: type[DeclarativeBase]) -> None
             msg = "The database schema is not consistent with the expected schema."
             raise RuntimeError(msg)
 
+    def _invalidate_versions(self, invalidation: Invalidation) -> None:
+        for edition in [edition for edition in self.version_cache if invalidation.affects(edition)]:
+            del self.version_cache[edition]
+        self.version_resolver.invalidate(
+            None if invalidation.keys is None else [edition for edition in EDITIONS if invalidation.affects(edition)]
+        )
+
     async def get_or_fetch_versions_list(self, edition: Literal["Java", "Bedrock"]) -> list[Version]:
         """Returns a list of versions from the database, sorted from oldest to newest.
 
-        If edition is specified, only versions from that edition are returned. This method is cached."""
+        If edition is specified, only versions from that edition are returned. This method is cached until the versions
+        table changes."""
         if versions := self.version_cache.get(edition):
             return versions
 
@@ -141,94 +175,8 @@ async def get_or_fetch_newest_version(self, *, edition: Literal["Java", "Bedrock
         return get_version_string(versions[-1])
 
     async def find_versions_from_spec(self, version_spec: str) -> list[str]:
-        """Return all versions that match the version specification."""
-
-        # See if the spec specifies no edition (default to Java), one edition, or both
-        bedrock = version_spec.find("Bedrock") != -1
-        java = version_spec.find("Java") != -1
-        edition: Literal["Java", "Bedrock"]
-        if not bedrock and not java:
-            edition = "Java"  # Default to Java if no edition specified
-        elif bedrock and not java:
-            edition = "Bedrock"
-        elif not bedrock and java:
-            edition = "Java"
-        else:
-            msg = "Cannot specify both Java and Bedrock in the version spec."
-            raise NotImplementedError(msg)
-
-        version_spec = version_spec.replace("Java", "").replace("Bedrock", "").strip()
-
-        all_versions = await self.get_or_fetch_versions_list(edition)
-        all_version_tuples = [(v.major_version, v.minor_version, v.patch_number) for v in all_versions]
-
-        # Split the spec by commas: e.g. "1.14 - 1.16.1, 1.17, 1.19+" has 3 parts
-        parts = [part.strip() for part in version_spec.split(",")]
-
-        valid_tuples: list[tuple[int, int, int]] = []
-        v_tuple: tuple[int, int, int]
-        end_tuple: tuple[Literal["Java", "Bedrock"], int, int, int]
-
-        for part in parts:
-            # Case 1: range like "1.14 - 1.16.1"
-            if "-" in part:
-                subparts = [p.strip() for p in part.split("-")]
-                if len(subparts) != 2:
-                    msg = f"Invalid version range format in {part}, expected exactly 2 parts, got {len(subparts)}."
-                    raise ValueError(msg)
-                start_str, end_str = subparts
-                start_tuple = (
-                    parse_version_string(start_str)
-                    if start_str.count(".") == 2
-                    else parse_version_string(start_str + ".0")
-                )
-
-                if end_str.count(".") == 2:
-                    end_tuple = parse_version_string(end_str)
-                else:
-                    # When no patch is specified (e.g. "1.16"), find the highest patch number for that major.minor
-                    major, minor = map(int, end_str.split("."))
-                    max_patch = 0
-                    for v_tuple in all_version_tuples:
-                        if v_tuple[0] == major and v_tuple[1] == minor:
-                            max_patch = max(max_patch, v_tuple[2])
-                    # Note: the "Java" edition here is just a placeholder for the tuple structure, it is immediately
-                    # discarded below in end_tuple[1:]
-                    end_tuple = ("Java", major, minor, max_patch)
-
-                valid_tuples.extend(
-                    v_tuple for v_tuple in all_version_tuples if start_tuple[1:] <= v_tuple <= end_tuple[1:]
-                )
-
-            # Case 2: trailing plus like "1.19+"
-            elif part.endswith("+"):
-                base_str = part[:-1].strip()
-                # Change "1.19+" to "1.19.0+"
-                if base_str.count(".") == 1:
-                    base_str += ".0"
-                base_tuple = parse_version_string(base_str)
-
-                valid_tuples.extend(v_tuple for v_tuple in all_version_tuples if v_tuple >= base_tuple[1:])
-
-            # Case 3: exact version or prefix, e.g. "1.17" or "1.17.1"
-            else:
-                subparts = part.split(".")
-                # If only major.minor specified (like "1.17"), match all "1.17.x"
-                if len(subparts) == 2:
-                    major, minor = map(int, subparts)
-                    valid_tuples.extend(
-                        v_tuple for v_tuple in all_version_tuples if v_tuple[0] == major and v_tuple[1] == minor
-                    )
-                # If a full version specified (like "1.17.1"), match exactly that version
-                elif len(subparts) == 3:
-                    v_tuple = tuple(map(int, subparts))  # pyright: ignore[reportAssignmentType]
-                    if v_tuple in all_version_tuples:
-                        valid_tuples.append(v_tuple)
-                else:
-                    # Optionally, handle malformed inputs or major-only specs
-                    pass
-
-        return [f"{edition} {major}.{minor}.{patch}" for major, minor, patch in valid_tuples]
+        """Return all versions that match the version specification. See `VersionResolver` for the syntax."""
+        return await self.version_resolver.resolve(version_spec)
 
 
 async def main():
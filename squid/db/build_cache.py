@@ -0,0 +1,163 @@
+"""An in-process cache of hydrated Build objects."""
+
+from __future__ import annotations
+
+import copy
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from squid.db.builds import Build, BuildLock
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL = 600.0  # 10 minutes
+
+
+@dataclass(slots=True)
+class BuildCacheStats:
+    """Counters describing how well the build cache is performing."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that were served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass(slots=True)
+class _Entry:
+    build: Build
+    expires_at: float
+
+
+class BuildCache:
+    """A bounded LRU cache of builds with a time-to-live, keyed by build id and by original message id.
+
+    The cache stores its own snapshot of every build and hands out deep copies, so callers are free to mutate the
+    builds they get back (e.g. while editing) without corrupting the cached state. Writers are expected to keep the
+    cache coherent by calling `put` or `invalidate` after every write to the database.
+
+    Reads that race with writes are handled with a per-build generation counter: take a `token` before reading from
+    the database and pass it to `put`, and the result is discarded if the build was written to in the meantime.
+    """
+
+    __slots__ = ("_clock", "_entries", "_generations", "_max_size", "_message_index", "_ttl", "stats")
+
+    def __init__(
+        self,
+        *,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes the cache.
+
+        Args:
+            max_size: The maximum number of builds to keep in the cache. Least recently used builds are evicted first.
+            ttl: The number of seconds a build stays valid in the cache.
+            clock: A monotonic clock, overridable for testing.
+        """
+        if max_size <= 0:
+            msg = "max_size must be positive."
+            raise ValueError(msg)
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._message_index: dict[int, int] = {}
+        self._generations: dict[int, int] = {}
+        self.stats = BuildCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, build_id: object) -> bool:
+        return build_id in self._entries
+
+    def token(self, build_id: int) -> int:
+        """Returns the current write generation of a build, to be passed back to `put` after a database read."""
+        return self._generations.get(build_id, 0)
+
+    def get(self, build_id: int) -> Build | None:
+        """Returns a copy of the cached build with the given id, or None if it is not cached."""
+        entry = self._entries.get(build_id)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(build_id)
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(build_id)
+        self.stats.hits += 1
+        return self._copy(entry.build)
+
+    def get_by_message_id(self, message_id: int) -> Build | None:
+        """Returns a copy of the cached build whose original message has the given id."""
+        build_id = self._message_index.get(message_id)
+        if build_id is None:
+            self.stats.misses += 1
+            return None
+        return self.get(build_id)
+
+    def put(self, build: Build, *, token: int | None = None) -> None:
+        """Stores a snapshot of the build in the cache.
+
+        Args:
+            build: The build to cache. It must have an id.
+            token: The value of `token` taken before the build was read from the database. If the build has been
+                written to since, the snapshot is stale and is not stored. Omit this when caching a build that was
+                just written.
+        """
+        if build.id is None:
+            msg = "Cannot cache a build without an id."
+            raise ValueError(msg)
+        if token is not None and token != self.token(build.id):
+            return
+        if token is None:
+            self._bump(build.id)
+
+        self._remove(build.id)
+        self._entries[build.id] = _Entry(self._copy(build), self._clock() + self._ttl)
+        if build.original_message_id is not None:
+            self._message_index[build.original_message_id] = build.id
+        while len(self._entries) > self._max_size:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self.stats.evictions += 1
+
+    def invalidate(self, build_id: int) -> None:
+        """Removes a build from the cache, and makes any in-flight reads of it stale."""
+        self._bump(build_id)
+        if self._remove(build_id):
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Removes every build from the cache."""
+        for build_id in list(self._entries):
+            self.invalidate(build_id)
+
+    def _bump(self, build_id: int) -> None:
+        self._generations[build_id] = self._generations.get(build_id, 0) + 1
+
+    def _remove(self, build_id: int) -> bool:
+        entry = self._entries.pop(build_id, None)
+        if entry is None:
+            return False
+        message_id = entry.build.original_message_id
+        if message_id is not None and self._message_index.get(message_id) == build_id:
+            del self._message_index[message_id]
+        return True
+
+    @staticmethod
+    def _copy(build: Build) -> Build:
+        clone = copy.deepcopy(build)
+        # Locks are per-object state that must never be shared between copies
+        clone.lock = BuildLock(clone.id)
+        return clone
@@ -1,58 +1,118 @@
 from __future__ import annotations
 
-import asyncio
+import json
 import logging
-import os
-from collections.abc import Mapping, Sequence
+import time
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, Self
 
-import vecs
-from async_lru import alru_cache
-from postgrest.base_request_builder import APIResponse
-from rapidfuzz import process
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import BigInteger, Row, Select, String, column, insert, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy.orm import selectinload
-
-from squid.db.builds import Build, JoinedBuildRecord, all_build_columns
-from squid.db.schema import (
-    Build as SQLBuild,
-)
+from sqlalchemy.orm import InstrumentedAttribute, selectinload
+
+from squid.db.build_cache import BuildCache
+from squid.db.build_query import BUILD_LOAD_OPTIONS, BuildQuery
+from squid.db.builds import Build
+from squid.db.embeddings import EmbeddingPipeline
+from squid.db.invalidation import Invalidation, InvalidationBus
+from squid.db.record_search import IndexedRecord, RecordTitleIndex
 from squid.db.schema import (
+    DOOR_RECORD_MODELS,
     BuildCategory,
     BuildCreator,
     BuildLink,
     BuildRestriction,
     BuildType,
-    BuildVersion,
     Door,
-    LinkRecord,
+    DoorOrientationLiteral,
+    DoorRecordModel,
+    FastestDoor,
     MediaTypeLiteral,
     Message,
-    MessageRecord,
+    RecordCategoryLiteral,
     Restriction,
-    RestrictionRecord,
-    SmallestDoor,
     Status,
     Type,
     UnknownRestrictions,
     User,
-    Version,
-    VersionRecord,
 )
-from squid.utils import get_version_string
+from squid.db.schema import (
+    Build as SQLBuild,
+)
+from squid.db.version_resolver import version_ranges
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class RelationshipChanges:
+    """The join table rows written by a single save."""
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+    @property
+    def rows_touched(self) -> int:
+        """The total number of join table rows written."""
+        return self.inserted + self.updated + self.deleted
+
+    def __iadd__(self, other: RelationshipChanges) -> Self:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.deleted += other.deleted
+        return self
+
+
+@dataclass(slots=True)
+class SaveStats:
+    """Counters describing the write load generated by `BuildManager.save`."""
+
+    saves: int = 0
+    relationship_changes: RelationshipChanges = field(default_factory=RelationshipChanges)
+
+    @property
+    def rows_touched_per_save(self) -> float:
+        """The average number of join table rows written per save."""
+        return self.relationship_changes.rows_touched / self.saves if self.saves else 0.0
+
+
+_DOOR_RECORD_CATEGORY_BY_TABLE: dict[str, RecordCategoryLiteral] = {
+    model.__tablename__: record_category for record_category, model in DOOR_RECORD_MODELS.items()
+}
+
+
+@dataclass(slots=True)
+class TitleBackfillStats:
+    """Throughput of a single `BuildManager.update_door_records_without_title` run."""
+
+    records: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        """The number of records titled per second."""
+        return self.records / self.seconds if self.seconds else 0.0
+
+
 class BuildManager:
     """Service layer responsible for persistence and high-level operations on Build domain object."""
 
-    __slots__ = ("session",)
+    __slots__ = ("cache", "embedding_pipeline", "record_indexes", "save_stats", "session")
 
-    def __init__(self, session: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(self, session: async_sessionmaker[AsyncSession], *, cache: BuildCache | None = None) -> None:
         self.session = session
+        self.cache = cache if cache is not None else BuildCache()
+        """Hydrated builds, kept coherent by every write that goes through this manager."""
+        self.save_stats = SaveStats()
+        self.embedding_pipeline: EmbeddingPipeline | None = None
+        """Notified of every saved build so its embedding can be regenerated. Set by `DatabaseManager`."""
+        self.record_indexes: dict[RecordCategoryLiteral, RecordTitleIndex] = {
+            record_category: RecordTitleIndex(model) for record_category, model in DOOR_RECORD_MODELS.items()
+        }
 
     async def get_by_id(self, build_id: int) -> Build | None:
         """Creates a new Build object from a database ID.
@@ -63,13 +123,19 @@ async def get_by_id(self, build_id: int) -> Build | None:
         Returns:
             The Build object with the specified ID, or None if the build was not found.
         """
+        if (cached := self.cache.get(build_id)) is not None:
+            return cached
+
+        token = self.cache.token(build_id)
         async with self.session() as session:
             stmt = select(SQLBuild).where(SQLBuild.id == build_id)
             result = await session.execute(stmt)
             sql_build = result.unique().scalar_one_or_none()
             if sql_build is None:
                 return None
-            return self.from_sql_build(sql_build)
+            build = self.from_sql_build(sql_build)
+        self.cache.put(build, token=token)
+        return build
 
     async def get_by_message_id(self, message_id: int) -> Build | None:
         """
@@ -81,6 +147,9 @@ async def get_by_message_id(self, message_id: int) -> Build | None:
         Returns:
             The Build object with the specified message id, or None if the build was not found.
         """
+        if (cached := self.cache.get_by_message_id(message_id)) is not None:
+            return cached
+
         async with self.session() as session:
             stmt = select(Message).where(Message.id == message_id)
             result = await session.execute(stmt)
@@ -90,133 +159,6 @@ async def get_by_message_id(self, message_id: int) -> Build | None:
                 return await self.get_by_id(message.build_id)
             return None
 
-    @staticmethod
-    def _from_json(data: JoinedBuildRecord) -> Build:
-        """
-        Converts a JSON object to a Build object.
-
-        Args:
-            data: the exact JSON object returned by
-                `DatabaseManager().table('builds').select(all_build_columns).eq('id', build_id).execute().data[0]`
-
-        Returns:
-            A Build object.
-        """
-        id = data["id"]
-        submission_status = data["submission_status"]
-        record_category = data["record_category"]
-        category = data["category"]
-
-        width = data["width"]
-        height = data["height"]
-        depth = data["depth"]
-
-        match data["category"]:
-            case "Door":
-                assert "doors" in data and data["doors"] is not None
-                door_orientation_type = data["doors"]["orientation"]
-                door_width = data["doors"]["door_width"]
-                door_height = data["doors"]["door_height"]
-                door_depth = data["doors"]["door_depth"]
-                normal_closing_time = data["doors"]["normal_closing_time"]
-                normal_opening_time = data["doors"]["normal_opening_time"]
-                visible_closing_time = data["doors"]["visible_closing_time"]
-                visible_opening_time = data["doors"]["visible_opening_time"]
-            case "Extender":
-                raise NotImplementedError
-            case "Utility":
-                raise NotImplementedError
-            case "Entrance":
-                raise NotImplementedError
-            case _:
-                msg = "Invalid category"
-                raise ValueError(msg)
-
-        # FIXME: This is hardcoded for now
-        if types := data.get("types"):
-            door_type = [type_["name"] for type_ in types]
-        else:
-            door_type = ["Regular"]
-
-        restrictions: list[RestrictionRecord] = data.get("restrictions", [])
-        wiring_placement_restrictions = [r["name"] for r in restrictions if r["type"] == "wiring-placement"]
-        component_restrictions = [r["name"] for r in restrictions if r["type"] == "component"]
-        miscellaneous_restrictions = [r["name"] for r in restrictions if r["type"] == "miscellaneous"]
-
-        extra_info = data["extra_info"]
-
-        creators = data.get("users", [])
-        creators_ign = [creator["ign"] for creator in creators]
-
-        version_spec = data["version_spec"]
-        version_records: list[VersionRecord] = data.get("versions", [])
-        versions = []
-        for r in version_records:
-            version = Version(r["edition"], r["major_version"], r["minor_version"], r["patch_number"])
-            versions.append(get_version_string(version))
-
-        links: list[LinkRecord] = data.get("build_links", [])
-        image_urls = [link["url"] for link in links if link["media_type"] == "image"]
-        video_urls = [link["url"] for link in links if link["media_type"] == "video"]
-        world_download_urls = [link["url"] for link in links if link["media_type"] == "world-download"]
-
-        submitter_id = data["submitter_id"]
-        completion_time = data["completion_time"]
-        edited_time = data["edited_time"]
-
-        message_record: MessageRecord | None = data["messages"]
-        if message_record is None:
-            original_server_id = original_channel_id = original_message_id = original_message_author_id = None
-            original_message = None
-        else:
-            original_server_id = message_record["server_id"]
-            original_channel_id = message_record["channel_id"]
-            original_message_id = data["original_message_id"]
-            original_message_author_id = message_record["author_id"]
-            original_message = message_record["content"]
-
-        ai_generated = data["ai_generated"]
-        embedding = data["embedding"]
-
-        return Build(
-            id=id,
-            submission_status=Status(submission_status),
-            record_category=record_category,
-            category=BuildCategory(category),
-            versions=versions,
-            version_spec=version_spec,
-            width=width,
-            height=height,
-            depth=depth,
-            door_width=door_width,
-            door_height=door_height,
-            door_depth=door_depth,
-            door_type=door_type,
-            door_orientation_type=door_orientation_type,
-            wiring_placement_restrictions=wiring_placement_restrictions,
-            component_restrictions=component_restrictions,
-            miscellaneous_restrictions=miscellaneous_restrictions,
-            normal_closing_time=normal_closing_time,
-            normal_opening_time=normal_opening_time,
-            visible_closing_time=visible_closing_time,
-            visible_opening_time=visible_opening_time,
-            extra_info=extra_info,
-            creators_ign=creators_ign,
-            image_urls=image_urls,
-            video_urls=video_urls,
-            world_download_urls=world_download_urls,
-            submitter_id=submitter_id,
-            completion_time=completion_time,
-            edited_time=datetime.strptime(edited_time, "%Y-%m-%dT%H:%M:%S%z"),
-            original_server_id=original_server_id,
-            original_channel_id=original_channel_id,
-            original_message_id=original_message_id,
-            original_message_author_id=original_message_author_id,
-            original_message=original_message,
-            ai_generated=ai_generated,
-            embedding=embedding,
-        )
-
     @staticmethod
     def from_sql_build(sql_build: SQLBuild) -> Build:
         """Converts a SQLBuild to a Build object."""
@@ -229,6 +171,7 @@ def from_sql_build(sql_build: SQLBuild) -> Build:
             submission_status=door.submission_status,  # type: ignore
             category=BuildCategory(door.category),
             record_category=door.record_category,
+            version_spec=door.version_spec,
             width=door.width,
             height=door.height,
             depth=door.depth,
@@ -265,231 +208,299 @@ async def save(self, build: Build) -> None:
         """
         Updates the build in the database with the given data.
 
-        If the build does not exist in the database, it will be inserted instead.
+        If the build does not exist in the database, it will be inserted instead. Its embedding is regenerated in
+        the background by the embedding pipeline, so this does not wait for the embeddings API.
         """
         build.edited_time = datetime.now(tz=UTC)
 
-        if build.id is None:
-            delete_build_on_error = True
-            if build.submitter_id is None:
-                msg = "Submitter ID must be set for new builds."
-                raise ValueError(msg)
+        try:
+            changes = await self._insert(build) if build.id is None else await self._update(build)
+        except Exception:
+            if build.id is not None:
+                self.cache.invalidate(build.id)
+            raise
+        finally:
+            build.lock.build_id = build.id
+            await build.lock.release()
 
-            # Create new build - determine the right subclass
-            if build.category == BuildCategory.DOOR:
-                sql_build = Door(
-                    submission_status=build.submission_status or Status.PENDING,
-                    record_category=build.record_category,
-                    width=build.width,
-                    height=build.height,
-                    depth=build.depth,
-                    completion_time=build.completion_time,
-                    category=build.category,
-                    submitter_id=build.submitter_id,
-                    version_spec=build.version_spec,
-                    ai_generated=build.ai_generated or False,
-                    embedding=build.embedding,
-                    extra_info=build.extra_info,
-                    edited_time=build.edited_time,
-                    is_locked=True,  # Lock immediately on creation
-                    orientation=build.door_orientation_type or "Door",
-                    door_width=build.door_width or 1,
-                    door_height=build.door_height or 2,
-                    door_depth=build.door_depth,
-                    normal_opening_time=build.normal_opening_time,
-                    normal_closing_time=build.normal_closing_time,
-                    visible_opening_time=build.visible_opening_time,
-                    visible_closing_time=build.visible_closing_time,
-                )
-            else:
-                msg = f"Only doors are supported for now, got {build.category}."
-                raise ValueError(msg)
+        assert build.id is not None
+        # The saved row is normalized (unknown restrictions moved to extra_info, default versions filled in, ...),
+        # so the caller's object is not what a read would return. Let the next read hydrate it from the database.
+        self.cache.invalidate(build.id)
+        self.save_stats.saves += 1
+        self.save_stats.relationship_changes += changes
+        logger.debug(
+            "Saved build %s: %s join table rows inserted, %s updated, %s deleted",
+            build.id,
+            changes.inserted,
+            changes.updated,
+            changes.deleted,
+        )
+        if self.embedding_pipeline is not None:
+            self.embedding_pipeline.enqueue(build.id)
 
-            async with self.session() as session:
-                await self._setup_relationships(build, session, sql_build)
-                session.add(sql_build)
-                await session.flush()
-                build.id = sql_build.id
-                if build.original_message_id is not None:
-                    await self._create_or_update_message(build, session)
-                sql_build.original_message_id = build.original_message_id
-                await session.commit()
-            build.lock._lock_count = 1  # pyright: ignore[reportPrivateUsage]
-        else:
-            delete_build_on_error = False
-            await build.lock.acquire(timeout=30)
+    async def _insert(self, build: Build) -> RelationshipChanges:
+        """Inserts a new build into the database, leaving it locked."""
+        if build.submitter_id is None:
+            msg = "Submitter ID must be set for new builds."
+            raise ValueError(msg)
 
-            async with self.session() as session:
-                # Load existing build with all relationships
-                stmt = (
-                    select(SQLBuild)
-                    .where(SQLBuild.id == build.id)
-                    .options(
-                        selectinload(SQLBuild.build_creators).selectinload(BuildCreator.user),
-                        selectinload(SQLBuild.build_restrictions).selectinload(BuildRestriction.restriction),
-                        selectinload(SQLBuild.build_versions).selectinload(BuildVersion.version),
-                        selectinload(SQLBuild.build_types).selectinload(BuildType.type),
-                        selectinload(SQLBuild.links),
-                        selectinload(SQLBuild.messages),
-                    )
-                )
-                result = await session.execute(stmt)
-                sql_build = result.scalar_one()
+        # Create new build - determine the right subclass
+        if build.category == BuildCategory.DOOR:
+            sql_build = Door(
+                submission_status=build.submission_status or Status.PENDING,
+                record_category=build.record_category,
+                width=build.width,
+                height=build.height,
+                depth=build.depth,
+                completion_time=build.completion_time,
+                category=build.category,
+                submitter_id=build.submitter_id,
+                version_spec=build.version_spec,
+                ai_generated=build.ai_generated or False,
+                embedding=build.embedding,
+                extra_info=build.extra_info,
+                edited_time=build.edited_time,
+                is_locked=True,  # Lock immediately on creation
+                orientation=build.door_orientation_type or "Door",
+                door_width=build.door_width or 1,
+                door_height=build.door_height or 2,
+                door_depth=build.door_depth,
+                normal_opening_time=build.normal_opening_time,
+                normal_closing_time=build.normal_closing_time,
+                visible_opening_time=build.visible_opening_time,
+                visible_closing_time=build.visible_closing_time,
+            )
+        else:
+            msg = f"Only doors are supported for now, got {build.category}."
+            raise ValueError(msg)
 
-                # Update basic attributes
-                if build.submission_status is None:
-                    msg = "Submission status must be set for existing builds."
-                    raise ValueError(msg)
-                if build.submitter_id is None:
-                    msg = "Submitter ID must be set for existing builds."
-                    raise ValueError(msg)
-                sql_build.submission_status = build.submission_status
-                sql_build.record_category = build.record_category
-                sql_build.width = build.width
-                sql_build.height = build.height
-                sql_build.depth = build.depth
-                sql_build.completion_time = build.completion_time
-                sql_build.submitter_id = build.submitter_id
-                sql_build.version_spec = build.version_spec
-                sql_build.ai_generated = build.ai_generated or False
-                sql_build.embedding = build.embedding
-                sql_build.edited_time = build.edited_time
-
-                # Update category-specific attributes
-                if isinstance(sql_build, Door):
-                    sql_build.orientation = build.door_orientation_type or "Door"
-                    sql_build.door_width = build.door_width or 1
-                    sql_build.door_height = build.door_height or 2
-                    sql_build.door_depth = build.door_depth
-                    sql_build.normal_opening_time = build.normal_opening_time
-                    sql_build.normal_closing_time = build.normal_closing_time
-                    sql_build.visible_opening_time = build.visible_opening_time
-                    sql_build.visible_closing_time = build.visible_closing_time
-                else:
-                    msg = f"Only doors are supported for now, got {sql_build.category}."
-                    raise TypeError(msg)
-
-                # Clear existing relationships and set up new ones
-                sql_build.build_creators.clear()
-                sql_build.build_restrictions.clear()
-                sql_build.build_versions.clear()
-                sql_build.build_types.clear()
-                sql_build.links.clear()
-
-                await self._setup_relationships(build, session, sql_build)
-                if build.original_message_id is not None:
-                    await self._create_or_update_message(build, session)
-                sql_build.original_message_id = build.original_message_id
-                await session.commit()
+        async with self.session() as session:
+            changes = await self._sync_relationships(build, session, sql_build)
+            session.add(sql_build)
+            await session.flush()
+            build.id = sql_build.id
+            if build.original_message_id is not None:
+                await self._create_or_update_message(build, session)
+            sql_build.original_message_id = build.original_message_id
+            await session.commit()
+        build.lock._lock_count = 1  # pyright: ignore[reportPrivateUsage]
+        return changes
 
-        # Handle embedding and vector storage
-        try:
-            embedding_task = asyncio.create_task(build.generate_embedding())
-
-            # Update embedding
-            build.embedding = await embedding_task
-            if build.embedding is not None:
-                vx = vecs.create_client(os.environ["DB_CONNECTION"])
-                try:
-                    build_vecs = vx.get_or_create_collection(
-                        name="builds", dimension=int(os.getenv("EMBEDDING_DIMENSION", "1536"))
-                    )
-                    build_vecs.upsert(records=[(str(build.id), build.embedding, {})])
-                finally:
-                    vx.disconnect()
+    async def _update(self, build: Build) -> RelationshipChanges:
+        """Updates an existing build in the database, acquiring its lock."""
+        await build.lock.acquire(timeout=30)
 
-                # Update embedding in database
-                async with self.session() as session:
-                    stmt = (
-                        update(SQLBuild)
-                        .where(SQLBuild.id == build.id)
-                        .values(embedding=build.embedding, extra_info=build.extra_info)
-                    )
-                    await session.execute(stmt)
-                    await session.commit()
+        async with self.session() as session:
+            # Load existing build with all relationships
+            stmt = (
+                select(SQLBuild)
+                .where(SQLBuild.id == build.id)
+                .options(*BUILD_LOAD_OPTIONS, selectinload(SQLBuild.messages))
+            )
+            result = await session.execute(stmt)
+            sql_build = result.scalar_one()
 
-        except Exception:
-            if delete_build_on_error:
-                logger.warning("Failed to save build %s, deleting it", repr(build))
-                async with self.session() as session:
-                    stmt = delete(SQLBuild).where(SQLBuild.id == build.id)
-                    await session.execute(stmt)
-                    await session.commit()
+            # Update basic attributes
+            if build.submission_status is None:
+                msg = "Submission status must be set for existing builds."
+                raise ValueError(msg)
+            if build.submitter_id is None:
+                msg = "Submitter ID must be set for existing builds."
+                raise ValueError(msg)
+            sql_build.submission_status = build.submission_status
+            sql_build.record_category = build.record_category
+            sql_build.width = build.width
+            sql_build.height = build.height
+            sql_build.depth = build.depth
+            sql_build.completion_time = build.completion_time
+            sql_build.submitter_id = build.submitter_id
+            sql_build.version_spec = build.version_spec
+            sql_build.ai_generated = build.ai_generated or False
+            sql_build.embedding = build.embedding
+            sql_build.edited_time = build.edited_time
+
+            # Update category-specific attributes
+            if isinstance(sql_build, Door):
+                sql_build.orientation = build.door_orientation_type or "Door"
+                sql_build.door_width = build.door_width or 1
+                sql_build.door_height = build.door_height or 2
+                sql_build.door_depth = build.door_depth
+                sql_build.normal_opening_time = build.normal_opening_time
+                sql_build.normal_closing_time = build.normal_closing_time
+                sql_build.visible_opening_time = build.visible_opening_time
+                sql_build.visible_closing_time = build.visible_closing_time
             else:
-                logger.exception(
-                    "Failed to update build %s. This means the build is in an inconsistent state.", repr(build)
-                )
-            raise
-        finally:
-            build.lock.build_id = build.id
-            await build.lock.release()
+                msg = f"Only doors are supported for now, got {sql_build.category}."
+                raise TypeError(msg)
+
+            # Only write the join table rows that actually changed
+            changes = await self._sync_relationships(build, session, sql_build)
+            # Assigned after syncing the relationships, which record unknown restrictions and types in extra_info
+            sql_build.extra_info = build.extra_info
+            if build.original_message_id is not None:
+                await self._create_or_update_message(build, session)
+            sql_build.original_message_id = build.original_message_id
+            await session.commit()
+        return changes
+
+    async def _sync_relationships(
+        self, build: Build, session: AsyncSession, sql_build: SQLBuild
+    ) -> RelationshipChanges:
+        """Make the relationships of the SQLBuild match the build, writing only the join table rows that changed.
+
+        The relationships of `sql_build` must already be loaded (or be empty for a new build).
+        """
+        changes = RelationshipChanges()
 
-    async def _setup_relationships(self, build: Build, session: AsyncSession, sql_build: SQLBuild) -> None:
-        """Set up all relationships for the build using SQLAlchemy's relationship handling."""
         # Handle creators
-        if build.creators_ign:
-            creators = await self._get_or_create_users(session, build.creators_ign)
-            sql_build.creators = creators
+        creators = await self._get_or_create_users(session, build.creators_ign)
+        changes += await self._sync_association(
+            session,
+            sql_build.build_creators,
+            existing_key=lambda row: row.user_id,
+            desired={user.id: user for user in creators},
+            create=lambda _, user: BuildCreator(user=user),
+        )
 
         # Handle restrictions
         all_restrictions = (
             build.wiring_placement_restrictions + build.component_restrictions + build.miscellaneous_restrictions
         )
+        restriction_objects: list[Restriction] = []
         if all_restrictions:
             restriction_objects, unknown_restrictions = await self._get_restrictions(build, session, all_restrictions)
-            sql_build.restrictions = restriction_objects
             # Update extra_info with unknown restrictions
             if unknown_restrictions:
                 build.extra_info["unknown_restrictions"] = (
                     build.extra_info.get("unknown_restrictions", {}) | unknown_restrictions
                 )
+        changes += await self._sync_association(
+            session,
+            sql_build.build_restrictions,
+            existing_key=lambda row: row.restriction_id,
+            desired={restriction.id: restriction for restriction in restriction_objects},
+            create=lambda _, restriction: BuildRestriction(restriction=restriction),
+        )
 
         # Handle types
         if not build.door_type:
             build.door_type = ["Regular"]
         type_objects, unknown_types = await self._get_types(build, session, build.door_type)
-        sql_build.types = type_objects
         # Update extra_info with unknown types
         if unknown_types:
             build.extra_info["unknown_patterns"] = build.extra_info.get("unknown_patterns", []) + unknown_types
+        changes += await self._sync_association(
+            session,
+            sql_build.build_types,
+            existing_key=lambda row: row.type_id,
+            desired={type_.id: type_ for type_ in type_objects},
+            create=lambda _, type_: BuildType(type=type_),
+        )
 
-        # Handle versions
+        # Handle versions, which are only stored as ranges so that an open-ended spec like "1.8+" stays one range
+        # instead of a build_versions row for every version. Rows from before are removed so the two never disagree.
         from squid.db import DatabaseManager  # FIXME
 
         functional_versions = build.versions or [await DatabaseManager().get_or_fetch_newest_version(edition="Java")]
-        version_objects = await self._get_versions(session, functional_versions)
-        sql_build.versions = version_objects
-
-        # Handle links
-        all_links: list[tuple[str, MediaTypeLiteral]] = []
-        if build.image_urls:
-            all_links.extend([(url, "image") for url in build.image_urls])
-        if build.video_urls:
-            all_links.extend([(url, "video") for url in build.video_urls])
-        if build.world_download_urls:
-            all_links.extend([(url, "world-download") for url in build.world_download_urls])
-
-        for url, media_type in all_links:
-            build_link = BuildLink(url=url, media_type=media_type)
-            sql_build.links.append(build_link)
+        sql_build.version_ranges = version_ranges(build.version_spec, functional_versions)
+        for row in list(sql_build.build_versions):
+            sql_build.build_versions.remove(row)
+            await session.delete(row)
+            changes.deleted += 1
+
+        # Handle links, a url can only appear once per build so later media types win
+        def update_media_type(link: BuildLink, media_type: MediaTypeLiteral) -> bool:
+            if link.media_type == media_type:
+                return False
+            link.media_type = media_type
+            return True
+
+        desired_links: dict[str, MediaTypeLiteral] = {}
+        desired_links.update(dict.fromkeys(build.image_urls, "image"))
+        desired_links.update(dict.fromkeys(build.video_urls, "video"))
+        desired_links.update(dict.fromkeys(build.world_download_urls, "world-download"))
+        changes += await self._sync_association(
+            session,
+            sql_build.links,
+            existing_key=lambda row: row.url,
+            desired=desired_links,
+            create=lambda url, media_type: BuildLink(url=url, media_type=media_type),
+            update=update_media_type,
+        )
+        return changes
 
     @staticmethod
-    async def _get_or_create_users(session: AsyncSession, igns: list[str]) -> list[User]:
-        """Get or create User objects for the given IGNs."""
-        users: list[User] = []
-        for ign in igns:
-            stmt = select(User).where(User.ign == ign)
-            result = await session.execute(stmt)
-            user = result.scalar_one_or_none()
+    async def _sync_association[K, V, R](
+        session: AsyncSession,
+        rows: list[R],
+        *,
+        existing_key: Callable[[R], K],
+        desired: Mapping[K, V],
+        create: Callable[[K, V], R],
+        update: Callable[[R, V], bool] | None = None,
+    ) -> RelationshipChanges:
+        """Make a one-to-many collection of association rows match the desired keys.
 
-            if user is None:
-                user = User(ign=ign)
-                session.add(user)
-                await session.flush()  # Get the ID
+        Args:
+            session: The session the rows belong to.
+            rows: The loaded collection of association rows, modified in place.
+            existing_key: Returns the key identifying an existing row.
+            desired: The keys that should exist, mapped to the value each row should be created from.
+            create: Creates a new row from a desired key and value.
+            update: Updates a kept row in place to match its desired value, returning whether anything changed.
+                If not given, kept rows are left untouched.
 
-            users.append(user)
+        Returns:
+            The number of rows inserted, updated and deleted.
+        """
+        changes = RelationshipChanges()
+        existing = {existing_key(row): row for row in rows}
+
+        for key, row in existing.items():
+            if key not in desired:
+                rows.remove(row)
+                await session.delete(row)
+                changes.deleted += 1
+
+        for key, value in desired.items():
+            row = existing.get(key)
+            if row is None:
+                rows.append(create(key, value))
+                changes.inserted += 1
+            elif update is not None and update(row, value):
+                changes.updated += 1
+        return changes
 
-        return users
+    @staticmethod
+    async def _get_or_create_users(session: AsyncSession, igns: Sequence[str]) -> list[User]:
+        """Get or create User objects for the given IGNs.
+
+        This is set-based: one SELECT for all the IGNs and one INSERT for the missing ones, regardless of how many
+        creators a build has. IGNs are not unique in the database, so two concurrent saves can both insert the same
+        missing IGN; lookups then resolve it to the oldest user.
+
+        Returns:
+            The users in the same order as the given IGNs, with duplicate IGNs collapsed.
+        """
+        unique_igns = list(dict.fromkeys(igns))
+        if not unique_igns:
+            return []
+
+        users_by_ign: dict[str, User] = {}
+
+        stmt = select(User).where(User.ign.in_(unique_igns)).order_by(User.id)
+        for user in await session.scalars(stmt):
+            # Prefer the oldest user if there are duplicates
+            users_by_ign.setdefault(user.ign, user)
+
+        missing = [ign for ign in unique_igns if ign not in users_by_ign]
+        if missing:
+            insert_stmt = insert(User).returning(User)
+            for user in await session.scalars(insert_stmt, [{"ign": ign} for ign in missing]):
+                users_by_ign[user.ign] = user
+
+        return [users_by_ign[ign] for ign in unique_igns]
 
     @staticmethod
     async def _get_restrictions(
@@ -533,19 +544,6 @@ async def _get_types(build: Build, session: AsyncSession, type_names: list[str])
 
         return list(found_types), unknown_types
 
-    @staticmethod
-    async def _get_versions(session: AsyncSession, version_strings: list[str]) -> list[Version]:
-        """Get Version objects for the given version strings."""
-        qvn = func.get_quantified_version_names().table_valued("id", "quantified_name").alias("qvn")
-
-        stmt = select(qvn.c.id).where(qvn.c.quantified_name.in_(version_strings))
-        result = await session.execute(stmt)
-        version_ids = [tup[0] for tup in result.all()]  # result is a list of 1-tuples
-
-        stmt = select(Version).where(Version.id.in_(version_ids))
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
-
     @staticmethod
     async def _create_or_update_message(build: Build, session: AsyncSession) -> None:
         """Create or update the original message record."""
@@ -598,9 +596,13 @@ async def confirm(self, build: Build) -> None:
                 stmt = update(SQLBuild).where(SQLBuild.id == build.id).values(submission_status=Status.CONFIRMED)
                 result = await session.execute(stmt)
                 await session.commit()
+                self.cache.invalidate(build.id)
                 if result.rowcount != 1:
                     msg = "Failed to confirm submission in the database."
                     raise ValueError(msg)
+                if self.embedding_pipeline is not None:
+                    # The status is part of both the embedded text and the vector's metadata
+                    self.embedding_pipeline.enqueue(build.id)
 
     async def deny(self, build: Build) -> None:
         """Marks the build as denied.
@@ -618,73 +620,89 @@ async def deny(self, build: Build) -> None:
                 stmt = update(SQLBuild).where(SQLBuild.id == build.id).values(submission_status=Status.DENIED)
                 result = await session.execute(stmt)
                 await session.commit()
+                self.cache.invalidate(build.id)
                 if result.rowcount != 1:
                     msg = "Failed to deny submission in the database."
                     raise ValueError(msg)
+                if self.embedding_pipeline is not None:
+                    # The status is part of both the embedded text and the vector's metadata
+                    self.embedding_pipeline.enqueue(build.id)
 
-    async def get_builds_by_filter(self, *, filter: Mapping[str, Any] | None = None) -> list[Build]:
-        """Fetches all builds from the database, optionally filtered by submission status.
+    async def get_builds(self, query: BuildQuery | None = None) -> list[Build]:
+        """Fetches all builds matching the query, in the order the query specifies.
 
         Args:
-            filter: A dictionary containing filter criteria, only exact matches are supported.
-
-                A filter is of the format {"column_name": value}, where column_name is the name of the column
-                in the database and value is the value to filter by. In general, the attribute names of the Build class
-                are the same, but in some cases they are different and the only way to know is to look at the database schema.
-                Also, if the attribute you are trying to filter is not in the builds table, you will need to use a join table
-                syntax.
-
-                For example, to filter by submission status, use {"submission_status": 1}. To filter by door opening time,
-                use {"doors(normal_opening_time)": 0.5}. where doors is a join table. The join is automatically done by
-                the supabase client when you use the `select` method with the correct column name.
+            query: The query to run. If None, all builds are returned, ordered by id.
 
         Returns:
             A list of Build objects.
         """
-        from squid.db import DatabaseManager  # FIXME
+        stmt = (query or BuildQuery()).to_statement()
+        async with self.session() as session:
+            result = await session.execute(stmt)
+            return [self.from_sql_build(sql_build) for sql_build in result.unique().scalars().all()]
 
-        # TODO: This is not trtivial in SQLAlchemy, so we keep the supabase client to do this.
-        db = DatabaseManager()
-        query = db.table("builds").select(all_build_columns)
+    async def iter_builds(self, query: BuildQuery | None = None, *, batch_size: int = 500) -> AsyncIterator[Build]:
+        """Iterates over all builds matching the query, fetching them in batches.
 
-        if filter is not None:  # TODO: Support more complex filters (in_ being the most important)
-            for column, value in filter.items():
-                query = query.eq(column, value)
+        Each batch is fetched with keyset pagination in its own short-lived session, so memory usage stays flat
+        no matter how many builds are walked, and no transaction is held open between batches. This is meant for
+        bulk jobs such as re-embedding, re-titling, exports and audits.
 
-        response: APIResponse[JoinedBuildRecord] = await query.execute()
-        if not response:
-            return []
-        return [self._from_json(build_json) for build_json in response.data]
+        Args:
+            query: The query to run. Its ordering and limit are respected. Defaults to all builds ordered by id.
+            batch_size: The number of builds to fetch per round trip.
+
+        Yields:
+            Build objects, in the order the query specifies.
+        """
+        if batch_size <= 0:
+            msg = "batch_size must be positive."
+            raise ValueError(msg)
+
+        page = query or BuildQuery()
+        remaining = page.max_rows
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            builds = await self.get_builds(page.limit(size))
+            for build in builds:
+                yield build
+            if len(builds) < size:
+                return
+            if remaining is not None:
+                remaining -= len(builds)
+            page = page.after(builds[-1])
 
     async def get_builds_by_id(self, build_ids: list[int]) -> list[Build | None]:
         """Fetches builds from the database with the given IDs."""
         if len(build_ids) == 0:
             return []
 
+        # Create result list with None placeholders, filled in from the cache first
+        builds: list[Build | None] = [self.cache.get(build_id) for build_id in build_ids]
+        missing_ids = {build_id for build_id, build in zip(build_ids, builds, strict=True) if build is None}
+        if not missing_ids:
+            return builds
+
+        tokens = {build_id: self.cache.token(build_id) for build_id in missing_ids}
         async with self.session() as session:
             stmt = (
                 select(SQLBuild)
-                .options(
-                    selectinload(SQLBuild.build_creators).selectinload(BuildCreator.user),
-                    selectinload(SQLBuild.build_restrictions).selectinload(BuildRestriction.restriction),
-                    selectinload(SQLBuild.build_versions).selectinload(BuildVersion.version),
-                    selectinload(SQLBuild.build_types).selectinload(BuildType.type),
-                    selectinload(SQLBuild.links),
-                    selectinload(SQLBuild.messages),
-                )
-                .where(SQLBuild.id.in_(build_ids))
+                .options(*BUILD_LOAD_OPTIONS, selectinload(SQLBuild.messages))
+                .where(SQLBuild.id.in_(missing_ids))
             )
             result = await session.execute(stmt)
             sql_builds = result.scalars().all()
 
-            # Create result list with None placeholders
-            builds: list[Build | None] = [None] * len(build_ids)
-
             # Fill in the found builds at their correct positions
-            for sql_build in sql_builds:
-                idx = build_ids.index(sql_build.id)
-                builds[idx] = self.from_sql_build(sql_build)
-            return builds
+            fetched = {sql_build.id: self.from_sql_build(sql_build) for sql_build in sql_builds}
+
+        for build in fetched.values():
+            self.cache.put(build, token=tokens[build.id])  # type: ignore[index]  # fetched builds always have an id
+        for idx, build_id in enumerate(build_ids):
+            if builds[idx] is None and build_id in fetched:
+                builds[idx] = fetched[build_id]
+        return builds
 
     async def get_unsent_builds(self, server_id: int) -> list[Build] | None:
         """Get all the builds that have not been posted on the server"""
@@ -698,55 +716,204 @@ async def get_unsent_builds(self, server_id: int) -> list[Build] | None:
         # server_unsent_builds = response.data
         # return [Build.from_json(unsent_sub) for unsent_sub in server_unsent_builds]
 
-    async def _get_smallest_door_records_without_title_in_db(self) -> Sequence[SmallestDoor]:
-        """Get all the smallest door records that do not have a title in the database."""
-        stmt = select(SmallestDoor).where(SmallestDoor.title.is_(None))
+    @staticmethod
+    def _door_record_title(
+        record_category: RecordCategoryLiteral, row: Row[Any], name_to_restriction: Mapping[str, Restriction]
+    ) -> str:
+        """Generate the title of a door record from its row in a door records table."""
+        build = Build(
+            # These are invariants by the fact that they are in a door records table
+            record_category=record_category,
+            category=BuildCategory.DOOR,
+            submission_status=Status.CONFIRMED,
+            # We assume ai_generated is False to generate the simpler title
+            ai_generated=False,
+            # from the table
+            door_width=row.door_width,
+            door_height=row.door_height,
+            door_depth=row.door_depth,
+            door_type=row.types,
+            door_orientation_type=row.orientation,
+        )
+        build.set_restrictions_from_map(row.restriction_subset, name_to_restriction)
+        title = build.title
+        if getattr(row, "metric", None) == "visible":
+            title = title.replace("Fastest ", "Fastest Visible ", 1)
+        return title
+
+    async def _load_restriction_map(self) -> dict[str, Restriction]:
+        """Load every restriction, keyed by its lowercased name, for `Build.set_restrictions_from_map`."""
         async with self.session() as session:
-            result = await session.execute(stmt)
-            return result.scalars().all()
+            restrictions = (await session.execute(select(Restriction))).scalars().all()
+        return {r.name.lower(): r for r in restrictions}
 
-    async def update_smallest_door_records_without_title(self) -> None:
-        """Update the titles of all records in the database."""
-        smallest_door_records_without_title = await self._get_smallest_door_records_without_title_in_db()
-        async with self.session() as session:
-            for door in smallest_door_records_without_title:
-                # Generate a title based on the door's attributes
-                build = Build(
-                    id=door.id,
-                    # These are invariants by the fact that they are in the smallest_door_records table
-                    record_category="Smallest",
-                    category=BuildCategory.DOOR,
-                    submission_status=Status.CONFIRMED,
-                    # We assume ai_generated is False to generate the simpler title
-                    ai_generated=False,
-                    # from the table
-                    door_width=door.door_width,
-                    door_height=door.door_height,
-                    door_depth=door.door_depth,
-                    door_type=door.types,
-                    door_orientation_type=door.orientation,
-                )
-                await build.set_restrictions_auto(door.restriction_subset)
-                door.title = build.title
-                session.add(door)
-            await session.commit()
+    @staticmethod
+    def _untitled_door_records_stmt(model: type[DoorRecordModel]) -> Select[Any]:
+        """Select the columns a door record title depends on, for the records without a title."""
+        columns: list[InstrumentedAttribute[Any]] = [
+            model.record_id,
+            model.door_width,
+            model.door_height,
+            model.door_depth,
+            model.types,
+            model.orientation,
+            model.restriction_subset,
+        ]
+        if model is FastestDoor:
+            columns.append(FastestDoor.metric)
+        return select(*columns).where(model.title.is_(None)).order_by(model.record_id)
+
+    async def _write_door_record_titles(
+        self,
+        session: AsyncSession,
+        record_category: RecordCategoryLiteral,
+        rows: Sequence[Row[Any]],
+        name_to_restriction: Mapping[str, Restriction],
+    ) -> None:
+        """Title the given rows of `_untitled_door_records_stmt` with a single UPDATE."""
+        model = DOOR_RECORD_MODELS[record_category]
+        titles = values(column("record_id", BigInteger), column("title", String), name="titles").data(
+            [(row.record_id, self._door_record_title(record_category, row, name_to_restriction)) for row in rows]
+        )
+        await session.execute(
+            update(model)
+            .where(model.record_id == titles.c.record_id)
+            .values(title=titles.c.title)
+            .execution_options(synchronize_session=False)
+        )
 
-    @alru_cache(ttl=3600)  # 1 hour
-    async def fetch_all_smallest_door_records(self) -> Sequence[SmallestDoor]:
-        stmt = select(SmallestDoor)
+    async def update_door_records_without_title(self, *, chunk_size: int = 1000) -> TitleBackfillStats:
+        """Update the titles of all records in the database, in every record category.
+
+        Untitled records are read in chunks of only the columns the title depends on, titled in memory against a
+        restriction map loaded once, and written back with one `UPDATE ... FROM (VALUES ...)` per chunk. Each chunk is
+        committed on its own, so a large backfill never holds a long transaction.
+
+        Args:
+            chunk_size: The number of records to title per statement.
+
+        Returns:
+            The throughput of the backfill.
+        """
+        stats = TitleBackfillStats()
+        start = time.perf_counter()
+        name_to_restriction = await self._load_restriction_map()
+
+        for record_category, model in DOOR_RECORD_MODELS.items():
+            titled = 0
+            last_record_id = 0
+            while True:
+                async with self.session() as session:
+                    stmt = (
+                        self._untitled_door_records_stmt(model)
+                        .where(model.record_id > last_record_id)
+                        .limit(chunk_size)
+                    )
+                    rows = (await session.execute(stmt)).all()
+                    if not rows:
+                        break
+                    last_record_id = rows[-1].record_id
+                    await self._write_door_record_titles(session, record_category, rows, name_to_restriction)
+                    await session.commit()
+                titled += len(rows)
+                stats.chunks += 1
+
+            stats.records += titled
+            index = self.record_indexes[record_category]
+            if titled and index.loaded:
+                await index.refresh(self.session)
+
+        stats.seconds = time.perf_counter() - start
+        if stats.records:
+            logger.info(
+                "Titled %d door records in %d chunks (%.2fs, %.0f records/s)",
+                stats.records,
+                stats.chunks,
+                stats.seconds,
+                stats.records_per_second,
+            )
+        return stats
+
+    async def sync_door_records(self, record_category: RecordCategoryLiteral, record_ids: Sequence[int]) -> None:
+        """Title the given door records if they have no title yet, and bring them up to date in the search index.
+
+        Args:
+            record_category: The category of the records.
+            record_ids: The records that were created, changed or deleted.
+        """
+        model = DOOR_RECORD_MODELS[record_category]
         async with self.session() as session:
-            result = await session.execute(stmt)
-            return result.scalars().all()
+            stmt = self._untitled_door_records_stmt(model).where(model.record_id.in_(record_ids))
+            rows = (await session.execute(stmt)).all()
+            if rows:
+                await self._write_door_record_titles(session, record_category, rows, await self._load_restriction_map())
+                await session.commit()
+
+        index = self.record_indexes[record_category]
+        if index.loaded:
+            await index.refresh_records(self.session, record_ids)
+
+    async def handle_door_records_notification(self, payload: str) -> None:
+        """Handle a notification sent on the `door_records` channel when door records change.
+
+        Args:
+            payload: A JSON object with the `table`, `op` and `record_ids` of the change.
+        """
+        data = json.loads(payload)
+        record_category = _DOOR_RECORD_CATEGORY_BY_TABLE[data["table"]]
+        await self.sync_door_records(record_category, data["record_ids"])
 
-    @alru_cache(ttl=3600)  # 1 hour
-    async def search_smallest_door_records(self, query: str, limit: int = 25) -> list[tuple[SmallestDoor, float, int]]:
-        """Search for smallest door records by title."""
-        records = await self.fetch_all_smallest_door_records()
-        records = [r for r in records if r.title is not None]  # Filter out records without titles
+    async def resync_door_records(self) -> None:
+        """Title every untitled door record and refresh the search indexes.
 
-        def processor(raw: str | SmallestDoor) -> str:
-            if isinstance(raw, SmallestDoor):
-                return raw.title  # type: ignore  # Title is never None here
-            return raw
+        Used to catch up after changes were missed, e.g. when the notification listener was disconnected.
+        """
+        await self.update_door_records_without_title()
+        for index in self.record_indexes.values():
+            if index.loaded:
+                await index.refresh(self.session)
+
+    def register_caches(self, bus: InvalidationBus) -> None:
+        """Evicts cached builds when they change in the database, e.g. when saved by another process."""
+        bus.register("builds", self._invalidate_builds)
+
+    def _invalidate_builds(self, invalidation: Invalidation) -> None:
+        if invalidation.keys is None:
+            self.cache.clear()
+            return
+        for build_id in invalidation.keys:
+            self.cache.invalidate(int(build_id))
+
+    async def search_door_records(
+        self,
+        record_category: RecordCategoryLiteral,
+        query: str,
+        limit: int = 25,
+        *,
+        orientation: DoorOrientationLiteral | None = None,
+        door_size: tuple[int, int] | None = None,
+    ) -> list[tuple[IndexedRecord, float, int]]:
+        """Search for door records of a category by title.
 
-        return process.extract(query, records, limit=limit, processor=processor)
+        Args:
+            record_category: The category of records to search.
+            query: The title to search for.
+            limit: The maximum number of results.
+            orientation: Only search doors with this orientation.
+            door_size: Only search doors with this (width, height).
+        """
+        index = self.record_indexes[record_category]
+        if not index.loaded:
+            await index.refresh(self.session)
+        return index.search(query, limit=limit, orientation=orientation, door_size=door_size)
+
+    async def search_smallest_door_records(
+        self,
+        query: str,
+        limit: int = 25,
+        *,
+        orientation: DoorOrientationLiteral | None = None,
+        door_size: tuple[int, int] | None = None,
+    ) -> list[tuple[IndexedRecord, float, int]]:
+        """Search for smallest door records by title. See `search_door_records`."""
+        return await self.search_door_records("Smallest", query, limit, orientation=orientation, door_size=door_size)
@@ -0,0 +1,266 @@
+"""A typed, composable query builder for builds."""
+
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Literal
+
+from sqlalchemy import ColumnElement, DateTime, Integer, Select, exists, false, func, literal, or_, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, selectinload
+
+from squid.db.builds import Build
+from squid.db.schema import (
+    Build as SQLBuild,
+)
+from squid.db.schema import (
+    BuildCategory,
+    BuildCreator,
+    BuildRestriction,
+    BuildType,
+    BuildVersion,
+    Door,
+    DoorOrientationLiteral,
+    RecordCategoryLiteral,
+    Restriction,
+    Status,
+    Type,
+)
+from squid.db.version_resolver import version_ordinal
+from squid.utils import parse_version_string
+
+BUILD_LOAD_OPTIONS = (
+    selectinload(SQLBuild.build_creators).selectinload(BuildCreator.user),
+    selectinload(SQLBuild.build_restrictions).selectinload(BuildRestriction.restriction),
+    selectinload(SQLBuild.build_versions).selectinload(BuildVersion.version),
+    selectinload(SQLBuild.build_types).selectinload(BuildType.type),
+    selectinload(SQLBuild.links),
+)
+"""Loader options that eagerly load everything `BuildManager.from_sql_build` needs."""
+
+type RangeField = Literal[
+    "width",
+    "height",
+    "depth",
+    "door_width",
+    "door_height",
+    "door_depth",
+    "normal_opening_time",
+    "normal_closing_time",
+    "visible_opening_time",
+    "visible_closing_time",
+]
+type OrderField = Literal["id", "edited_time"]
+type BuildCursor = tuple[int | datetime | None, int]
+"""The position of a build in an ordering: the value of the ordered column, and the build id as a tiebreaker."""
+
+_BUILD_RANGE_COLUMNS: dict[str, InstrumentedAttribute[int | None]] = {
+    "width": SQLBuild.width,
+    "height": SQLBuild.height,
+    "depth": SQLBuild.depth,
+}
+_DOOR_RANGE_COLUMNS: dict[str, InstrumentedAttribute[int | None]] = {
+    "door_width": Door.door_width,  # type: ignore[dict-item]
+    "door_height": Door.door_height,  # type: ignore[dict-item]
+    "door_depth": Door.door_depth,
+    "normal_opening_time": Door.normal_opening_time,
+    "normal_closing_time": Door.normal_closing_time,
+    "visible_opening_time": Door.visible_opening_time,
+    "visible_closing_time": Door.visible_closing_time,
+}
+_NEVER_EDITED = datetime.min.replace(tzinfo=UTC)
+"""Stands in for a NULL `edited_time` when ordering, so those builds sort first instead of dropping out of pages."""
+
+
+def _restriction_exists(condition: ColumnElement[bool]) -> ColumnElement[bool]:
+    """Whether the build has a restriction matching the condition, as a single correlated EXISTS."""
+    return exists().where(
+        BuildRestriction.build_id == SQLBuild.id,
+        BuildRestriction.restriction_id == Restriction.id,
+        condition,
+    )
+
+
+def _type_exists(condition: ColumnElement[bool]) -> ColumnElement[bool]:
+    """Whether the build has a type matching the condition, as a single correlated EXISTS."""
+    return exists().where(BuildType.build_id == SQLBuild.id, BuildType.type_id == Type.id, condition)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class BuildQuery:
+    """An immutable description of a query over builds.
+
+    Every method returns a new query, so partial queries can be shared and extended freely. Conditions are combined
+    with AND. The query compiles to a single SQLAlchemy statement with `to_statement`, and is run by
+    `BuildManager.get_builds` or `BuildManager.iter_builds`.
+
+    Example:
+        ```python
+        query = (
+            BuildQuery()
+            .where_status(Status.CONFIRMED)
+            .where_range("door_width", minimum=2, maximum=3)
+            .with_restrictions("Seamless")
+            .order_by("edited_time", descending=True)
+            .limit(25)
+        )
+        builds = await db.build.get_builds(query)
+        ```
+    """
+
+    ids: tuple[int, ...] | None = None
+    statuses: tuple[Status, ...] | None = None
+    categories: tuple[BuildCategory, ...] | None = None
+    record_categories: tuple[RecordCategoryLiteral | None, ...] | None = None
+    orientations: tuple[DoorOrientationLiteral, ...] | None = None
+    ranges: tuple[tuple[RangeField, int | None, int | None], ...] = ()
+    required_restrictions: tuple[str, ...] = ()
+    excluded_restrictions: tuple[str, ...] = ()
+    required_types: tuple[str, ...] = ()
+    any_versions: tuple[str, ...] | None = None
+    order: OrderField = "id"
+    descending: bool = False
+    cursor: BuildCursor | None = None
+    max_rows: int | None = None
+
+    def where_id(self, *build_ids: int) -> BuildQuery:
+        """Only match builds with one of the given ids."""
+        return dataclasses.replace(self, ids=tuple(build_ids))
+
+    def where_status(self, *statuses: Status) -> BuildQuery:
+        """Only match builds with one of the given submission statuses."""
+        return dataclasses.replace(self, statuses=tuple(statuses))
+
+    def where_category(self, *categories: BuildCategory) -> BuildQuery:
+        """Only match builds in one of the given categories."""
+        return dataclasses.replace(self, categories=tuple(categories))
+
+    def where_record_category(self, *record_categories: RecordCategoryLiteral | None) -> BuildQuery:
+        """Only match builds with one of the given record categories. Pass None to match builds without one."""
+        return dataclasses.replace(self, record_categories=tuple(record_categories))
+
+    def where_orientation(self, *orientations: DoorOrientationLiteral) -> BuildQuery:
+        """Only match doors with one of the given orientations."""
+        return dataclasses.replace(self, orientations=tuple(orientations))
+
+    def where_range(self, field: RangeField, *, minimum: int | None = None, maximum: int | None = None) -> BuildQuery:
+        """Only match builds whose `field` is within [minimum, maximum]. Either bound can be omitted."""
+        if field not in _BUILD_RANGE_COLUMNS and field not in _DOOR_RANGE_COLUMNS:
+            msg = f"Cannot filter builds by a range over {field!r}."
+            raise ValueError(msg)
+        return dataclasses.replace(self, ranges=(*self.ranges, (field, minimum, maximum)))
+
+    def with_restrictions(self, *names: str) -> BuildQuery:
+        """Only match builds that have all the given restrictions."""
+        return dataclasses.replace(self, required_restrictions=(*self.required_restrictions, *names))
+
+    def without_restrictions(self, *names: str) -> BuildQuery:
+        """Only match builds that have none of the given restrictions."""
+        return dataclasses.replace(self, excluded_restrictions=(*self.excluded_restrictions, *names))
+
+    def with_types(self, *names: str) -> BuildQuery:
+        """Only match builds that have all the given types (e.g. "Funnel")."""
+        return dataclasses.replace(self, required_types=(*self.required_types, *names))
+
+    def with_any_version(self, *versions: str) -> BuildQuery:
+        """Only match builds that work in at least one of the given versions, e.g. "Java 1.20.4"."""
+        return dataclasses.replace(self, any_versions=tuple(versions))
+
+    def order_by(self, field: OrderField, *, descending: bool = False) -> BuildQuery:
+        """Order the results by the given field, using the build id as a tiebreaker. Resets the cursor."""
+        return dataclasses.replace(self, order=field, descending=descending, cursor=None)
+
+    def after(self, cursor: BuildCursor | Build) -> BuildQuery:
+        """Only match builds that come after the given position in the ordering (keyset pagination).
+
+        Args:
+            cursor: Either the last build of the previous page, or a cursor obtained from `cursor_of`.
+        """
+        if isinstance(cursor, Build):
+            cursor = self.cursor_of(cursor)
+        return dataclasses.replace(self, cursor=cursor)
+
+    def limit(self, max_rows: int | None) -> BuildQuery:
+        """Return at most `max_rows` builds. Pass None to remove the limit."""
+        if max_rows is not None and max_rows < 0:
+            msg = "The limit must not be negative."
+            raise ValueError(msg)
+        return dataclasses.replace(self, max_rows=max_rows)
+
+    def cursor_of(self, build: Build) -> BuildCursor:
+        """Returns the position of a build in this query's ordering."""
+        if build.id is None:
+            msg = "Cannot paginate after a build that is not in the database."
+            raise ValueError(msg)
+        return (build.id if self.order == "id" else build.edited_time, build.id)
+
+    @property
+    def only_doors(self) -> bool:
+        """Whether the query filters on door-specific columns, and therefore only matches doors."""
+        return self.orientations is not None or any(field in _DOOR_RANGE_COLUMNS for field, _, _ in self.ranges)
+
+    def to_statement(self) -> Select[tuple[SQLBuild]]:
+        """Compiles the query into a SQLAlchemy statement."""
+        entity: type[SQLBuild] = Door if self.only_doors else SQLBuild
+        stmt = select(entity).options(*BUILD_LOAD_OPTIONS).where(*self._conditions())
+
+        if self.order == "id":
+            # The id is unique, so it needs no tiebreaker
+            keys: list[ColumnElement[datetime] | InstrumentedAttribute[int]] = [SQLBuild.id]
+            bounds: list[ColumnElement[int] | ColumnElement[datetime]] = (
+                [] if self.cursor is None else [literal(self.cursor[1], Integer)]
+            )
+        else:
+            never_edited = literal(_NEVER_EDITED, DateTime(timezone=True))
+            keys = [func.coalesce(SQLBuild.edited_time, never_edited), SQLBuild.id]
+            bounds = []
+            if self.cursor is not None:
+                edited_time, build_id = self.cursor
+                bounds = [literal(edited_time or _NEVER_EDITED, DateTime(timezone=True)), literal(build_id, Integer)]
+
+        if bounds:
+            position = keys[0] if len(keys) == 1 else tuple_(*keys)
+            bound = bounds[0] if len(bounds) == 1 else tuple_(*bounds)
+            stmt = stmt.where(position < bound if self.descending else position > bound)
+        stmt = stmt.order_by(*(key.desc() if self.descending else key.asc() for key in keys))
+        if self.max_rows is not None:
+            stmt = stmt.limit(self.max_rows)
+        return stmt  # type: ignore[return-value]
+
+    def _conditions(self) -> Iterable[ColumnElement[bool]]:
+        if self.ids is not None:
+            yield SQLBuild.id.in_(self.ids)
+        if self.statuses is not None:
+            yield SQLBuild.submission_status.in_(self.statuses)
+        if self.categories is not None:
+            yield SQLBuild.category.in_(self.categories)
+        if self.record_categories is not None:
+            named = [c for c in self.record_categories if c is not None]
+            condition = SQLBuild.record_category.in_(named)
+            if None in self.record_categories:
+                condition = condition | SQLBuild.record_category.is_(None)
+            yield condition
+        if self.orientations is not None:
+            yield Door.orientation.in_(self.orientations)
+
+        for field, minimum, maximum in self.ranges:
+            column = _BUILD_RANGE_COLUMNS.get(field) or _DOOR_RANGE_COLUMNS[field]
+            if minimum is not None:
+                yield column >= minimum
+            if maximum is not None:
+                yield column <= maximum
+
+        for name in self.required_restrictions:
+            yield _restriction_exists(func.lower(Restriction.name) == name.lower())
+        if self.excluded_restrictions:
+            excluded = [name.lower() for name in self.excluded_restrictions]
+            yield ~_restriction_exists(func.lower(Restriction.name).in_(excluded))
+        for name in self.required_types:
+            yield _type_exists(func.lower(Type.name) == name.lower())
+
+        if self.any_versions is not None:
+            ordinals = [version_ordinal(*parse_version_string(v)) for v in self.any_versions]
+            # Containment checks on the GiST indexed version ranges, which also match open-ended specs like "1.19+"
+            yield or_(false(), *(SQLBuild.version_ranges.op("@>")(literal(o, Integer)) for o in ordinals))
@@ -0,0 +1,161 @@
+"""Hybrid build search, combining semantic similarity with fuzzy title matching."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from squid.db.schema import Status
+
+if TYPE_CHECKING:
+    from squid.db.build_manager import BuildManager
+    from squid.db.embeddings import QueryEmbeddingCache
+    from squid.db.vector_store import VectorMatch, VectorStore
+
+DEFAULT_VECTOR_WEIGHT = 0.6
+DEFAULT_CANDIDATES = 50
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """A build matched by a hybrid search.
+
+    All scores are between 0 and 1, higher is better.
+    """
+
+    build_id: int
+    score: float
+    vector_score: float
+    title_score: float
+
+
+@dataclass(frozen=True, slots=True)
+class SearchPage:
+    """A page of hybrid search results."""
+
+    hits: list[SearchHit]
+    page: int
+    """The page number, starting from 1."""
+    per_page: int
+    total: int
+    """The total number of hits across all pages."""
+
+    @property
+    def page_count(self) -> int:
+        """The number of pages available."""
+        return max(1, math.ceil(self.total / self.per_page))
+
+    @property
+    def has_next(self) -> bool:
+        """Whether there is a page after this one."""
+        return self.page < self.page_count
+
+
+def fuse_scores(
+    vector_matches: Iterable[VectorMatch],
+    title_matches: Iterable[tuple[int, float]],
+    *,
+    vector_weight: float = DEFAULT_VECTOR_WEIGHT,
+) -> list[SearchHit]:
+    """Combines semantic and title matches into a single ranking.
+
+    The score of a build is a weighted sum of its vector score and its title score. A build found by only one of the
+    searches gets 0 for the other.
+
+    Args:
+        vector_matches: Matches from the vector store. The cosine distance (0 to 2) is mapped to a score from 1 to 0.
+        title_matches: Pairs of (build id, rapidfuzz score from 0 to 100).
+        vector_weight: How much the vector score counts, between 0 and 1. The title score gets the rest.
+
+    Returns:
+        The hits, best first. Ties are broken by build id so the order is stable across pages.
+    """
+    if not 0 <= vector_weight <= 1:
+        msg = "vector_weight must be between 0 and 1."
+        raise ValueError(msg)
+
+    vector_scores = {match.build_id: max(0.0, 1 - match.distance / 2) for match in vector_matches}
+    title_scores: dict[int, float] = {}
+    for build_id, score in title_matches:
+        title_scores[build_id] = max(title_scores.get(build_id, 0.0), score / 100)
+
+    hits = [
+        SearchHit(
+            build_id=build_id,
+            score=vector_weight * vector_scores.get(build_id, 0.0)
+            + (1 - vector_weight) * title_scores.get(build_id, 0.0),
+            vector_score=vector_scores.get(build_id, 0.0),
+            title_score=title_scores.get(build_id, 0.0),
+        )
+        for build_id in vector_scores.keys() | title_scores.keys()
+    ]
+    hits.sort(key=lambda hit: (-hit.score, hit.build_id))
+    return hits
+
+
+def paginate(hits: list[SearchHit], *, page: int, per_page: int) -> SearchPage:
+    """Returns one page of the hits. Pages start from 1."""
+    if page < 1:
+        msg = "page must be at least 1."
+        raise ValueError(msg)
+    if per_page < 1:
+        msg = "per_page must be at least 1."
+        raise ValueError(msg)
+    start = (page - 1) * per_page
+    return SearchPage(hits=hits[start : start + per_page], page=page, per_page=per_page, total=len(hits))
+
+
+class BuildSearch:
+    """Searches builds by both meaning and title."""
+
+    def __init__(
+        self,
+        builds: BuildManager,
+        vectors: VectorStore,
+        query_embeddings: QueryEmbeddingCache,
+        *,
+        vector_weight: float = DEFAULT_VECTOR_WEIGHT,
+        candidates: int = DEFAULT_CANDIDATES,
+    ) -> None:
+        """Initializes the searcher.
+
+        Args:
+            builds: Used for the fuzzy title search.
+            vectors: Used for the semantic search.
+            query_embeddings: Caches the embeddings of search queries.
+            vector_weight: How much the semantic score counts in the combined score, between 0 and 1.
+            candidates: How many results to take from each search before combining them.
+        """
+        self.builds = builds
+        self.vectors = vectors
+        self.query_embeddings = query_embeddings
+        self.vector_weight = vector_weight
+        self.candidates = candidates
+
+    async def search(self, query: str, *, page: int = 1, per_page: int = 5, status: Status | None = None) -> SearchPage:
+        """Searches for builds matching the query.
+
+        If the query cannot be embedded (e.g. the embeddings API is down), only the title search is used.
+
+        Args:
+            query: The search query, in natural language.
+            page: The page of results to return, starting from 1.
+            per_page: The number of results per page.
+            status: Only return semantic matches with this submission status.
+        """
+        embedding, title_matches = await asyncio.gather(
+            self.query_embeddings.get(query),
+            self.builds.search_smallest_door_records(query, limit=self.candidates),
+        )
+        vector_matches = (
+            await self.vectors.query(embedding, top_k=self.candidates, status=status) if embedding is not None else []
+        )
+        hits = fuse_scores(
+            vector_matches,
+            [(record.id, score) for record, score, _ in title_matches],
+            vector_weight=self.vector_weight,
+        )
+        return paginate(hits, page=page, per_page=per_page)
@@ -4,12 +4,12 @@
 from collections.abc import Sequence
 from typing import Literal
 
-from async_lru import alru_cache
-from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from squid.db.schema import Restriction, RestrictionAlias, Type
+from squid.db.invalidation import InvalidationBus
+from squid.db.schema import Restriction, RestrictionAlias
+from squid.db.tag_catalog import RestrictionMatch, TagCatalog
 
 
 class RestrictionError(Exception):
@@ -17,8 +17,10 @@ class RestrictionError(Exception):
 
 
 class RestrictionNotFound(RestrictionError):
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, suggestions: Sequence[str] = ()) -> None:
         self.name = name
+        self.suggestions = list(suggestions)
+        """Names of existing restrictions that are close to `name`, best first."""
         super().__init__(f"Restriction '{name}' does not exist")
 
 
@@ -41,6 +43,8 @@ class BuildTagsManager:
 
     def __init__(self, session: async_sessionmaker[AsyncSession]):
         self.session = session
+        self.catalog = TagCatalog(session)
+        """Answers every lookup of this manager from memory."""
 
     async def get_restriction_id(self, name_or_alias: str) -> int | None:
         """Find a restriction by its name or alias.
@@ -51,30 +55,34 @@ async def get_restriction_id(self, name_or_alias: str) -> int | None:
         Returns:
             The ID of the restriction if found, otherwise None.
         """
-        async with self.session() as session:
-            # Try to find by name
-            stmt = select(Restriction).where(Restriction.name.ilike(f"%{name_or_alias}%"))
-            result = await session.execute(stmt)
-            restriction = result.scalar_one_or_none()
-            if restriction:
-                return restriction.id
-
-            # Try to find by alias
-            stmt = select(RestrictionAlias).where(RestrictionAlias.alias.ilike(f"%{name_or_alias}%"))
-            result = await session.execute(stmt)
-            alias = result.scalar_one_or_none()
-            if alias:
-                return alias.restriction_id
-
-            return None
-
-    # TODO: Invalidate cache every, say, 1 day (or make supabase callback whenever the table is updated)
-    @alru_cache
+        await self.catalog.ensure_loaded("restrictions", "restriction_aliases")
+        restriction = self.catalog.get_restriction(name_or_alias)
+        return None if restriction is None else restriction.id
+
+    async def resolve_restriction(
+        self, query: str, *, limit: int = 5, score_cutoff: float = 0
+    ) -> list[RestrictionMatch]:
+        """Find the restrictions whose name or alias best match the query, tolerating typos.
+
+        Args:
+            query: The restriction name or alias to look for.
+            limit: The maximum number of restrictions returned.
+            score_cutoff: Only return matches scoring at least this much, between 0 and 100.
+
+        Returns:
+            The matches with their scores, best first.
+        """
+        await self.catalog.ensure_loaded("restrictions", "restriction_aliases")
+        return self.catalog.resolve_restriction(query, limit=limit, score_cutoff=score_cutoff)
+
+    def register_caches(self, bus: InvalidationBus) -> None:
+        """Invalidates the caches of this manager when the tables they were loaded from change."""
+        self.catalog.register_caches(bus)
+
     async def fetch_all_restrictions(self) -> list[Restriction]:
         """Fetches all restrictions from the database."""
-        async with self.session() as session:
-            result = await session.execute(select(Restriction))
-            return list(result.scalars().all())
+        await self.catalog.ensure_loaded("restrictions")
+        return self.catalog.restrictions
 
     async def get_restrictions_by_names(self, name_or_alias: list[str]) -> list[Restriction]:
         """Get restrictions by their names or aliases.
@@ -100,9 +108,12 @@ async def add_restriction_alias_by_id(self, restriction_id: int, alias: str) ->
                 restriction_alias = RestrictionAlias(restriction_id=restriction_id, alias=alias)
                 session.add(restriction_alias)
                 await session.commit()
+                # Don't wait for the invalidation bus, the alias should be usable right away
+                await self.catalog.reload("restriction_aliases")
             except IntegrityError:
                 # Likely because the alias is already taken by another restriction.
                 await session.rollback()
+                await self.catalog.reload("restriction_aliases")
                 alias_rid = await self.get_restriction_id(alias)
                 assert alias_rid is not None
                 raise AliasAlreadyAdded(alias, alias_rid) from None
@@ -121,7 +132,8 @@ async def add_restriction_alias(self, name_or_alias: str, alias: str) -> None:
         """
         rid, alias_rid = await asyncio.gather(self.get_restriction_id(name_or_alias), self.get_restriction_id(alias))
         if rid is None:
-            raise RestrictionNotFound(name_or_alias)
+            matches = await self.resolve_restriction(name_or_alias, limit=3, score_cutoff=60)
+            raise RestrictionNotFound(name_or_alias, [match.restriction.name for match in matches])
 
         if alias_rid is not None:
             if alias_rid == rid:
@@ -141,10 +153,8 @@ async def get_valid_restrictions(
         Returns:
             A list of valid restrictions for the given type.
         """
-        async with self.session() as session:
-            stmt = select(Restriction.name).where(Restriction.type == type)
-            result = await session.execute(stmt)
-            return result.scalars().all()
+        await self.catalog.ensure_loaded("restrictions")
+        return self.catalog.restriction_names(type)
 
     async def get_valid_door_types(self) -> Sequence[str]:
         """Gets a list of valid door types. The door types are returned in the original case.
@@ -152,10 +162,8 @@ async def get_valid_door_types(self) -> Sequence[str]:
         Returns:
             A list of valid door types.
         """
-        async with self.session() as session:
-            stmt = select(Type.name).where(Type.build_category == "Door")
-            result = await session.execute(stmt)
-            return result.scalars().all()
+        await self.catalog.ensure_loaded("types")
+        return self.catalog.type_names("Door")
 
     async def validate_restrictions(
         self, restrictions: list[str], type: Literal["component", "wiring-placement", "miscellaneous"]
@@ -169,11 +177,8 @@ async def validate_restrictions(
         Returns:
             (valid_restrictions, invalid_restrictions)
         """
-        all_valid_restrictions = [r.lower() for r in await self.get_valid_restrictions(type)]
-
-        valid_restrictions = [r for r in restrictions if r.lower() in all_valid_restrictions]
-        invalid_restrictions = [r for r in restrictions if r not in all_valid_restrictions]
-        return valid_restrictions, invalid_restrictions
+        await self.catalog.ensure_loaded("restrictions")
+        return self.catalog.validate_restrictions(restrictions, type)
 
     async def validate_door_types(self, door_types: list[str]) -> tuple[list[str], list[str]]:
         """Validates a list of door types.
@@ -184,8 +189,5 @@ async def validate_door_types(self, door_types: list[str]) -> tuple[list[str], l
         Returns:
             (valid_door_types, invalid_door_types)
         """
-        all_valid_door_types = [t.lower() for t in await self.get_valid_door_types()]
-
-        valid_door_types = [t for t in door_types if t.lower() in all_valid_door_types]
-        invalid_door_types = [t for t in door_types if t.lower() not in all_valid_door_types]
-        return valid_door_types, invalid_door_types
+        await self.catalog.ensure_loaded("types")
+        return self.catalog.validate_types(door_types, "Door")
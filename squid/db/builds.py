@@ -7,7 +7,7 @@
 import time
 import typing
 import warnings
-from collections.abc import Awaitable, Callable, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
 from functools import cached_property
@@ -16,9 +16,11 @@
 from typing import Any, Final, Literal, Self, overload
 
 import discord
-from openai import AsyncOpenAI, OpenAIError
+from openai import AsyncOpenAI
 from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import Range
 
+from squid.db.embeddings import embed_texts
 from squid.db.schema import (
     Build as SQLBuild,
 )
@@ -33,6 +35,7 @@
     LinkRecord,
     MessageRecord,
     RecordCategoryLiteral,
+    Restriction,
     RestrictionRecord,
     RestrictionTypeLiteral,
     Status,
@@ -42,7 +45,9 @@
     UtilityRecord,
     VersionRecord,
 )
-from squid.utils import parse_time_string
+from squid.db.tag_catalog import CONFIDENT_MATCH_SCORE
+from squid.db.version_resolver import version_ordinal, version_ranges
+from squid.utils import parse_time_string, parse_version_string
 
 logger = logging.getLogger(__name__)
 
@@ -355,66 +360,28 @@ async def ai_generate_from_message(
         build.record_category = variables["record_category"]  # type: ignore
         build.extra_info["unknown_restrictions"] = UnknownRestrictions()
 
-        validation_tasks: list[tuple[str, Awaitable[tuple[list[str], list[str]]]]] = []
-        build_tags = DatabaseManager().build_tags
+        catalog = DatabaseManager().build_tags.catalog
+        await catalog.ensure_loaded("restrictions", "types")
+        unknown_restrictions = build.extra_info["unknown_restrictions"]
         if variables["component_restriction"] is not None:
-            validation_tasks.append(
-                (
-                    "component",
-                    asyncio.create_task(
-                        build_tags.validate_restrictions(variables["component_restriction"].split(", "), "component")
-                    ),
-                )
+            build.component_restrictions, unknown_restrictions["component_restrictions"] = (
+                catalog.validate_restrictions(variables["component_restriction"].split(", "), "component")
             )
         if variables["wiring_placement_restrictions"] is not None:
-            validation_tasks.append(
-                (
-                    "wiring",
-                    asyncio.create_task(
-                        build_tags.validate_restrictions(
-                            variables["wiring_placement_restrictions"].split(", "), "wiring-placement"
-                        )
-                    ),
+            build.wiring_placement_restrictions, unknown_restrictions["wiring_placement_restrictions"] = (
+                catalog.validate_restrictions(
+                    variables["wiring_placement_restrictions"].split(", "), "wiring-placement"
                 )
             )
         if variables["miscellaneous_restrictions"] is not None:
-            validation_tasks.append(
-                (
-                    "misc",
-                    asyncio.create_task(
-                        build_tags.validate_restrictions(
-                            variables["miscellaneous_restrictions"].split(", "), "miscellaneous"
-                        )
-                    ),
-                )
+            build.miscellaneous_restrictions, unknown_restrictions["miscellaneous_restrictions"] = (
+                catalog.validate_restrictions(variables["miscellaneous_restrictions"].split(", "), "miscellaneous")
             )
         if variables["piston_door_type"] is not None:
-            validation_tasks.append(
-                (
-                    "door_types",
-                    asyncio.create_task(build_tags.validate_door_types(variables["piston_door_type"].split(", "))),
-                )
+            build.door_type, build.extra_info["unknown_patterns"] = catalog.validate_types(
+                variables["piston_door_type"].split(", "), "Door"
             )
 
-        results = await asyncio.gather(*(task for _, task in validation_tasks))
-        for i, (task_type, _) in enumerate(validation_tasks):
-            if task_type == "component":
-                comps = results[i]
-                build.component_restrictions = comps[0]
-                build.extra_info["unknown_restrictions"]["component_restrictions"] = comps[1]
-            elif task_type == "wiring":
-                wirings = results[i]
-                build.wiring_placement_restrictions = wirings[0]
-                build.extra_info["unknown_restrictions"]["wiring_placement_restrictions"] = wirings[1]
-            elif task_type == "misc":
-                miscs = results[i]
-                build.miscellaneous_restrictions = miscs[0]
-                build.extra_info["unknown_restrictions"]["miscellaneous_restrictions"] = miscs[1]
-            elif task_type == "door_types":
-                door_types = results[i]
-                build.door_type = door_types[0]
-                build.extra_info["unknown_patterns"] = door_types[1]
-
         orientation = variables["door_orientation"]
         if orientation == "Normal":
             build.door_orientation_type = "Door"
@@ -455,6 +422,11 @@ def dimensions(self) -> tuple[int | None, int | None, int | None]:
     def dimensions(self, dimensions: tuple[int | None, int | None, int | None]) -> None:
         self.width, self.height, self.depth = dimensions
 
+    @property
+    def version_ranges(self) -> list[Range[int]]:
+        """The version ordinal ranges the build works in, see `squid.db.version_resolver.version_ranges`."""
+        return version_ranges(self.version_spec, self.versions)
+
     @property
     def door_dimensions(self) -> tuple[int | None, int | None, int | None]:
         """The dimensions of the door (hallway)."""
@@ -495,15 +467,31 @@ async def set_restrictions_auto(self, restrictions: Sequence[str]) -> None:
         """Sets the restrictions of the build automatically based on the given list of restriction names.
 
         This method would fetch the restrictions from the database and categorize them into the appropriate lists based on their type.
+        Restrictions can also be given by alias, and small typos are corrected if the intended restriction is clear.
         """
         from squid.db import DatabaseManager
 
+        catalog = DatabaseManager().build_tags.catalog
+        await catalog.ensure_loaded("restrictions", "restriction_aliases")
+        names: list[str] = []
+        for name in restrictions:
+            restriction = catalog.get_restriction(name)
+            if restriction is None and (
+                matches := catalog.resolve_restriction(name, limit=1, score_cutoff=CONFIDENT_MATCH_SCORE)
+            ):
+                restriction = matches[0].restriction
+            if restriction is not None:
+                names.append(restriction.name)
+        self.set_restrictions_from_map(names, catalog.restrictions_by_name)
+
+    def set_restrictions_from_map(self, restrictions: Sequence[str], name_to_row: Mapping[str, Restriction]) -> None:
+        """Same as `set_restrictions_auto`, but uses a preloaded map from lowercased restriction names to restrictions.
+
+        Use this when categorizing the restrictions of many builds at once.
+        """
         self.wiring_placement_restrictions = []
         self.component_restrictions = []
         self.miscellaneous_restrictions = []
-
-        db_restrictions = await DatabaseManager().build_tags.fetch_all_restrictions()
-        name_to_row = {r.name.lower(): r for r in db_restrictions}
         bucket: dict[RestrictionTypeLiteral, list[str]] = {
             "wiring-placement": self.wiring_placement_restrictions,
             "component": self.component_restrictions,
@@ -580,6 +568,11 @@ def title(self) -> str:
 
         return title
 
+    def works_in(self, version: str) -> bool:
+        """Whether the build works in a version like "Java 1.21.4", including versions released after it was saved."""
+        ordinal = version_ordinal(*parse_version_string(version))
+        return any(ordinal in version_range for version_range in self.version_ranges)
+
     async def generate_embedding(self) -> list[float] | None:
         """
         Generates embedding for the build using OpenAI's API.
@@ -587,17 +580,8 @@ async def generate_embedding(self) -> list[float] | None:
         Returns:
             The embedding generated by the API, or None if the API call failed for any reason (e.g. no API key).
         """
-        # The EMBEDDING_ environmental variables are an override for the OPENAI_ ones.
-        base_url = os.getenv("EMBEDDING_OPENAI_BASE_URL") or os.getenv("OPENAI_BASE_URL")
-        api_key = os.getenv("EMBEDDING_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-        model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
-        try:
-            client = AsyncOpenAI(base_url=base_url, api_key=api_key)
-            response = await client.embeddings.create(input=str(self), model=model)
-            return response.data[0].embedding
-        except OpenAIError as e:
-            logger.debug("Failed to generate embedding for build %s: %s", self.id, e)
-            return None
+        embeddings = await embed_texts([str(self)])
+        return embeddings[0] if embeddings else None
 
     def diff[T: Any](self, other: "Build", *, allow_different_id: bool = False) -> list[tuple[str, T, T]]:
         """
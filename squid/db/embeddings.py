@@ -0,0 +1,345 @@
+"""Generates and stores build embeddings in the background."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import os
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from openai import AsyncOpenAI, OpenAIError
+from pgvector.sqlalchemy import VECTOR
+from sqlalchemy import BigInteger, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from squid.db.schema import Build as SQLBuild
+
+if TYPE_CHECKING:
+    from squid.db.build_manager import BuildManager
+    from squid.db.vector_store import BuildVectorMetadata, VectorStore
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "1536"))
+
+
+@functools.cache
+def get_embedding_client() -> AsyncOpenAI:
+    """Returns the shared client used for embedding requests.
+
+    The EMBEDDING_ environmental variables are an override for the OPENAI_ ones.
+    """
+    base_url = os.getenv("EMBEDDING_OPENAI_BASE_URL") or os.getenv("OPENAI_BASE_URL")
+    api_key = os.getenv("EMBEDDING_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
+    return AsyncOpenAI(base_url=base_url, api_key=api_key)
+
+
+async def embed_texts(texts: Sequence[str]) -> list[list[float]] | None:
+    """Embeds all the texts with a single API request.
+
+    Returns:
+        The embeddings in the same order as the texts, or None if the API call failed for any reason (e.g. no API key).
+    """
+    if not texts:
+        return []
+    model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    try:
+        response = await get_embedding_client().embeddings.create(input=list(texts), model=model)
+    except OpenAIError as e:
+        logger.debug("Failed to generate embeddings for %s texts: %s", len(texts), e)
+        return None
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a search query so that trivially different spellings share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+class QueryEmbeddingCache:
+    """A bounded LRU cache of search query embeddings, keyed by the normalized query text.
+
+    Popular queries are only sent to the embeddings API once. Concurrent lookups of the same uncached query share a
+    single request. If a path is given, the cache is loaded from it on creation and written back by `save`, so it
+    survives restarts.
+    """
+
+    def __init__(self, max_size: int = 2048, *, path: str | os.PathLike[str] | None = None) -> None:
+        """Initializes the cache.
+
+        Args:
+            max_size: The maximum number of queries kept. The least recently used query is evicted first.
+            path: A JSON file to persist the cache to. The file does not need to exist yet.
+        """
+        if max_size <= 0:
+            msg = "max_size must be positive."
+            raise ValueError(msg)
+        self.max_size = max_size
+        self.path = Path(path) if path is not None else None
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[list[float] | None]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, query: str) -> bool:
+        return normalize_query(query) in self._entries
+
+    async def get(self, query: str) -> list[float] | None:
+        """Returns the embedding of a query, embedding it if it is not cached.
+
+        Returns:
+            The embedding, or None if the query could not be embedded. Failures are not cached.
+        """
+        key = normalize_query(query)
+        if (embedding := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+        if (pending := self._in_flight.get(key)) is not None:
+            self.hits += 1
+            return await pending
+
+        self.misses += 1
+        future: asyncio.Future[list[float] | None] = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            embeddings = await embed_texts([key])
+            embedding = embeddings[0] if embeddings else None
+            if embedding is not None:
+                self._put(key, embedding)
+            future.set_result(embedding)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark it as retrieved, the error is raised here either way
+            raise
+        finally:
+            del self._in_flight[key]
+        return embedding
+
+    def _put(self, key: str, embedding: list[float]) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def load(self) -> None:
+        """Replaces the cache contents with the ones stored at `path`. A missing or corrupt file is ignored."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable query embedding cache at %s", self.path)
+            return
+        self._entries.clear()
+        for key, embedding in data.get("entries", [])[-self.max_size :]:
+            self._entries[key] = embedding
+        self._dirty = False
+
+    def save(self) -> None:
+        """Writes the cache to `path`, if there is one and anything changed since the last save."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"entries": list(self._entries.items())}), encoding="utf-8")
+        tmp.replace(self.path)
+        self._dirty = False
+
+
+class EmbeddingPipeline:
+    """Keeps build embeddings up to date without blocking the code that saves builds.
+
+    `BuildManager.save` enqueues the ids of saved builds. A background worker waits briefly so bursts of saves are
+    coalesced, then embeds the pending builds in batches with one API request per batch. The vectors are written to
+    the builds table and the vector store, and `builds.embedding_updated_at` records when each embedding was
+    generated, so stale embeddings can be found again after a restart with `enqueue_stale`.
+
+    A batch that fails is enqueued again with exponential backoff, up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        session: async_sessionmaker[AsyncSession],
+        builds: BuildManager,
+        vectors: VectorStore,
+        *,
+        batch_size: int = 64,
+        delay: float = 2.0,
+        retry_delay: float = 30.0,
+        max_retries: int = 5,
+    ) -> None:
+        """Initializes the pipeline.
+
+        Args:
+            session: The session maker used to write embeddings.
+            builds: The build manager used to load the builds to embed.
+            vectors: The vector store that similarity searches are run against.
+            batch_size: The maximum number of builds embedded in a single API request.
+            delay: How long to wait after the first enqueue before processing, so bursts are batched together.
+            retry_delay: How long to wait before retrying a failed batch. Doubles with every failed attempt.
+            max_retries: How many times a build is retried before it is left for `enqueue_stale` to pick up.
+        """
+        self.session = session
+        self.builds = builds
+        self.vectors = vectors
+        self.batch_size = batch_size
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self._pending: dict[int, None] = {}  # An ordered set
+        self._attempts: dict[int, int] = {}
+        self._retries: set[asyncio.TimerHandle] = set()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """The number of builds waiting to be embedded."""
+        return len(self._pending)
+
+    def enqueue(self, build_id: int) -> None:
+        """Schedules a build to have its embedding regenerated."""
+        self._pending[build_id] = None
+        self._wakeup.set()
+
+    async def enqueue_stale(self) -> int:
+        """Schedules every build whose embedding is missing or older than its last edit.
+
+        Returns:
+            The number of builds scheduled.
+        """
+        stmt = select(SQLBuild.id).where(
+            or_(SQLBuild.embedding_updated_at.is_(None), SQLBuild.embedding_updated_at < SQLBuild.edited_time)
+        )
+        async with self.session() as session:
+            build_ids = (await session.scalars(stmt)).all()
+        for build_id in build_ids:
+            self.enqueue(build_id)
+        return len(build_ids)
+
+    def start(self) -> None:
+        """Starts the background worker."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="embedding-pipeline")
+
+    async def stop(self) -> None:
+        """Stops the background worker. Pending builds and scheduled retries are dropped."""
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.delay)
+            self._wakeup.clear()
+            while self._pending:
+                batch = list(self._pending)[: self.batch_size]
+                for build_id in batch:
+                    del self._pending[build_id]
+                try:
+                    await self.process(batch)
+                except Exception:
+                    logger.exception("Failed to update the embeddings of builds %s", batch)
+                    self._retry(batch)
+                else:
+                    for build_id in batch:
+                        self._attempts.pop(build_id, None)
+
+    def _retry(self, build_ids: Sequence[int]) -> None:
+        """Enqueues a failed batch again after a backoff, giving up on builds that failed too often."""
+        retry: list[int] = []
+        for build_id in build_ids:
+            attempt = self._attempts.get(build_id, 0) + 1
+            if attempt > self.max_retries:
+                # The build is left stale, and will be picked up again by enqueue_stale
+                del self._attempts[build_id]
+                logger.warning("Giving up on the embedding of build %s after %s retries", build_id, self.max_retries)
+                continue
+            self._attempts[build_id] = attempt
+            retry.append(build_id)
+        if not retry:
+            return
+
+        delay = self.retry_delay * 2 ** (max(self._attempts[build_id] for build_id in retry) - 1)
+        loop = asyncio.get_running_loop()
+
+        def requeue() -> None:
+            self._retries.discard(handle)
+            for build_id in retry:
+                self.enqueue(build_id)
+
+        handle = loop.call_later(delay, requeue)
+        self._retries.add(handle)
+
+    async def process(self, build_ids: Sequence[int]) -> None:
+        """Embeds the given builds and stores the results."""
+        builds = [build for build in await self.builds.get_builds_by_id(list(build_ids)) if build is not None]
+        if not builds:
+            return
+        embeddings = await embed_texts([str(build) for build in builds])
+        if embeddings is None:
+            msg = "The embeddings API request failed."
+            raise RuntimeError(msg)
+
+        # Only store embeddings for builds that have not been edited since they were loaded.
+        # If a build was edited, that save enqueued it again.
+        rows = [
+            {"id": build.id, "edited_time": build.edited_time, "embedding": embedding}
+            for build, embedding in zip(builds, embeddings, strict=True)
+        ]
+        data = values(
+            column("id", BigInteger),
+            column("edited_time", TIMESTAMP(timezone=True)),
+            column("embedding", VECTOR(EMBEDDING_DIMENSION)),
+            name="data",
+        ).data([(row["id"], row["edited_time"], row["embedding"]) for row in rows])
+        stmt = (
+            update(SQLBuild)
+            .where(SQLBuild.id == data.c.id)
+            .where(SQLBuild.edited_time.is_not_distinct_from(data.c.edited_time))
+            .values(embedding=data.c.embedding, embedding_updated_at=func.now())
+            .returning(SQLBuild.id)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session() as session:
+            updated_ids = set((await session.scalars(stmt)).all())
+            await session.commit()
+
+        records: list[tuple[int, list[float], BuildVectorMetadata]] = []
+        for build, embedding in zip(builds, embeddings, strict=True):
+            if build.id is None or build.id not in updated_ids:
+                continue
+            metadata: BuildVectorMetadata = {}
+            if build.submission_status is not None:
+                metadata["status"] = int(build.submission_status)
+            if build.category is not None:
+                metadata["category"] = build.category
+            records.append((build.id, embedding, metadata))
+        await self.vectors.upsert(records)
+        for build_id in updated_ids:
+            self.builds.cache.invalidate(build_id)
+        logger.debug("Updated the embeddings of %s builds", len(updated_ids))
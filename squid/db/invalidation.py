@@ -0,0 +1,80 @@
+"""Invalidates in-memory caches when the database tables they were built from change."""
+
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import NamedTuple
+
+from squid.db.listener import NotificationListener
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+
+class Invalidation(NamedTuple):
+    """A change to a database table."""
+
+    table: str
+    keys: frozenset[str] | None = None
+    """The changed values of the table's key column (as text), or None if anything in the table may have changed."""
+
+    def affects(self, key: Hashable) -> bool:
+        """Whether data cached under the given key may be stale."""
+        return self.keys is None or str(key) in self.keys
+
+
+type InvalidationCallback = Callable[[Invalidation], Awaitable[None] | None]
+
+
+class InvalidationBus:
+    """Routes table change events to the caches that depend on those tables.
+
+    Change events are published by the `trg_notify_cache_invalidation` triggers on the `cache_invalidation` channel
+    and received through a `NotificationListener`. Since events sent while the listener is disconnected are lost,
+    every cache is fully invalidated whenever the listener (re)connects.
+
+    Caches register a callback per table with `register`. Callbacks may be sync or async, and are called one at a
+    time in registration order.
+    """
+
+    def __init__(self) -> None:
+        self._callbacks: dict[str, list[InvalidationCallback]] = {}
+
+    @property
+    def tables(self) -> list[str]:
+        """The tables that have at least one cache registered."""
+        return list(self._callbacks)
+
+    def register(self, table: str, callback: InvalidationCallback) -> None:
+        """Calls `callback` whenever `table` changes."""
+        self._callbacks.setdefault(table, []).append(callback)
+
+    def attach(self, listener: NotificationListener) -> None:
+        """Receives change events from the given listener."""
+        listener.subscribe(CHANNEL, self.handle_notification)
+        listener.on_reconnect(self.invalidate_all)
+
+    async def handle_notification(self, payload: str) -> None:
+        """Publishes a change event sent by the database."""
+        data = json.loads(payload)
+        keys = data.get("keys")
+        await self.publish(Invalidation(data["table"], None if keys is None else frozenset(map(str, keys))))
+
+    async def publish(self, invalidation: Invalidation) -> None:
+        """Notifies every cache registered for the changed table. Failing callbacks are logged and skipped."""
+        for callback in self._callbacks.get(invalidation.table, []):
+            try:
+                result = callback(invalidation)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Failed to invalidate a cache of %s", invalidation.table)
+
+    async def invalidate_all(self) -> None:
+        """Tells every cache that anything may have changed."""
+        for table in self.tables:
+            await self.publish(Invalidation(table))
@@ -0,0 +1,202 @@
+"""An in-memory index for searching records by title."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Sequence
+from itertools import batched
+from typing import NamedTuple
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from squid.db.schema import DoorOrientationLiteral, DoorRecordModel, SmallestDoor
+
+_LOAD_CHUNK_SIZE = 5000
+
+
+class IndexedRecord(NamedTuple):
+    """The fields of a record that the title index keeps in memory."""
+
+    record_id: int
+    id: int
+    """The id of the build holding the record."""
+    title: str
+    orientation: DoorOrientationLiteral
+    door_width: int
+    door_height: int
+    door_depth: int | None
+
+
+class RecordTitleIndex:
+    """A fuzzy title search index over the titled rows of a door record table, e.g. `smallest_door_records`.
+
+    Titles are normalized once when they are indexed, and kept in a contiguous list that rapidfuzz scores directly,
+    without a Python processor callback per record. Records can be filtered by orientation and door size before
+    scoring, using posting lists instead of a scan.
+
+    The index is updated incrementally: `upsert` and `remove` change single records in O(1), and `refresh` only loads
+    the records that changed since the last refresh.
+    """
+
+    def __init__(self, model: type[DoorRecordModel] = SmallestDoor) -> None:
+        """Initializes an empty index.
+
+        Args:
+            model: The record table to index.
+        """
+        self.model = model
+        # Parallel lists, indexed by position. Removal swaps the last record into the hole to keep them contiguous.
+        self._records: list[IndexedRecord] = []
+        self._titles: list[str] = []
+        self._positions: dict[int, int] = {}  # record_id -> position
+        self._by_orientation: dict[str, set[int]] = {}  # orientation -> positions
+        self._by_size: dict[tuple[int, int], set[int]] = {}  # (door_width, door_height) -> positions
+        self._refresh_lock = asyncio.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._positions
+
+    def get(self, record_id: int) -> IndexedRecord | None:
+        """Returns the indexed record with the given id."""
+        position = self._positions.get(record_id)
+        return None if position is None else self._records[position]
+
+    def upsert(self, records: Iterable[IndexedRecord]) -> None:
+        """Adds records to the index, replacing any existing records with the same id."""
+        for record in records:
+            if (position := self._positions.get(record.record_id)) is not None:
+                self._unlink(position)
+                self._records[position] = record
+                self._titles[position] = default_process(record.title)
+                self._link(position)
+            else:
+                self._positions[record.record_id] = len(self._records)
+                self._records.append(record)
+                self._titles.append(default_process(record.title))
+                self._link(len(self._records) - 1)
+
+    def remove(self, record_ids: Iterable[int]) -> None:
+        """Removes records from the index. Unknown ids are ignored."""
+        for record_id in record_ids:
+            position = self._positions.pop(record_id, None)
+            if position is None:
+                continue
+            self._unlink(position)
+            last = len(self._records) - 1
+            if position != last:
+                moved = self._records[last]
+                self._unlink(last)
+                self._records[position] = moved
+                self._titles[position] = self._titles[last]
+                self._positions[moved.record_id] = position
+                self._link(position)
+            self._records.pop()
+            self._titles.pop()
+
+    def clear(self) -> None:
+        """Removes every record from the index."""
+        self._records.clear()
+        self._titles.clear()
+        self._positions.clear()
+        self._by_orientation.clear()
+        self._by_size.clear()
+        self.loaded = False
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int = 25,
+        orientation: DoorOrientationLiteral | None = None,
+        door_size: tuple[int, int] | None = None,
+    ) -> list[tuple[IndexedRecord, float, int]]:
+        """Searches the records by title.
+
+        Args:
+            query: The title to search for.
+            limit: The maximum number of results.
+            orientation: Only search records of doors with this orientation.
+            door_size: Only search records of doors with this (width, height).
+
+        Returns:
+            A list of (record, score, position) tuples, best match first. The score is between 0 and 100.
+        """
+        candidates: set[int] | None = None
+        if orientation is not None:
+            candidates = self._by_orientation.get(orientation, set())
+        if door_size is not None:
+            sized = self._by_size.get(door_size, set())
+            candidates = sized if candidates is None else candidates & sized
+
+        processed_query = default_process(query)
+        if candidates is None:
+            matches = process.extract(processed_query, self._titles, scorer=fuzz.WRatio, processor=None, limit=limit)
+            return [(self._records[position], score, position) for _, score, position in matches]
+
+        positions = sorted(candidates)
+        titles = [self._titles[position] for position in positions]
+        matches = process.extract(processed_query, titles, scorer=fuzz.WRatio, processor=None, limit=limit)
+        return [(self._records[positions[i]], score, positions[i]) for _, score, i in matches]
+
+    async def refresh(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        """Brings the index up to date with the database.
+
+        Only the ids and titles of all records are read; the full rows are only loaded for records that are new or
+        whose title changed.
+        """
+        async with self._refresh_lock, session_maker() as session:
+            model = self.model
+            rows = (await session.execute(select(model.record_id, model.title).where(model.title.is_not(None)))).all()
+            current = {record_id: title for record_id, title in rows}
+
+            self.remove([record_id for record_id in list(self._positions) if record_id not in current])
+            changed = [
+                record_id
+                for record_id, title in current.items()
+                if (record := self.get(record_id)) is None or record.title != title
+            ]
+            for chunk in batched(changed, _LOAD_CHUNK_SIZE):
+                self.upsert(await self._load(session, chunk))
+            self.loaded = True
+
+    async def refresh_records(self, session_maker: async_sessionmaker[AsyncSession], record_ids: Sequence[int]) -> None:
+        """Brings the given records up to date with the database, without reading any other record.
+
+        Records that no longer exist or have no title are removed from the index.
+        """
+        async with self._refresh_lock, session_maker() as session:
+            for chunk in batched(record_ids, _LOAD_CHUNK_SIZE):
+                records = await self._load(session, chunk)
+                found = {record.record_id for record in records}
+                self.remove([record_id for record_id in chunk if record_id not in found])
+                self.upsert(records)
+
+    async def _load(self, session: AsyncSession, record_ids: Sequence[int]) -> list[IndexedRecord]:
+        model = self.model
+        stmt = select(
+            model.record_id,
+            model.id,
+            model.title,
+            model.orientation,
+            model.door_width,
+            model.door_height,
+            model.door_depth,
+        ).where(model.record_id.in_(record_ids), model.title.is_not(None))
+        return [IndexedRecord(*row) for row in (await session.execute(stmt)).all()]
+
+    def _link(self, position: int) -> None:
+        record = self._records[position]
+        self._by_orientation.setdefault(record.orientation, set()).add(position)
+        self._by_size.setdefault((record.door_width, record.door_height), set()).add(position)
+
+    def _unlink(self, position: int) -> None:
+        record = self._records[position]
+        self._by_orientation[record.orientation].discard(position)
+        self._by_size[(record.door_width, record.door_height)].discard(position)
@@ -1,7 +1,7 @@
 import os
 import uuid
 from collections.abc import Sequence
-from datetime import datetime
+from datetime import date, datetime
 from enum import IntEnum, StrEnum
 from typing import Any, Literal, TypeAlias, TypedDict, cast, get_args
 
@@ -14,6 +14,7 @@
     UUID,
     BigInteger,
     Boolean,
+    Date,
     Float,
     ForeignKey,
     Integer,
@@ -21,6 +22,7 @@
     String,
     text,
 )
+from sqlalchemy.dialects.postgresql import INT4MULTIRANGE, Range
 from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, MappedAsDataclass, mapped_column, relationship
@@ -236,9 +238,12 @@ class Build(Base, kw_only=True):
         foreign_keys="Build.original_message_id", uselist=False, default=None, lazy="joined"
     )
     version_spec: Mapped[str | None] = mapped_column(String, default=None)
+    version_ranges: Mapped[list[Range[int]]] = mapped_column(INT4MULTIRANGE, nullable=False, default_factory=list)
+    """Ranges of version ordinals the build works in, see `squid.db.version_resolver.version_ordinal`."""
     embedding: Mapped[list[float] | None] = mapped_column(
         VECTOR(int(os.getenv("EMBEDDING_DIMENSION", "1536"))), default=None
     )
+    embedding_updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None)
     locked_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None)
     ai_generated: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     extra_info: Mapped[Info] = mapped_column(JSON, nullable=False, default_factory=dict)
@@ -330,6 +335,64 @@ class SmallestDoor(Base):
     title: Mapped[str | None] = mapped_column(String)
 
 
+FastestDoorMetricLiteral: TypeAlias = Literal["normal", "visible"]
+
+
+class FastestDoor(Base):
+    """A door that is the fastest in a specific category, by either its normal or its visible times.
+
+    This table is a cache maintained by database triggers, like `smallest_door_records`.
+    """
+
+    __tablename__ = "fastest_door_records"
+
+    record_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, init=False)
+    id: Mapped[int] = mapped_column(BigInteger, ForeignKey("builds.id"), init=False)
+    metric: Mapped[FastestDoorMetricLiteral] = mapped_column(String, nullable=False)
+    door_width: Mapped[int] = mapped_column(Integer, nullable=False)
+    door_height: Mapped[int] = mapped_column(Integer, nullable=False)
+    door_depth: Mapped[int] = mapped_column(Integer, nullable=True)
+    orientation: Mapped[DoorOrientationLiteral] = mapped_column(String)
+    types: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    restrictions: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    restriction_subset: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    opening_time: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    closing_time: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_time: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    title: Mapped[str | None] = mapped_column(String)
+
+
+class FirstDoor(Base):
+    """A door that was the first to be completed in a specific category.
+
+    This table is a cache maintained by database triggers, like `smallest_door_records`.
+    """
+
+    __tablename__ = "first_door_records"
+
+    record_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, init=False)
+    id: Mapped[int] = mapped_column(BigInteger, ForeignKey("builds.id"), init=False)
+    door_width: Mapped[int] = mapped_column(Integer, nullable=False)
+    door_height: Mapped[int] = mapped_column(Integer, nullable=False)
+    door_depth: Mapped[int] = mapped_column(Integer, nullable=True)
+    orientation: Mapped[DoorOrientationLiteral] = mapped_column(String)
+    types: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    restrictions: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    restriction_subset: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    completed_on: Mapped[date | None] = mapped_column(Date)
+    """The date parsed from the build's free-form completion time, if it holds a full date."""
+    submission_time: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=False))
+    title: Mapped[str | None] = mapped_column(String)
+
+
+DoorRecordModel: TypeAlias = SmallestDoor | FastestDoor | FirstDoor
+DOOR_RECORD_MODELS: dict[RecordCategoryLiteral, type[DoorRecordModel]] = {
+    "Smallest": SmallestDoor,
+    "Fastest": FastestDoor,
+    "First": FirstDoor,
+}
+
+
 class Extender(Build, kw_only=True):
     """An extender build."""
 
@@ -7,6 +7,7 @@
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from squid.db.invalidation import Invalidation, InvalidationBus
 from squid.db.schema import (
     ListRoleSetting,
     ScalarChannelSetting,
@@ -56,6 +57,27 @@ class ServerSettingManager:
 
     def __init__(self, session: async_sessionmaker[AsyncSession]):
         self.session = session
+        self._cache: dict[int, ServerSetting | None] = {}
+        """Settings by server id, None if the server has no settings. Kept fresh by `register_caches`."""
+
+    def register_caches(self, bus: InvalidationBus) -> None:
+        """Invalidates the cached settings of a server when they change in the database."""
+        bus.register("server_settings", self._invalidate)
+
+    def _invalidate(self, invalidation: Invalidation) -> None:
+        for server_id in [server_id for server_id in self._cache if invalidation.affects(server_id)]:
+            del self._cache[server_id]
+
+    async def _get_setting_obj(self, server_id: int) -> ServerSetting | None:
+        """Gets the settings row of a server, from the cache if possible."""
+        if server_id in self._cache:
+            return self._cache[server_id]
+        async with self.session() as session:
+            stmt = select(ServerSetting).where(ServerSetting.server_id == server_id)
+            result = await session.execute(stmt)
+            setting_obj = result.scalar_one_or_none()
+        self._cache[server_id] = setting_obj
+        return setting_obj
 
     @overload
     async def get(
@@ -88,30 +110,23 @@ async def get_single(self, server_id: int, setting: Setting) -> int | list[int]
 
         The returned channel ids are always a ``GuildMessageable``.
         """
-        async with self.session() as session:
-            col_name = _SETTING_TO_DB_KEY[setting]
-            stmt = select(ServerSetting).where(ServerSetting.server_id == server_id)
-            result = await session.execute(stmt)
-            setting_obj = result.scalar_one_or_none()
-            if setting_obj is None:
-                return None
-            return getattr(setting_obj, col_name)
+        setting_obj = await self._get_setting_obj(server_id)
+        if setting_obj is None:
+            return None
+        return getattr(setting_obj, _SETTING_TO_DB_KEY[setting])
 
     async def get_all(self, server_id: int) -> SettingOptions:
         """Gets the settings for a server."""
-        async with self.session() as session:
-            stmt = select(ServerSetting).where(ServerSetting.server_id == server_id)
-            result = await session.execute(stmt)
-            setting_obj = result.scalar_one_or_none()
-            if setting_obj is None:
-                return {}
+        setting_obj = await self._get_setting_obj(server_id)
+        if setting_obj is None:
+            return {}
 
-            return SettingOptions(
-                **{
-                    _DB_KEY_TO_SETTING[setting_name]: getattr(setting_obj, setting_name)
-                    for setting_name in _DB_KEY_TO_SETTING
-                }
-            )
+        return SettingOptions(
+            **{
+                _DB_KEY_TO_SETTING[setting_name]: getattr(setting_obj, setting_name)
+                for setting_name in _DB_KEY_TO_SETTING
+            }
+        )
 
     async def set(self, server_id: int, **settings: Unpack[SettingOptions]) -> None:
         """Updates settings for a server."""
@@ -130,6 +145,7 @@ async def set(self, server_id: int, **settings: Unpack[SettingOptions]) -> None:
                 setattr(setting_obj, col_name, value)
 
             await session.commit()
+        self._cache.pop(server_id, None)
 
     async def on_guild_join(self, server_id: int) -> None:
         """Called when a guild joins the bot."""
@@ -138,6 +154,7 @@ async def on_guild_join(self, server_id: int) -> None:
             stmt = stmt.on_conflict_do_update(index_elements=[ServerSetting.server_id], set_={"in_server": True})
             await session.execute(stmt)
             await session.commit()
+        self._cache.pop(server_id, None)
 
     async def on_guild_remove(self, server_id: int) -> None:
         """Called when a guild leaves the bot."""
@@ -145,3 +162,4 @@ async def on_guild_remove(self, server_id: int) -> None:
             stmt = update(ServerSetting).where(ServerSetting.server_id == server_id).values(in_server=False)
             await session.execute(stmt)
             await session.commit()
+        self._cache.pop(server_id, None)
@@ -0,0 +1,241 @@
+"""An in-memory catalog of the restrictions, aliases, types and versions that builds are tagged with."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from types import MappingProxyType
+from typing import Literal, NamedTuple
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from squid.db.invalidation import InvalidationBus
+from squid.db.schema import BuildCategoryLiteral, Restriction, RestrictionAlias, RestrictionTypeLiteral, Type, Version
+
+type CatalogSection = Literal["restrictions", "restriction_aliases", "types", "versions"]
+
+CONFIDENT_MATCH_SCORE = 90
+"""The score above which a fuzzy match is trusted without asking the user."""
+
+
+class RestrictionMatch(NamedTuple):
+    """A restriction found by `TagCatalog.resolve_restriction`."""
+
+    restriction: Restriction
+    matched: str
+    """The name or alias that matched the query."""
+    score: float
+    """How well the query matched, between 0 and 100."""
+    is_alias: bool
+
+
+class TagCatalog:
+    """Holds the tag tables in memory, indexed for the lookups done while parsing and validating builds.
+
+    These tables are small and rarely change, so every lookup is a dictionary access instead of a query. Each table is
+    loaded on first use with `ensure_loaded`, and reloaded when the `InvalidationBus` reports that it changed. The
+    lookup methods are synchronous and only read tables that have been loaded.
+
+    Names and aliases are matched case-insensitively.
+    """
+
+    def __init__(self, session: async_sessionmaker[AsyncSession]) -> None:
+        self.session = session
+        self._loaders: dict[CatalogSection, Callable[[AsyncSession], Awaitable[None]]] = {
+            "restrictions": self._load_restrictions,
+            "restriction_aliases": self._load_restriction_aliases,
+            "types": self._load_types,
+            "versions": self._load_versions,
+        }
+        self._loaded: set[CatalogSection] = set()
+        self._lock = asyncio.Lock()
+
+        self._restrictions: list[Restriction] = []
+        self._restrictions_by_name: dict[str, Restriction] = {}
+        self._restrictions_by_id: dict[int, Restriction] = {}
+        self._restriction_names_by_type: dict[RestrictionTypeLiteral, list[str]] = {}
+        self._restriction_names_by_type_lower: dict[RestrictionTypeLiteral, frozenset[str]] = {}
+        self._restriction_ids_by_alias: dict[str, int] = {}
+        self._restriction_aliases: list[tuple[int, str]] = []
+        # Parallel lists of every restriction name and alias, for fuzzy matching
+        self._search_keys: list[str] = []
+        self._search_entries: list[tuple[int, str, bool]] = []  # (restriction_id, name or alias, is_alias)
+        self._types_by_category: dict[BuildCategoryLiteral | None, dict[str, Type]] = {}
+        self._versions_by_edition: dict[str, list[Version]] = {}
+        self._versions_by_number: dict[tuple[str, int, int, int], Version] = {}
+
+    def register_caches(self, bus: InvalidationBus) -> None:
+        """Reloads a table of the catalog when it changes in the database."""
+        for section in self._loaders:
+            bus.register(section, lambda _, section=section: self.reload(section))
+
+    async def ensure_loaded(self, *sections: CatalogSection) -> None:
+        """Loads the given tables, or every table if none are given, unless they are already loaded."""
+        wanted = sections or tuple(self._loaders)
+        if self._loaded.issuperset(wanted):
+            return
+        async with self._lock, self.session() as session:
+            for section in wanted:
+                if section not in self._loaded:
+                    await self._loaders[section](session)
+                    self._loaded.add(section)
+
+    async def reload(self, section: CatalogSection) -> None:
+        """Reloads a table if it was loaded before. Tables that were never used stay unloaded."""
+        if section not in self._loaded:
+            return
+        async with self._lock, self.session() as session:
+            await self._loaders[section](session)
+
+    # Restrictions
+    @property
+    def restrictions(self) -> list[Restriction]:
+        """Every restriction."""
+        return list(self._restrictions)
+
+    def get_restriction(self, name_or_alias: str) -> Restriction | None:
+        """Finds a restriction by its name or one of its aliases."""
+        key = name_or_alias.lower()
+        if (restriction := self._restrictions_by_name.get(key)) is not None:
+            return restriction
+        restriction_id = self._restriction_ids_by_alias.get(key)
+        return None if restriction_id is None else self._restrictions_by_id.get(restriction_id)
+
+    @property
+    def restrictions_by_name(self) -> Mapping[str, Restriction]:
+        """Every restriction, by lowercase name."""
+        return MappingProxyType(self._restrictions_by_name)
+
+    def resolve_restriction(self, query: str, *, limit: int = 5, score_cutoff: float = 0) -> list[RestrictionMatch]:
+        """Finds the restrictions whose name or alias best match the query, tolerating typos.
+
+        Each restriction is returned at most once, with its best matching name or alias.
+
+        Args:
+            query: The restriction name or alias to look for.
+            limit: The maximum number of restrictions returned.
+            score_cutoff: Only return matches scoring at least this much, between 0 and 100.
+
+        Returns:
+            The matches, best first. An exact match (ignoring case) always scores 100.
+        """
+        processed_query = default_process(query)
+        if not processed_query:
+            return []
+        # Ask for extra candidates, since a restriction can match through both its name and its aliases
+        candidates = process.extract(
+            processed_query,
+            self._search_keys,
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=limit * 3,
+            score_cutoff=score_cutoff,
+        )
+        matches: dict[int, RestrictionMatch] = {}
+        for _, score, position in candidates:
+            restriction_id, matched, is_alias = self._search_entries[position]
+            restriction = self._restrictions_by_id.get(restriction_id)
+            if restriction is None or restriction_id in matches:
+                continue
+            matches[restriction_id] = RestrictionMatch(restriction, matched, score, is_alias)
+        return sorted(matches.values(), key=lambda match: (-match.score, match.is_alias, match.matched))[:limit]
+
+    def restriction_names(self, type: RestrictionTypeLiteral) -> list[str]:
+        """The names of the restrictions of a type, in their original case."""
+        return list(self._restriction_names_by_type.get(type, ()))
+
+    def validate_restrictions(
+        self, restrictions: Iterable[str], type: RestrictionTypeLiteral
+    ) -> tuple[list[str], list[str]]:
+        """Splits restriction names into those that are valid for the given type and those that are not.
+
+        Returns:
+            (valid_restrictions, invalid_restrictions), in the order and case given.
+        """
+        valid_names = self._restriction_names_by_type_lower.get(type, frozenset())
+        valid: list[str] = []
+        invalid: list[str] = []
+        for restriction in restrictions:
+            (valid if restriction.lower() in valid_names else invalid).append(restriction)
+        return valid, invalid
+
+    # Types
+    def type_names(self, build_category: BuildCategoryLiteral) -> list[str]:
+        """The names of the types of a build category, in their original case."""
+        return [type_.name for type_ in self._types_by_category.get(build_category, {}).values()]
+
+    def get_type(self, name: str, build_category: BuildCategoryLiteral) -> Type | None:
+        """Finds a type of a build category by name."""
+        return self._types_by_category.get(build_category, {}).get(name.lower())
+
+    def validate_types(self, types: Iterable[str], build_category: BuildCategoryLiteral) -> tuple[list[str], list[str]]:
+        """Splits type names into those that exist for the given build category and those that do not.
+
+        Returns:
+            (valid_types, invalid_types), in the order and case given.
+        """
+        valid_names = self._types_by_category.get(build_category, {})
+        valid: list[str] = []
+        invalid: list[str] = []
+        for type_ in types:
+            (valid if type_.lower() in valid_names else invalid).append(type_)
+        return valid, invalid
+
+    # Versions
+    def versions(self, edition: str) -> list[Version]:
+        """The versions of an edition, sorted from oldest to newest."""
+        return list(self._versions_by_edition.get(edition, ()))
+
+    def get_version(self, edition: str, major: int, minor: int, patch: int) -> Version | None:
+        """Finds a version by its edition and number."""
+        return self._versions_by_number.get((edition, major, minor, patch))
+
+    # Loaders. Each one builds new indexes and then swaps them in, so lookups never see a half-loaded table.
+    async def _load_restrictions(self, session: AsyncSession) -> None:
+        restrictions = list((await session.execute(select(Restriction))).scalars().all())
+        names_by_type: dict[RestrictionTypeLiteral, list[str]] = {}
+        for restriction in restrictions:
+            if restriction.type is not None:
+                names_by_type.setdefault(restriction.type, []).append(restriction.name)
+
+        self._restrictions = restrictions
+        self._restrictions_by_name = {r.name.lower(): r for r in restrictions}
+        self._restrictions_by_id = {r.id: r for r in restrictions}
+        self._restriction_names_by_type = names_by_type
+        self._restriction_names_by_type_lower = {
+            type_: frozenset(name.lower() for name in names) for type_, names in names_by_type.items()
+        }
+        self._rebuild_search_keys()
+
+    async def _load_restriction_aliases(self, session: AsyncSession) -> None:
+        rows = (await session.execute(select(RestrictionAlias.alias, RestrictionAlias.restriction_id))).all()
+        self._restriction_ids_by_alias = {alias.lower(): restriction_id for alias, restriction_id in rows}
+        self._restriction_aliases = [(restriction_id, alias) for alias, restriction_id in rows]
+        self._rebuild_search_keys()
+
+    def _rebuild_search_keys(self) -> None:
+        entries = [(r.id, r.name, False) for r in self._restrictions]
+        entries += [(restriction_id, alias, True) for restriction_id, alias in self._restriction_aliases]
+        self._search_entries = entries
+        self._search_keys = [default_process(text) for _, text, _ in entries]
+
+    async def _load_types(self, session: AsyncSession) -> None:
+        types: Sequence[Type] = (await session.execute(select(Type))).scalars().all()
+        by_category: dict[BuildCategoryLiteral | None, dict[str, Type]] = {}
+        for type_ in types:
+            by_category.setdefault(type_.build_category, {})[type_.name.lower()] = type_
+        self._types_by_category = by_category
+
+    async def _load_versions(self, session: AsyncSession) -> None:
+        stmt = select(Version).order_by(
+            Version.edition, Version.major_version, Version.minor_version, Version.patch_number
+        )
+        versions = (await session.execute(stmt)).scalars().all()
+        by_edition: dict[str, list[Version]] = {}
+        for version in versions:
+            by_edition.setdefault(version.edition, []).append(version)
+        self._versions_by_edition = by_edition
+        self._versions_by_number = {(v.edition, v.major_version, v.minor_version, v.patch_number): v for v in versions}
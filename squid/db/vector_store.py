@@ -0,0 +1,150 @@
+"""A non-blocking client for the build embedding vector collection."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, TypedDict, cast
+
+import vecs
+
+from squid.db.embeddings import EMBEDDING_DIMENSION
+from squid.db.schema import BuildCategory, Status
+
+DEFAULT_TOP_K = 5
+
+
+class BuildVectorMetadata(TypedDict, total=False):
+    """The metadata stored alongside each build vector, usable as query filters."""
+
+    status: int
+    category: str
+
+
+class VectorMatch(NamedTuple):
+    """A build returned by a similarity query."""
+
+    build_id: int
+    distance: float
+    """The cosine distance between the query and the build, lower is more similar."""
+
+
+class VectorStore:
+    """A long-lived client for the `builds` vector collection.
+
+    vecs is synchronous, so every operation runs on a small dedicated thread pool instead of the event loop. The
+    underlying vecs client is created once and reused; its SQLAlchemy engine pools connections, so no operation pays
+    for a new database connection.
+    """
+
+    def __init__(
+        self,
+        connection_string: str | None = None,
+        *,
+        collection: str = "builds",
+        dimension: int = EMBEDDING_DIMENSION,
+        default_top_k: int = DEFAULT_TOP_K,
+        max_workers: int = 4,
+    ) -> None:
+        """Initializes the vector store. No connection is made until the first operation.
+
+        Args:
+            connection_string: The database to connect to. Defaults to the DB_CONNECTION environment variable.
+            collection: The name of the vecs collection.
+            dimension: The dimension of the vectors in the collection.
+            default_top_k: The number of results returned by `query` when no limit is given.
+            max_workers: The maximum number of operations that run concurrently.
+        """
+        self._connection_string = connection_string
+        self._collection_name = collection
+        self._dimension = dimension
+        self.default_top_k = default_top_k
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-store")
+        self._client: vecs.Client | None = None
+        self._collection: vecs.Collection | None = None
+        self._init_lock = asyncio.Lock()
+
+    async def upsert(self, records: Sequence[tuple[int, Sequence[float], BuildVectorMetadata]]) -> None:
+        """Inserts or replaces the vectors of the given builds."""
+        if not records:
+            return
+        vecs_records = [(str(build_id), list(vector), dict(metadata)) for build_id, vector, metadata in records]
+        collection = await self._get_collection()
+        await self._run(collection.upsert, records=vecs_records)
+
+    async def delete(self, build_ids: Sequence[int]) -> None:
+        """Removes the vectors of the given builds."""
+        if not build_ids:
+            return
+        collection = await self._get_collection()
+        await self._run(collection.delete, ids=[str(build_id) for build_id in build_ids])
+
+    async def query(
+        self,
+        vector: Sequence[float],
+        *,
+        top_k: int | None = None,
+        status: Status | None = None,
+        category: BuildCategory | None = None,
+    ) -> list[VectorMatch]:
+        """Finds the builds most similar to the given vector.
+
+        Args:
+            vector: The query vector.
+            top_k: The maximum number of results. Defaults to `default_top_k`.
+            status: Only return builds with this submission status.
+            category: Only return builds in this category.
+
+        Returns:
+            The matches, most similar first.
+        """
+        filters: list[dict[str, Any]] = []
+        if status is not None:
+            filters.append({"status": {"$eq": int(status)}})
+        if category is not None:
+            filters.append({"category": {"$eq": str(category)}})
+
+        collection = await self._get_collection()
+        results = await self._run(
+            collection.query,
+            data=list(vector),
+            limit=top_k or self.default_top_k,
+            filters=self._combine_filters(filters),
+            include_value=True,
+        )
+        # With include_value and without include_metadata, vecs returns (id, distance) pairs
+        matches = cast(list[tuple[str, float]], results)
+        return [VectorMatch(int(build_id), float(distance)) for build_id, distance in matches]
+
+    async def close(self) -> None:
+        """Disconnects from the database and shuts down the thread pool."""
+        if self._client is not None:
+            await self._run(self._client.disconnect)
+            self._client = self._collection = None
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _combine_filters(filters: list[dict[str, Any]]) -> dict[str, Any] | None:
+        if not filters:
+            return None
+        if len(filters) == 1:
+            return filters[0]
+        return {"$and": filters}
+
+    async def _get_collection(self) -> vecs.Collection:
+        if self._collection is not None:
+            return self._collection
+        async with self._init_lock:
+            if self._collection is None:
+                connection_string = self._connection_string or os.environ["DB_CONNECTION"]
+                self._client = await self._run(vecs.create_client, connection_string)
+                self._collection = await self._run(
+                    self._client.get_or_create_collection, name=self._collection_name, dimension=self._dimension
+                )
+        return self._collection
+
+    async def _run[T](self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
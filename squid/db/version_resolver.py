@@ -0,0 +1,260 @@
+"""Resolves version specifications like "1.14 - 1.16.1, 1.19+" into the versions they cover."""
+
+from __future__ import annotations
+
+import contextlib
+import re
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Collection, Iterable, Sequence
+from typing import Literal, NamedTuple, cast
+
+from sqlalchemy.dialects.postgresql import Range
+
+from squid.db.schema import Version
+from squid.utils import parse_version_string
+
+type Edition = Literal["Java", "Bedrock"]
+EDITIONS: tuple[Edition, ...] = ("Java", "Bedrock")
+type VersionTuple = tuple[int, int, int]
+
+_EDITION_PATTERN = re.compile(r"\b(Java|Bedrock)\b")
+_NO_PATCH = 1 << 31
+"""Larger than any patch number, so (major, minor, _NO_PATCH) sorts after every patch of major.minor."""
+
+
+# Bit layout of a version ordinal, see the version_ordinal SQL function
+_PATCH_BITS = 12
+_MINOR_BITS = 10
+_MAJOR_BITS = 7
+_EDITION_SHIFT = _PATCH_BITS + _MINOR_BITS + _MAJOR_BITS
+
+
+def version_ordinal(edition: Edition, major: int, minor: int, patch: int) -> int:
+    """Packs a version into an int that sorts like the versions do, matching `public.version_ordinal` in SQL.
+
+    Raises:
+        ValueError: If a part of the version number is too large to be packed.
+    """
+    if not (0 <= major < 1 << _MAJOR_BITS and 0 <= minor < 1 << _MINOR_BITS and 0 <= patch < 1 << _PATCH_BITS):
+        msg = f"Version {major}.{minor}.{patch} is out of range for a version ordinal."
+        raise ValueError(msg)
+    return (
+        (int(edition == "Bedrock") << _EDITION_SHIFT)
+        | (major << (_MINOR_BITS + _PATCH_BITS))
+        | (minor << _PATCH_BITS)
+        | patch
+    )
+
+
+def _edition_end(edition: Edition) -> int:
+    """The ordinal just after the last possible version of an edition."""
+    return (int(edition == "Bedrock") + 1) << _EDITION_SHIFT
+
+
+def merge_ranges(ranges: Iterable[tuple[int, int]]) -> list[Range[int]]:
+    """Merges half-open [start, stop) ranges into the sorted, disjoint ranges of a multirange."""
+    merged: list[list[int]] = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        elif start < stop:
+            merged.append([start, stop])
+    return [Range(start, stop, bounds="[)") for start, stop in merged]
+
+
+def version_ranges(version_spec: str | None, versions: Iterable[str]) -> list[Range[int]]:
+    """The version ordinal ranges a build works in, for `builds.version_ranges`.
+
+    Args:
+        version_spec: The version spec of the build. Open-ended parts stay open-ended, so future versions match.
+            A spec that cannot be parsed is ignored.
+        versions: Version strings like "Java 1.16.1" that the build is known to work in.
+    """
+    ranges: list[tuple[int, int]] = []
+    if version_spec:
+        # The spec is free text written by users, the resolved versions below still apply if it is invalid
+        with contextlib.suppress(ValueError):
+            ranges.extend(VersionResolver.compile_ranges(version_spec))
+    for version in versions:
+        ordinal = version_ordinal(*parse_version_string(version))
+        ranges.append((ordinal, ordinal + 1))
+    return merge_ranges(ranges)
+
+
+class VersionSlice(NamedTuple):
+    """A contiguous run of the sorted versions of an edition, as indexes into `EditionVersions.tuples`."""
+
+    edition: Edition
+    start: int
+    stop: int
+
+
+class EditionVersions:
+    """The versions of one edition, sorted so that version ranges can be found by bisection."""
+
+    def __init__(self, edition: Edition, versions: Sequence[Version]) -> None:
+        self.edition: Edition = edition
+        self.tuples: list[VersionTuple] = sorted({(v.major_version, v.minor_version, v.patch_number) for v in versions})
+        self.names = [f"{edition} {major}.{minor}.{patch}" for major, minor, patch in self.tuples]
+
+    def between(self, low: VersionTuple, high: VersionTuple) -> VersionSlice:
+        """The versions v with low <= v <= high."""
+        return VersionSlice(self.edition, bisect_left(self.tuples, low), bisect_right(self.tuples, high))
+
+
+class _CompiledPart(NamedTuple):
+    edition: Edition
+    low: VersionTuple
+    high: VersionTuple
+
+
+class VersionResolver:
+    """Resolves version specifications, memoizing the result of each spec.
+
+    A spec is a comma separated list of parts, each one of:
+        - a range, e.g. "1.14 - 1.16.1". Without a patch number, the start is the first patch and the end the last.
+        - an open range, e.g. "1.19+"
+        - a minor version, e.g. "1.17", matching every patch of it
+        - an exact version, e.g. "1.17.1"
+
+    A part may start with an edition, e.g. "Java 1.16, Bedrock 1.20+". Parts without one use the edition of the
+    previous part, or the first edition mentioned in the spec, or Java. Parts with only a major version are ignored.
+
+    Resolved specs are memoized until `invalidate` is called for one of the editions they use, which must happen
+    whenever the versions table changes.
+    """
+
+    def __init__(
+        self, fetch_versions: Callable[[Edition], Awaitable[Sequence[Version]]], *, max_size: int = 1024
+    ) -> None:
+        """Initializes the resolver.
+
+        Args:
+            fetch_versions: Returns every version of an edition.
+            max_size: The maximum number of memoized specs.
+        """
+        self.fetch_versions = fetch_versions
+        self.max_size = max_size
+        self._editions: dict[Edition, EditionVersions] = {}
+        self._resolved: OrderedDict[str, tuple[frozenset[Edition], list[str]]] = OrderedDict()
+
+    async def resolve(self, spec: str) -> list[str]:
+        """Returns every version matching the spec, as version strings like "Java 1.16.1".
+
+        Versions are listed in the order of the parts that matched them, each version once.
+        """
+        key = " ".join(spec.split())
+        if (cached := self._resolved.get(key)) is not None:
+            self._resolved.move_to_end(key)
+            return list(cached[1])
+
+        parts = self.compile(key)
+        editions: frozenset[Edition] = frozenset(part.edition for part in parts)
+        for edition in editions:
+            if edition not in self._editions:
+                self._editions[edition] = EditionVersions(edition, await self.fetch_versions(edition))
+
+        seen: set[tuple[Edition, int]] = set()
+        resolved: list[str] = []
+        for part in parts:
+            edition, start, stop = self._editions[part.edition].between(part.low, part.high)
+            names = self._editions[edition].names
+            for i in range(start, stop):
+                if (edition, i) not in seen:
+                    seen.add((edition, i))
+                    resolved.append(names[i])
+
+        self._resolved[key] = (editions, resolved)
+        if len(self._resolved) > self.max_size:
+            self._resolved.popitem(last=False)
+        return list(resolved)
+
+    def invalidate(self, editions: Collection[Edition] | None = None) -> None:
+        """Forgets the versions of the given editions, or of every edition, and the specs that used them."""
+        if editions is None:
+            self._editions.clear()
+            self._resolved.clear()
+            return
+        for edition in editions:
+            self._editions.pop(edition, None)
+        stale = [key for key, (used, _) in self._resolved.items() if not used.isdisjoint(editions)]
+        for key in stale:
+            del self._resolved[key]
+
+    @staticmethod
+    def compile_ranges(spec: str) -> list[tuple[int, int]]:
+        """Compiles a spec into half-open [start, stop) ranges of version ordinals, which include future versions.
+
+        Raises:
+            ValueError: If the spec is invalid, see `compile`.
+        """
+        ranges: list[tuple[int, int]] = []
+        for edition, low, high in VersionResolver.compile(spec):
+            start = version_ordinal(edition, *low)
+            if high[0] == _NO_PATCH:
+                stop = _edition_end(edition)
+            elif high[2] == _NO_PATCH:
+                stop = version_ordinal(edition, high[0], high[1], 0) + (1 << _PATCH_BITS)
+            else:
+                stop = version_ordinal(edition, *high) + 1
+            ranges.append((start, stop))
+        return ranges
+
+    @staticmethod
+    def compile(spec: str) -> list[_CompiledPart]:
+        """Parses a spec into the version bounds of each of its parts.
+
+        Raises:
+            ValueError: If a part is not a valid version, range or open range.
+        """
+        edition_match = _EDITION_PATTERN.search(spec)
+        edition = cast(Edition, edition_match.group(1)) if edition_match else "Java"
+
+        compiled: list[_CompiledPart] = []
+        for raw_part in spec.split(","):
+            if part_edition := _EDITION_PATTERN.search(raw_part):
+                edition = cast(Edition, part_edition.group(1))
+            bounds = _compile_part(_EDITION_PATTERN.sub("", raw_part).strip())
+            if bounds is not None:
+                compiled.append(_CompiledPart(edition, *bounds))
+        return compiled
+
+
+def _version_tuple(version_string: str) -> VersionTuple:
+    """Parses a version string like "1.16.1" into (major, minor, patch), ignoring the edition."""
+    _, major, minor, patch = parse_version_string(version_string)
+    return major, minor, patch
+
+
+def _compile_part(part: str) -> tuple[VersionTuple, VersionTuple] | None:
+    """Returns the (low, high) bounds of a spec part, both inclusive."""
+    # Case 1: range like "1.14 - 1.16.1"
+    if "-" in part:
+        subparts = [p.strip() for p in part.split("-")]
+        if len(subparts) != 2:
+            msg = f"Invalid version range format in {part}, expected exactly 2 parts, got {len(subparts)}."
+            raise ValueError(msg)
+        start_str, end_str = subparts
+        low = _version_tuple(start_str)
+        if end_str.count(".") == 2:
+            high = _version_tuple(end_str)
+        else:
+            # When no patch is specified (e.g. "1.16"), the range ends at the highest patch of that major.minor
+            major, minor, _ = _version_tuple(end_str)
+            high = (major, minor, _NO_PATCH)
+        return low, high
+
+    # Case 2: trailing plus like "1.19+"
+    if part.endswith("+"):
+        return _version_tuple(part[:-1].strip()), (_NO_PATCH, 0, 0)
+
+    # Case 3: exact version or prefix, e.g. "1.17" or "1.17.1"
+    subparts = part.split(".")
+    if len(subparts) == 2:
+        major, minor = map(int, subparts)
+        return (major, minor, 0), (major, minor, _NO_PATCH)
+    if len(subparts) == 3:
+        major, minor, patch = map(int, subparts)
+        return (major, minor, patch), (major, minor, patch)
+    return None
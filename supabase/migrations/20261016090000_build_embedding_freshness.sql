@@ -0,0 +1,10 @@
+BEGIN;
+
+-- Embeddings are generated in the background after a build is saved, this records when the embedding of a build was
+-- last generated so builds with a missing or outdated embedding (embedding_updated_at < edited_time) can be found.
+-- Existing embeddings are left with a NULL timestamp on purpose: their vectors were stored without the status and
+-- category metadata that similarity searches filter on, so they must be regenerated by the embedding pipeline.
+ALTER TABLE public.builds
+ADD COLUMN embedding_updated_at timestamp with time zone;
+
+COMMIT;
@@ -0,0 +1,295 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  Replace the per-row record triggers with statement-level ones.
+--
+--  The old triggers recomputed the records of a build twice for every
+--  touched row, so a statement touching 500 builds did 1000 full
+--  recomputations. The new triggers collect every affected build from
+--  the transition tables and recompute each affected door group once
+--  per statement.
+--------------------------------------------------------------------
+DROP TRIGGER IF EXISTS builds_refresh_smallest_door ON public.builds;
+DROP TRIGGER IF EXISTS doors_refresh_smallest_door ON public.doors;
+DROP TRIGGER IF EXISTS build_types_refresh_smallest_door ON public.build_types;
+DROP TRIGGER IF EXISTS build_restrictions_refresh_smallest_door ON public.build_restrictions;
+DROP FUNCTION IF EXISTS public.trg_refresh_smallest_door_from_builds();
+DROP FUNCTION IF EXISTS public.trg_refresh_smallest_door();
+DROP PROCEDURE IF EXISTS public.refresh_smallest_after_door_delete(bigint);
+DROP PROCEDURE IF EXISTS public.refresh_smallest_for_door_insert(bigint);
+
+
+-- Recomputes the records of every door group (orientation and door dimensions) that the given builds are in, or
+-- currently hold a record in, plus the door groups given explicitly (e.g. the old dimensions of a resized door).
+--
+-- A group's records only depend on the doors in that group, so recomputing whole groups is always correct, and
+-- groups are small. Records whose winner did not change are left untouched, so their titles are preserved.
+CREATE OR REPLACE FUNCTION public.refresh_smallest_door_records(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS void
+  LANGUAGE sql AS
+$$
+WITH groups AS (
+    SELECT d.orientation, d.door_width, d.door_height, COALESCE(d.door_depth, 1) AS door_depth
+    FROM   public.doors d
+    WHERE  d.build_id = ANY (p_build_ids)
+    UNION
+    SELECT s.orientation, s.door_width, s.door_height, s.door_depth
+    FROM   public.smallest_door_records s
+    WHERE  s.id = ANY (p_build_ids)
+    UNION
+    SELECT g.orientation, g.door_width, g.door_height, COALESCE(g.door_depth, 1)
+    FROM   unnest(p_orientations, p_widths, p_heights, p_depths)
+               AS g (orientation, door_width, door_height, door_depth)
+),
+base AS (
+    SELECT
+        b.id                                            AS build_id,
+        d.orientation,
+        d.door_width,
+        d.door_height,
+        COALESCE(d.door_depth, 1)                       AS door_depth,
+        COALESCE(
+            ARRAY_AGG(DISTINCT t.name ORDER BY t.name)
+                FILTER (WHERE t.name IS NOT NULL),
+            ARRAY[]::text[]
+        ) AS types,
+        COALESCE(
+            ARRAY_AGG(DISTINCT r.name ORDER BY r.name)
+                FILTER (WHERE r.name IS NOT NULL),
+            ARRAY[]::text[]
+        ) AS restrictions,
+        b.width * b.height * b.depth AS volume
+    FROM   groups                    g
+    JOIN   public.doors              d  ON d.orientation = g.orientation
+                                       AND d.door_width = g.door_width
+                                       AND d.door_height = g.door_height
+                                       AND COALESCE(d.door_depth, 1) = g.door_depth
+    JOIN   public.builds             b  ON b.id = d.build_id
+    LEFT   JOIN public.build_types   bt ON bt.build_id = b.id
+    LEFT   JOIN public.types         t  ON t.id = bt.type_id
+    LEFT   JOIN public.build_restrictions br ON br.build_id = b.id
+    LEFT   JOIN public.restrictions  r  ON r.id = br.restriction_id
+    WHERE  b.submission_status = 1
+      AND  b.category          = 'Door'
+      AND  b.width IS NOT NULL
+      AND  b.height IS NOT NULL
+      AND  b.depth IS NOT NULL
+    GROUP  BY b.id, d.orientation, d.door_width,
+              d.door_height, d.door_depth
+),
+winners AS (
+    SELECT DISTINCT ON
+           (b.orientation, b.door_width, b.door_height,
+            b.door_depth, b.types, ps)
+           b.build_id          AS id,
+           b.orientation, b.door_width, b.door_height,
+           b.door_depth, b.types, b.restrictions,
+           b.volume, ps        AS restriction_subset
+    FROM   base b
+    CROSS  JOIN LATERAL public.bounded_subsets(b.restrictions, 8) ps
+    ORDER  BY b.orientation, b.door_width, b.door_height, b.door_depth,
+              b.types, ps,
+              b.volume, b.build_id
+),
+stale AS (
+    DELETE FROM public.smallest_door_records s
+    USING  groups g
+    WHERE  s.orientation = g.orientation
+      AND  s.door_width  = g.door_width
+      AND  s.door_height = g.door_height
+      AND  s.door_depth  = g.door_depth
+      AND  NOT EXISTS (
+               SELECT 1
+               FROM   winners w
+               WHERE  w.orientation        = s.orientation
+                 AND  w.door_width         = s.door_width
+                 AND  w.door_height        = s.door_height
+                 AND  w.door_depth         = s.door_depth
+                 AND  w.types              = s.types
+                 AND  w.restriction_subset = s.restriction_subset
+           )
+)
+INSERT INTO public.smallest_door_records AS s
+       (id, orientation, door_width, door_height, door_depth,
+        types, restrictions, volume, restriction_subset)
+SELECT id, orientation, door_width, door_height, door_depth,
+       types, restrictions, volume, restriction_subset
+FROM   winners
+ON CONFLICT (orientation, door_width, door_height,
+             door_depth, types, restriction_subset)
+DO UPDATE
+    SET id            = EXCLUDED.id,
+        restrictions  = EXCLUDED.restrictions,
+        volume        = EXCLUDED.volume
+    WHERE (s.id, s.restrictions, s.volume)
+          IS DISTINCT FROM (EXCLUDED.id, EXCLUDED.restrictions, EXCLUDED.volume);
+$$;
+
+
+-- Transition tables cannot be shared between events, so each table gets one trigger per event.
+-- The functions below only read the transition tables that exist for the firing event.
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_smallest_door_records_from_builds()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        build_ids := ARRAY(SELECT id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        build_ids := ARRAY(SELECT id FROM old_rows);
+    ELSE
+        -- Most updates (e.g. edits to the description or embedding) cannot change any record
+        build_ids := ARRAY(
+            SELECT n.id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            WHERE  (n.submission_status, n.category, n.width, n.height, n.depth)
+                   IS DISTINCT FROM (o.submission_status, o.category, o.width, o.height, o.depth)
+        );
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_smallest_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_smallest_door_records_from_doors()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids    bigint[];
+    orientations text[];
+    widths       int[];
+    heights      int[];
+    depths       int[];
+BEGIN
+    -- The door groups are passed explicitly, because the old group of a deleted or resized door
+    -- can no longer be found from the doors table.
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   old_rows;
+    ELSE
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   (
+            SELECT o.build_id, o.orientation, o.door_width, o.door_height, o.door_depth
+            FROM   old_rows o
+            JOIN   new_rows n ON n.build_id = o.build_id
+            WHERE  (n.orientation, n.door_width, n.door_height, n.door_depth)
+                   IS DISTINCT FROM (o.orientation, o.door_width, o.door_height, o.door_depth)
+        ) AS changed;
+    END IF;
+
+    IF build_ids IS NOT NULL THEN
+        PERFORM public.refresh_smallest_door_records(build_ids, orientations, widths, heights, depths);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+-- Shared by build_types and build_restrictions, which both have a build_id column.
+CREATE OR REPLACE FUNCTION public.trg_refresh_smallest_door_records_from_tags()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        build_ids := ARRAY(SELECT DISTINCT build_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        build_ids := ARRAY(SELECT DISTINCT build_id FROM old_rows);
+    ELSE
+        build_ids := ARRAY(SELECT build_id FROM old_rows UNION SELECT build_id FROM new_rows);
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_smallest_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE TRIGGER builds_refresh_smallest_door_insert
+AFTER INSERT ON public.builds
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_builds();
+
+CREATE TRIGGER builds_refresh_smallest_door_update
+AFTER UPDATE ON public.builds
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_builds();
+
+CREATE TRIGGER builds_refresh_smallest_door_delete
+AFTER DELETE ON public.builds
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_builds();
+
+CREATE TRIGGER doors_refresh_smallest_door_insert
+AFTER INSERT ON public.doors
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_doors();
+
+CREATE TRIGGER doors_refresh_smallest_door_update
+AFTER UPDATE ON public.doors
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_doors();
+
+CREATE TRIGGER doors_refresh_smallest_door_delete
+AFTER DELETE ON public.doors
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_doors();
+
+CREATE TRIGGER build_types_refresh_smallest_door_insert
+AFTER INSERT ON public.build_types
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_tags();
+
+CREATE TRIGGER build_types_refresh_smallest_door_update
+AFTER UPDATE ON public.build_types
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_tags();
+
+CREATE TRIGGER build_types_refresh_smallest_door_delete
+AFTER DELETE ON public.build_types
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_tags();
+
+CREATE TRIGGER build_restrictions_refresh_smallest_door_insert
+AFTER INSERT ON public.build_restrictions
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_tags();
+
+CREATE TRIGGER build_restrictions_refresh_smallest_door_update
+AFTER UPDATE ON public.build_restrictions
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_tags();
+
+CREATE TRIGGER build_restrictions_refresh_smallest_door_delete
+AFTER DELETE ON public.build_restrictions
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_smallest_door_records_from_tags();
+
+COMMIT;
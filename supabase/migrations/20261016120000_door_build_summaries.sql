@@ -0,0 +1,370 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  A maintained per-build summary for record computation.
+--
+--  Every record procedure used to repeat the same 6-way join with two
+--  ARRAY_AGG(DISTINCT ...) per build, over every door in the affected
+--  groups. The summary stores the result of that aggregation for each
+--  door that can hold a record, and is updated only for the builds a
+--  statement touches. Record refreshes then become index lookups.
+--------------------------------------------------------------------
+
+-- The single definition of what a build contributes to the records.
+CREATE OR REPLACE VIEW public.door_build_summary_source AS
+SELECT
+    b.id                                            AS build_id,
+    d.orientation,
+    d.door_width,
+    d.door_height,
+    COALESCE(d.door_depth, 1)                       AS door_depth,
+    COALESCE(
+        ARRAY_AGG(DISTINCT t.name ORDER BY t.name)
+            FILTER (WHERE t.name IS NOT NULL),
+        ARRAY[]::text[]
+    ) AS types,
+    COALESCE(
+        ARRAY_AGG(DISTINCT r.name ORDER BY r.name)
+            FILTER (WHERE r.name IS NOT NULL),
+        ARRAY[]::text[]
+    ) AS restrictions,
+    b.width * b.height * b.depth                    AS volume
+FROM   public.builds             b
+JOIN   public.doors              d  ON d.build_id = b.id
+LEFT   JOIN public.build_types   bt ON bt.build_id = b.id
+LEFT   JOIN public.types         t  ON t.id = bt.type_id
+LEFT   JOIN public.build_restrictions br ON br.build_id = b.id
+LEFT   JOIN public.restrictions  r  ON r.id = br.restriction_id
+WHERE  b.submission_status = 1
+  AND  b.category          = 'Door'
+  AND  b.width IS NOT NULL
+  AND  b.height IS NOT NULL
+  AND  b.depth IS NOT NULL
+GROUP  BY b.id, d.orientation, d.door_width,
+          d.door_height, d.door_depth;
+
+CREATE TABLE public.door_build_summaries (
+    build_id      bigint PRIMARY KEY REFERENCES public.builds (id) ON DELETE CASCADE,
+    orientation   text NOT NULL,
+    door_width    int NOT NULL,
+    door_height   int NOT NULL,
+    door_depth    int NOT NULL DEFAULT 1,
+    types         text[] NOT NULL,  -- sorted
+    restrictions  text[] NOT NULL,  -- sorted
+    volume        int NOT NULL
+);
+
+CREATE INDEX idx_door_build_summaries_group
+      ON public.door_build_summaries
+          (orientation, door_width, door_height, door_depth);
+
+INSERT INTO public.door_build_summaries
+SELECT * FROM public.door_build_summary_source;
+
+
+-- Brings the summaries of the given builds up to date. Builds that can no longer hold a record lose their summary.
+CREATE OR REPLACE FUNCTION public.refresh_door_build_summaries(p_build_ids bigint[])
+RETURNS void
+  LANGUAGE sql AS
+$$
+WITH current AS (
+    SELECT *
+    FROM   public.door_build_summary_source
+    WHERE  build_id = ANY (p_build_ids)
+),
+removed AS (
+    DELETE FROM public.door_build_summaries s
+    WHERE  s.build_id = ANY (p_build_ids)
+      AND  NOT EXISTS (SELECT 1 FROM current c WHERE c.build_id = s.build_id)
+)
+INSERT INTO public.door_build_summaries AS s
+       (build_id, orientation, door_width, door_height, door_depth,
+        types, restrictions, volume)
+SELECT build_id, orientation, door_width, door_height, door_depth,
+       types, restrictions, volume
+FROM   current
+ON CONFLICT (build_id)
+DO UPDATE
+    SET orientation  = EXCLUDED.orientation,
+        door_width   = EXCLUDED.door_width,
+        door_height  = EXCLUDED.door_height,
+        door_depth   = EXCLUDED.door_depth,
+        types        = EXCLUDED.types,
+        restrictions = EXCLUDED.restrictions,
+        volume       = EXCLUDED.volume
+    WHERE (s.orientation, s.door_width, s.door_height, s.door_depth, s.types, s.restrictions, s.volume)
+          IS DISTINCT FROM
+          (EXCLUDED.orientation, EXCLUDED.door_width, EXCLUDED.door_height, EXCLUDED.door_depth,
+           EXCLUDED.types, EXCLUDED.restrictions, EXCLUDED.volume);
+$$;
+
+
+-- Same as before, but reads the summaries instead of aggregating the join tables.
+-- Callers must refresh the summaries of p_build_ids first.
+CREATE OR REPLACE FUNCTION public.refresh_smallest_door_records(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS void
+  LANGUAGE sql AS
+$$
+WITH groups AS (
+    SELECT s.orientation, s.door_width, s.door_height, s.door_depth
+    FROM   public.door_build_summaries s
+    WHERE  s.build_id = ANY (p_build_ids)
+    UNION
+    SELECT s.orientation, s.door_width, s.door_height, s.door_depth
+    FROM   public.smallest_door_records s
+    WHERE  s.id = ANY (p_build_ids)
+    UNION
+    SELECT g.orientation, g.door_width, g.door_height, COALESCE(g.door_depth, 1)
+    FROM   unnest(p_orientations, p_widths, p_heights, p_depths)
+               AS g (orientation, door_width, door_height, door_depth)
+),
+winners AS (
+    SELECT DISTINCT ON
+           (b.orientation, b.door_width, b.door_height,
+            b.door_depth, b.types, ps)
+           b.build_id          AS id,
+           b.orientation, b.door_width, b.door_height,
+           b.door_depth, b.types, b.restrictions,
+           b.volume, ps        AS restriction_subset
+    FROM   groups g
+    JOIN   public.door_build_summaries b
+           ON  b.orientation = g.orientation
+           AND b.door_width  = g.door_width
+           AND b.door_height = g.door_height
+           AND b.door_depth  = g.door_depth
+    CROSS  JOIN LATERAL public.bounded_subsets(b.restrictions, 8) ps
+    ORDER  BY b.orientation, b.door_width, b.door_height, b.door_depth,
+              b.types, ps,
+              b.volume, b.build_id
+),
+stale AS (
+    DELETE FROM public.smallest_door_records s
+    USING  groups g
+    WHERE  s.orientation = g.orientation
+      AND  s.door_width  = g.door_width
+      AND  s.door_height = g.door_height
+      AND  s.door_depth  = g.door_depth
+      AND  NOT EXISTS (
+               SELECT 1
+               FROM   winners w
+               WHERE  w.orientation        = s.orientation
+                 AND  w.door_width         = s.door_width
+                 AND  w.door_height        = s.door_height
+                 AND  w.door_depth         = s.door_depth
+                 AND  w.types              = s.types
+                 AND  w.restriction_subset = s.restriction_subset
+           )
+)
+INSERT INTO public.smallest_door_records AS s
+       (id, orientation, door_width, door_height, door_depth,
+        types, restrictions, volume, restriction_subset)
+SELECT id, orientation, door_width, door_height, door_depth,
+       types, restrictions, volume, restriction_subset
+FROM   winners
+ON CONFLICT (orientation, door_width, door_height,
+             door_depth, types, restriction_subset)
+DO UPDATE
+    SET id            = EXCLUDED.id,
+        restrictions  = EXCLUDED.restrictions,
+        volume        = EXCLUDED.volume
+    WHERE (s.id, s.restrictions, s.volume)
+          IS DISTINCT FROM (EXCLUDED.id, EXCLUDED.restrictions, EXCLUDED.volume);
+$$;
+
+
+CREATE OR REPLACE PROCEDURE public.rebuild_smallest_door_records()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- 1. Take an exclusive lock so readers don’t see half a table.
+    LOCK TABLE public.door_build_summaries, public.smallest_door_records IN ACCESS EXCLUSIVE MODE;
+
+    -- 2. Rebuild the summaries from the join tables.
+    TRUNCATE TABLE public.door_build_summaries;
+    INSERT INTO public.door_build_summaries
+    SELECT * FROM public.door_build_summary_source;
+
+    -- 3. Re-insert the records from the summaries.
+    TRUNCATE TABLE public.smallest_door_records;
+    WITH exploded AS (
+        SELECT  s.*,
+                ps AS restriction_subset
+        FROM    public.door_build_summaries s
+        CROSS   JOIN LATERAL public.bounded_subsets(s.restrictions, 8) ps
+    ), ranked AS (
+        SELECT  *,
+                ROW_NUMBER() OVER (
+                    PARTITION BY types,
+                                 orientation, door_width,
+                                 door_height, door_depth,
+                                 restriction_subset
+                    ORDER BY volume, build_id
+                ) AS rn
+        FROM exploded
+    )
+    INSERT INTO public.smallest_door_records
+           (id, orientation, door_width, door_height, door_depth,
+            types, restrictions, volume, restriction_subset)
+    SELECT build_id, orientation, door_width, door_height,
+           door_depth, types, restrictions, volume, restriction_subset
+    FROM   ranked
+    WHERE  rn = 1;
+END;
+$$;
+
+
+--------------------------------------------------------------------
+--  Triggers: refresh the summaries of the touched builds, then their
+--  records. These are separate statements, so the record refresh sees
+--  the new summaries.
+--------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.trg_refresh_smallest_door_records_from_builds()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        build_ids := ARRAY(SELECT id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        build_ids := ARRAY(SELECT id FROM old_rows);
+    ELSE
+        -- Most updates (e.g. edits to the description or embedding) cannot change any record
+        build_ids := ARRAY(
+            SELECT n.id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            WHERE  (n.submission_status, n.category, n.width, n.height, n.depth)
+                   IS DISTINCT FROM (o.submission_status, o.category, o.width, o.height, o.depth)
+        );
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_smallest_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_smallest_door_records_from_doors()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids    bigint[];
+    orientations text[];
+    widths       int[];
+    heights      int[];
+    depths       int[];
+BEGIN
+    -- The door groups are passed explicitly, because the old group of a deleted or resized door
+    -- can no longer be found from the doors table.
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   old_rows;
+    ELSE
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   (
+            SELECT o.build_id, o.orientation, o.door_width, o.door_height, o.door_depth
+            FROM   old_rows o
+            JOIN   new_rows n ON n.build_id = o.build_id
+            WHERE  (n.orientation, n.door_width, n.door_height, n.door_depth)
+                   IS DISTINCT FROM (o.orientation, o.door_width, o.door_height, o.door_depth)
+        ) AS changed;
+    END IF;
+
+    IF build_ids IS NOT NULL THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_smallest_door_records(build_ids, orientations, widths, heights, depths);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_smallest_door_records_from_tags()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        build_ids := ARRAY(SELECT DISTINCT build_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        build_ids := ARRAY(SELECT DISTINCT build_id FROM old_rows);
+    ELSE
+        build_ids := ARRAY(SELECT build_id FROM old_rows UNION SELECT build_id FROM new_rows);
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_smallest_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+-- The summaries store type and restriction names, so renaming one must refresh the builds using it.
+CREATE OR REPLACE FUNCTION public.trg_refresh_door_build_summaries_from_tag_names()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_TABLE_NAME = 'restrictions' THEN
+        build_ids := ARRAY(
+            SELECT DISTINCT br.build_id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            JOIN   public.build_restrictions br ON br.restriction_id = n.id
+            WHERE  n.name IS DISTINCT FROM o.name
+        );
+    ELSE
+        build_ids := ARRAY(
+            SELECT DISTINCT bt.build_id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            JOIN   public.build_types bt ON bt.type_id = n.id
+            WHERE  n.name IS DISTINCT FROM o.name
+        );
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_smallest_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER restrictions_refresh_door_build_summaries
+AFTER UPDATE ON public.restrictions
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_build_summaries_from_tag_names();
+
+CREATE TRIGGER types_refresh_door_build_summaries
+AFTER UPDATE ON public.types
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_build_summaries_from_tag_names();
+
+COMMIT;
@@ -0,0 +1,795 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  Fastest and First door records.
+--
+--  Both reuse the smallest records machinery: the per-build summaries,
+--  the bounded subset expansion and the per-group incremental refresh.
+--  A record is held per (orientation, door dims, types, restriction
+--  subset), like the smallest records.
+--
+--  Fastest: lowest opening + closing time, separately for the normal
+--           and the visible times.
+--  First:   earliest completion date (when a full date can be parsed
+--           from the free-form completion_time), then earliest submission.
+--------------------------------------------------------------------
+
+
+-- Parses a full date out of a free-form completion time, e.g. "2021-05-03" or "made on 2021/5/3".
+-- Partial dates such as "2021" or "2021-05" return NULL instead of being rounded to the start of the period, which
+-- would rank them ahead of precise dates from later in that period. Their First ranking falls back to the submission
+-- time, which is always a valid upper bound on when a build was completed.
+-- Only years from 2009 (the first Minecraft release) on are accepted, and the year must not be part of a longer number.
+CREATE OR REPLACE FUNCTION public.parse_completion_date(completion_time text)
+RETURNS date
+  LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS
+$$
+DECLARE
+    parts       text[];
+    v_year      int;
+    v_month     int;
+    v_day       int;
+    month_start date;
+BEGIN
+    parts := regexp_match(completion_time, '(?<!\d)(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?!\d)');
+    IF parts IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    v_year := parts[1]::int;
+    v_month := parts[2]::int;
+    v_day := parts[3]::int;
+    IF v_year NOT BETWEEN 2009 AND 2099 OR v_month NOT BETWEEN 1 AND 12 THEN
+        RETURN NULL;
+    END IF;
+
+    month_start := make_date(v_year, v_month, 1);
+    IF v_day NOT BETWEEN 1 AND extract(day FROM month_start + interval '1 month - 1 day') THEN
+        RETURN NULL;
+    END IF;
+    RETURN month_start + (v_day - 1);
+END;
+$$;
+
+
+--------------------------------------------------------------------
+--  Summaries: doors without full build dimensions can still hold
+--  Fastest and First records, so they are summarized too (with a
+--  NULL volume), and the times and dates are added.
+--------------------------------------------------------------------
+ALTER TABLE public.door_build_summaries
+    ALTER COLUMN volume DROP NOT NULL,
+    ADD COLUMN normal_opening_time  bigint,
+    ADD COLUMN normal_closing_time  bigint,
+    ADD COLUMN visible_opening_time bigint,
+    ADD COLUMN visible_closing_time bigint,
+    ADD COLUMN completed_on         date,
+    ADD COLUMN submission_time      timestamp;
+
+CREATE OR REPLACE VIEW public.door_build_summary_source AS
+SELECT
+    b.id                                            AS build_id,
+    d.orientation,
+    d.door_width,
+    d.door_height,
+    COALESCE(d.door_depth, 1)                       AS door_depth,
+    COALESCE(
+        ARRAY_AGG(DISTINCT t.name ORDER BY t.name)
+            FILTER (WHERE t.name IS NOT NULL),
+        ARRAY[]::text[]
+    ) AS types,
+    COALESCE(
+        ARRAY_AGG(DISTINCT r.name ORDER BY r.name)
+            FILTER (WHERE r.name IS NOT NULL),
+        ARRAY[]::text[]
+    ) AS restrictions,
+    b.width * b.height * b.depth                    AS volume,
+    d.normal_opening_time,
+    d.normal_closing_time,
+    d.visible_opening_time,
+    d.visible_closing_time,
+    public.parse_completion_date(b.completion_time) AS completed_on,
+    b.submission_time
+FROM   public.builds             b
+JOIN   public.doors              d  ON d.build_id = b.id
+LEFT   JOIN public.build_types   bt ON bt.build_id = b.id
+LEFT   JOIN public.types         t  ON t.id = bt.type_id
+LEFT   JOIN public.build_restrictions br ON br.build_id = b.id
+LEFT   JOIN public.restrictions  r  ON r.id = br.restriction_id
+WHERE  b.submission_status = 1
+  AND  b.category          = 'Door'
+GROUP  BY b.id, d.build_id;
+
+CREATE OR REPLACE FUNCTION public.refresh_door_build_summaries(p_build_ids bigint[])
+RETURNS void
+  LANGUAGE sql AS
+$$
+WITH current AS (
+    SELECT *
+    FROM   public.door_build_summary_source
+    WHERE  build_id = ANY (p_build_ids)
+),
+removed AS (
+    DELETE FROM public.door_build_summaries s
+    WHERE  s.build_id = ANY (p_build_ids)
+      AND  NOT EXISTS (SELECT 1 FROM current c WHERE c.build_id = s.build_id)
+)
+INSERT INTO public.door_build_summaries AS s
+       (build_id, orientation, door_width, door_height, door_depth,
+        types, restrictions, volume,
+        normal_opening_time, normal_closing_time, visible_opening_time, visible_closing_time,
+        completed_on, submission_time)
+SELECT build_id, orientation, door_width, door_height, door_depth,
+       types, restrictions, volume,
+       normal_opening_time, normal_closing_time, visible_opening_time, visible_closing_time,
+       completed_on, submission_time
+FROM   current
+ON CONFLICT (build_id)
+DO UPDATE
+    SET orientation          = EXCLUDED.orientation,
+        door_width           = EXCLUDED.door_width,
+        door_height          = EXCLUDED.door_height,
+        door_depth           = EXCLUDED.door_depth,
+        types                = EXCLUDED.types,
+        restrictions         = EXCLUDED.restrictions,
+        volume               = EXCLUDED.volume,
+        normal_opening_time  = EXCLUDED.normal_opening_time,
+        normal_closing_time  = EXCLUDED.normal_closing_time,
+        visible_opening_time = EXCLUDED.visible_opening_time,
+        visible_closing_time = EXCLUDED.visible_closing_time,
+        completed_on         = EXCLUDED.completed_on,
+        submission_time      = EXCLUDED.submission_time
+    WHERE (s.*) IS DISTINCT FROM (EXCLUDED.*);
+$$;
+
+TRUNCATE TABLE public.door_build_summaries;
+INSERT INTO public.door_build_summaries
+       (build_id, orientation, door_width, door_height, door_depth,
+        types, restrictions, volume,
+        normal_opening_time, normal_closing_time, visible_opening_time, visible_closing_time,
+        completed_on, submission_time)
+SELECT * FROM public.door_build_summary_source;
+
+
+--------------------------------------------------------------------
+--  Record tables
+--------------------------------------------------------------------
+CREATE TABLE public.fastest_door_records (
+    record_id          BIGSERIAL PRIMARY KEY,
+    id                 bigint NOT NULL REFERENCES public.builds (id) ON DELETE CASCADE,
+    title              text DEFAULT NULL, -- filled in by the bot, like smallest_door_records.title
+    metric             text NOT NULL CHECK (metric IN ('normal', 'visible')),
+    orientation        text NOT NULL,
+    door_width         int NOT NULL,
+    door_height        int NOT NULL,
+    door_depth         int NOT NULL DEFAULT 1,
+    types              text[] NOT NULL,
+    restrictions       text[] NOT NULL DEFAULT '{}',
+    opening_time       bigint NOT NULL,
+    closing_time       bigint NOT NULL,
+    total_time         bigint NOT NULL, -- opening_time + closing_time, what the record is ranked by
+    restriction_subset text[] NOT NULL,
+    UNIQUE (metric, orientation, door_width, door_height, door_depth, types, restriction_subset)
+);
+
+CREATE INDEX idx_fastest_door_records_dims
+      ON public.fastest_door_records
+          (orientation, door_width, door_height, door_depth);
+
+CREATE INDEX idx_fastest_door_records_id
+      ON public.fastest_door_records (id);
+
+CREATE TABLE public.first_door_records (
+    record_id          BIGSERIAL PRIMARY KEY,
+    id                 bigint NOT NULL REFERENCES public.builds (id) ON DELETE CASCADE,
+    title              text DEFAULT NULL, -- filled in by the bot, like smallest_door_records.title
+    orientation        text NOT NULL,
+    door_width         int NOT NULL,
+    door_height        int NOT NULL,
+    door_depth         int NOT NULL DEFAULT 1,
+    types              text[] NOT NULL,
+    restrictions       text[] NOT NULL DEFAULT '{}',
+    completed_on       date,      -- NULL if the completion time could not be parsed
+    submission_time    timestamp,
+    restriction_subset text[] NOT NULL,
+    UNIQUE (orientation, door_width, door_height, door_depth, types, restriction_subset)
+);
+
+CREATE INDEX idx_first_door_records_dims
+      ON public.first_door_records
+          (orientation, door_width, door_height, door_depth);
+
+CREATE INDEX idx_first_door_records_id
+      ON public.first_door_records (id);
+
+CREATE INDEX IF NOT EXISTS idx_smallest_door_records_id
+      ON public.smallest_door_records (id);
+
+
+--------------------------------------------------------------------
+--  Incremental refresh
+--------------------------------------------------------------------
+
+-- The door groups (orientation and door dimensions) whose records may change when the given builds change:
+-- the groups the builds are in, the groups they hold any record in, and the explicitly given groups.
+CREATE OR REPLACE FUNCTION public.affected_door_groups(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS TABLE (orientation text, door_width int, door_height int, door_depth int)
+  LANGUAGE sql STABLE AS
+$$
+    SELECT s.orientation, s.door_width, s.door_height, s.door_depth
+    FROM   public.door_build_summaries s
+    WHERE  s.build_id = ANY (p_build_ids)
+    UNION
+    SELECT s.orientation, s.door_width, s.door_height, s.door_depth
+    FROM   public.smallest_door_records s
+    WHERE  s.id = ANY (p_build_ids)
+    UNION
+    SELECT f.orientation, f.door_width, f.door_height, f.door_depth
+    FROM   public.fastest_door_records f
+    WHERE  f.id = ANY (p_build_ids)
+    UNION
+    SELECT f.orientation, f.door_width, f.door_height, f.door_depth
+    FROM   public.first_door_records f
+    WHERE  f.id = ANY (p_build_ids)
+    UNION
+    SELECT g.orientation, g.door_width, g.door_height, COALESCE(g.door_depth, 1)
+    FROM   unnest(p_orientations, p_widths, p_heights, p_depths)
+               AS g (orientation, door_width, door_height, door_depth);
+$$;
+
+
+-- Smallest records need the full build dimensions.
+CREATE OR REPLACE FUNCTION public.refresh_smallest_door_records(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS void
+  LANGUAGE sql AS
+$$
+WITH groups AS (
+    SELECT DISTINCT g.orientation, g.door_width, g.door_height, g.door_depth
+    FROM   public.affected_door_groups(p_build_ids, p_orientations, p_widths, p_heights, p_depths) g
+),
+winners AS (
+    SELECT DISTINCT ON
+           (b.orientation, b.door_width, b.door_height,
+            b.door_depth, b.types, ps)
+           b.build_id          AS id,
+           b.orientation, b.door_width, b.door_height,
+           b.door_depth, b.types, b.restrictions,
+           b.volume, ps        AS restriction_subset
+    FROM   groups g
+    JOIN   public.door_build_summaries b
+           ON  b.orientation = g.orientation
+           AND b.door_width  = g.door_width
+           AND b.door_height = g.door_height
+           AND b.door_depth  = g.door_depth
+    CROSS  JOIN LATERAL public.bounded_subsets(b.restrictions, 8) ps
+    WHERE  b.volume IS NOT NULL
+    ORDER  BY b.orientation, b.door_width, b.door_height, b.door_depth,
+              b.types, ps,
+              b.volume, b.build_id
+),
+stale AS (
+    DELETE FROM public.smallest_door_records s
+    USING  groups g
+    WHERE  s.orientation = g.orientation
+      AND  s.door_width  = g.door_width
+      AND  s.door_height = g.door_height
+      AND  s.door_depth  = g.door_depth
+      AND  NOT EXISTS (
+               SELECT 1
+               FROM   winners w
+               WHERE  w.orientation        = s.orientation
+                 AND  w.door_width         = s.door_width
+                 AND  w.door_height        = s.door_height
+                 AND  w.door_depth         = s.door_depth
+                 AND  w.types              = s.types
+                 AND  w.restriction_subset = s.restriction_subset
+           )
+)
+INSERT INTO public.smallest_door_records AS s
+       (id, orientation, door_width, door_height, door_depth,
+        types, restrictions, volume, restriction_subset)
+SELECT id, orientation, door_width, door_height, door_depth,
+       types, restrictions, volume, restriction_subset
+FROM   winners
+ON CONFLICT (orientation, door_width, door_height,
+             door_depth, types, restriction_subset)
+DO UPDATE
+    SET id            = EXCLUDED.id,
+        restrictions  = EXCLUDED.restrictions,
+        volume        = EXCLUDED.volume
+    WHERE (s.id, s.restrictions, s.volume)
+          IS DISTINCT FROM (EXCLUDED.id, EXCLUDED.restrictions, EXCLUDED.volume);
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.refresh_fastest_door_records(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS void
+  LANGUAGE sql AS
+$$
+WITH groups AS (
+    SELECT DISTINCT g.orientation, g.door_width, g.door_height, g.door_depth
+    FROM   public.affected_door_groups(p_build_ids, p_orientations, p_widths, p_heights, p_depths) g
+),
+winners AS (
+    SELECT DISTINCT ON
+           (m.metric, b.orientation, b.door_width, b.door_height,
+            b.door_depth, b.types, ps)
+           b.build_id          AS id,
+           m.metric,
+           b.orientation, b.door_width, b.door_height,
+           b.door_depth, b.types, b.restrictions,
+           m.opening_time, m.closing_time,
+           m.opening_time + m.closing_time AS total_time,
+           ps                  AS restriction_subset
+    FROM   groups g
+    JOIN   public.door_build_summaries b
+           ON  b.orientation = g.orientation
+           AND b.door_width  = g.door_width
+           AND b.door_height = g.door_height
+           AND b.door_depth  = g.door_depth
+    CROSS  JOIN LATERAL (
+               VALUES ('normal',  b.normal_opening_time,  b.normal_closing_time),
+                      ('visible', b.visible_opening_time, b.visible_closing_time)
+           ) AS m (metric, opening_time, closing_time)
+    CROSS  JOIN LATERAL public.bounded_subsets(b.restrictions, 8) ps
+    WHERE  m.opening_time IS NOT NULL
+      AND  m.closing_time IS NOT NULL
+    ORDER  BY m.metric, b.orientation, b.door_width, b.door_height, b.door_depth,
+              b.types, ps,
+              m.opening_time + m.closing_time, b.build_id
+),
+stale AS (
+    DELETE FROM public.fastest_door_records f
+    USING  groups g
+    WHERE  f.orientation = g.orientation
+      AND  f.door_width  = g.door_width
+      AND  f.door_height = g.door_height
+      AND  f.door_depth  = g.door_depth
+      AND  NOT EXISTS (
+               SELECT 1
+               FROM   winners w
+               WHERE  w.metric             = f.metric
+                 AND  w.orientation        = f.orientation
+                 AND  w.door_width         = f.door_width
+                 AND  w.door_height        = f.door_height
+                 AND  w.door_depth         = f.door_depth
+                 AND  w.types              = f.types
+                 AND  w.restriction_subset = f.restriction_subset
+           )
+)
+INSERT INTO public.fastest_door_records AS f
+       (id, metric, orientation, door_width, door_height, door_depth,
+        types, restrictions, opening_time, closing_time, total_time, restriction_subset)
+SELECT id, metric, orientation, door_width, door_height, door_depth,
+       types, restrictions, opening_time, closing_time, total_time, restriction_subset
+FROM   winners
+ON CONFLICT (metric, orientation, door_width, door_height,
+             door_depth, types, restriction_subset)
+DO UPDATE
+    SET id            = EXCLUDED.id,
+        restrictions  = EXCLUDED.restrictions,
+        opening_time  = EXCLUDED.opening_time,
+        closing_time  = EXCLUDED.closing_time,
+        total_time    = EXCLUDED.total_time
+    WHERE (f.id, f.restrictions, f.opening_time, f.closing_time)
+          IS DISTINCT FROM (EXCLUDED.id, EXCLUDED.restrictions, EXCLUDED.opening_time, EXCLUDED.closing_time);
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.refresh_first_door_records(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS void
+  LANGUAGE sql AS
+$$
+WITH groups AS (
+    SELECT DISTINCT g.orientation, g.door_width, g.door_height, g.door_depth
+    FROM   public.affected_door_groups(p_build_ids, p_orientations, p_widths, p_heights, p_depths) g
+),
+winners AS (
+    SELECT DISTINCT ON
+           (b.orientation, b.door_width, b.door_height,
+            b.door_depth, b.types, ps)
+           b.build_id          AS id,
+           b.orientation, b.door_width, b.door_height,
+           b.door_depth, b.types, b.restrictions,
+           b.completed_on, b.submission_time,
+           ps                  AS restriction_subset
+    FROM   groups g
+    JOIN   public.door_build_summaries b
+           ON  b.orientation = g.orientation
+           AND b.door_width  = g.door_width
+           AND b.door_height = g.door_height
+           AND b.door_depth  = g.door_depth
+    CROSS  JOIN LATERAL public.bounded_subsets(b.restrictions, 8) ps
+    ORDER  BY b.orientation, b.door_width, b.door_height, b.door_depth,
+              b.types, ps,
+              COALESCE(b.completed_on, b.submission_time::date) NULLS LAST,
+              b.submission_time NULLS LAST, b.build_id
+),
+stale AS (
+    DELETE FROM public.first_door_records f
+    USING  groups g
+    WHERE  f.orientation = g.orientation
+      AND  f.door_width  = g.door_width
+      AND  f.door_height = g.door_height
+      AND  f.door_depth  = g.door_depth
+      AND  NOT EXISTS (
+               SELECT 1
+               FROM   winners w
+               WHERE  w.orientation        = f.orientation
+                 AND  w.door_width         = f.door_width
+                 AND  w.door_height        = f.door_height
+                 AND  w.door_depth         = f.door_depth
+                 AND  w.types              = f.types
+                 AND  w.restriction_subset = f.restriction_subset
+           )
+)
+INSERT INTO public.first_door_records AS f
+       (id, orientation, door_width, door_height, door_depth,
+        types, restrictions, completed_on, submission_time, restriction_subset)
+SELECT id, orientation, door_width, door_height, door_depth,
+       types, restrictions, completed_on, submission_time, restriction_subset
+FROM   winners
+ON CONFLICT (orientation, door_width, door_height,
+             door_depth, types, restriction_subset)
+DO UPDATE
+    SET id              = EXCLUDED.id,
+        restrictions    = EXCLUDED.restrictions,
+        completed_on    = EXCLUDED.completed_on,
+        submission_time = EXCLUDED.submission_time
+    WHERE (f.id, f.restrictions, f.completed_on, f.submission_time)
+          IS DISTINCT FROM (EXCLUDED.id, EXCLUDED.restrictions, EXCLUDED.completed_on, EXCLUDED.submission_time);
+$$;
+
+
+-- Refreshes every record category. The affected groups are computed once, before any record table changes.
+-- Callers must refresh the summaries of p_build_ids first.
+CREATE OR REPLACE FUNCTION public.refresh_door_records(
+        p_build_ids    bigint[],
+        p_orientations text[] DEFAULT '{}',
+        p_widths       int[]  DEFAULT '{}',
+        p_heights      int[]  DEFAULT '{}',
+        p_depths       int[]  DEFAULT '{}'
+) RETURNS void
+  LANGUAGE plpgsql AS
+$$
+DECLARE
+    orientations text[];
+    widths       int[];
+    heights      int[];
+    depths       int[];
+BEGIN
+    SELECT array_agg(g.orientation), array_agg(g.door_width), array_agg(g.door_height), array_agg(g.door_depth)
+    INTO   orientations, widths, heights, depths
+    FROM   public.affected_door_groups(p_build_ids, p_orientations, p_widths, p_heights, p_depths) g;
+
+    IF orientations IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM public.refresh_smallest_door_records('{}', orientations, widths, heights, depths);
+    PERFORM public.refresh_fastest_door_records('{}', orientations, widths, heights, depths);
+    PERFORM public.refresh_first_door_records('{}', orientations, widths, heights, depths);
+END;
+$$;
+
+
+--------------------------------------------------------------------
+--  Full rebuilds
+--------------------------------------------------------------------
+CREATE OR REPLACE PROCEDURE public.rebuild_smallest_door_records()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- 1. Take an exclusive lock so readers don’t see half a table.
+    LOCK TABLE public.door_build_summaries, public.smallest_door_records IN ACCESS EXCLUSIVE MODE;
+
+    -- 2. Rebuild the summaries from the join tables.
+    TRUNCATE TABLE public.door_build_summaries;
+    INSERT INTO public.door_build_summaries
+           (build_id, orientation, door_width, door_height, door_depth,
+            types, restrictions, volume,
+            normal_opening_time, normal_closing_time, visible_opening_time, visible_closing_time,
+            completed_on, submission_time)
+    SELECT * FROM public.door_build_summary_source;
+
+    -- 3. Re-insert the records from the summaries.
+    TRUNCATE TABLE public.smallest_door_records;
+    WITH exploded AS (
+        SELECT  s.*,
+                ps AS restriction_subset
+        FROM    public.door_build_summaries s
+        CROSS   JOIN LATERAL public.bounded_subsets(s.restrictions, 8) ps
+        WHERE   s.volume IS NOT NULL
+    ), ranked AS (
+        SELECT  *,
+                ROW_NUMBER() OVER (
+                    PARTITION BY types,
+                                 orientation, door_width,
+                                 door_height, door_depth,
+                                 restriction_subset
+                    ORDER BY volume, build_id
+                ) AS rn
+        FROM exploded
+    )
+    INSERT INTO public.smallest_door_records
+           (id, orientation, door_width, door_height, door_depth,
+            types, restrictions, volume, restriction_subset)
+    SELECT build_id, orientation, door_width, door_height,
+           door_depth, types, restrictions, volume, restriction_subset
+    FROM   ranked
+    WHERE  rn = 1;
+END;
+$$;
+
+-- Rebuilds the Fastest and First records from the summaries. Run rebuild_smallest_door_records first
+-- if the summaries may be out of date.
+CREATE OR REPLACE PROCEDURE public.rebuild_fastest_and_first_door_records()
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    orientations text[];
+    widths       int[];
+    heights      int[];
+    depths       int[];
+BEGIN
+    LOCK TABLE public.fastest_door_records, public.first_door_records IN ACCESS EXCLUSIVE MODE;
+    TRUNCATE TABLE public.fastest_door_records, public.first_door_records;
+
+    SELECT array_agg(orientation), array_agg(door_width), array_agg(door_height), array_agg(door_depth)
+    INTO   orientations, widths, heights, depths
+    FROM   (SELECT DISTINCT orientation, door_width, door_height, door_depth
+            FROM public.door_build_summaries) AS g;
+
+    IF orientations IS NOT NULL THEN
+        PERFORM public.refresh_fastest_door_records('{}', orientations, widths, heights, depths);
+        PERFORM public.refresh_first_door_records('{}', orientations, widths, heights, depths);
+    END IF;
+END;
+$$;
+
+CALL public.rebuild_fastest_and_first_door_records();
+
+
+--------------------------------------------------------------------
+--  Triggers
+--------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.trg_refresh_door_records_from_builds()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        build_ids := ARRAY(SELECT id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        build_ids := ARRAY(SELECT id FROM old_rows);
+    ELSE
+        -- Most updates (e.g. edits to the description or embedding) cannot change any record
+        build_ids := ARRAY(
+            SELECT n.id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            WHERE  (n.submission_status, n.category, n.width, n.height, n.depth,
+                    n.completion_time, n.submission_time)
+                   IS DISTINCT FROM
+                   (o.submission_status, o.category, o.width, o.height, o.depth,
+                    o.completion_time, o.submission_time)
+        );
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_door_records_from_doors()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids    bigint[];
+    orientations text[];
+    widths       int[];
+    heights      int[];
+    depths       int[];
+BEGIN
+    -- The door groups are passed explicitly, because the old group of a deleted or resized door
+    -- can no longer be found from the doors table.
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   old_rows;
+    ELSE
+        SELECT array_agg(build_id), array_agg(orientation), array_agg(door_width),
+               array_agg(door_height), array_agg(door_depth)
+        INTO   build_ids, orientations, widths, heights, depths
+        FROM   (
+            SELECT o.build_id, o.orientation, o.door_width, o.door_height, o.door_depth
+            FROM   old_rows o
+            JOIN   new_rows n ON n.build_id = o.build_id
+            WHERE  (n.orientation, n.door_width, n.door_height, n.door_depth,
+                    n.normal_opening_time, n.normal_closing_time, n.visible_opening_time, n.visible_closing_time)
+                   IS DISTINCT FROM
+                   (o.orientation, o.door_width, o.door_height, o.door_depth,
+                    o.normal_opening_time, o.normal_closing_time, o.visible_opening_time, o.visible_closing_time)
+        ) AS changed;
+    END IF;
+
+    IF build_ids IS NOT NULL THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_door_records(build_ids, orientations, widths, heights, depths);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_door_records_from_tags()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        build_ids := ARRAY(SELECT DISTINCT build_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        build_ids := ARRAY(SELECT DISTINCT build_id FROM old_rows);
+    ELSE
+        build_ids := ARRAY(SELECT build_id FROM old_rows UNION SELECT build_id FROM new_rows);
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.trg_refresh_door_build_summaries_from_tag_names()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    build_ids bigint[];
+BEGIN
+    IF TG_TABLE_NAME = 'restrictions' THEN
+        build_ids := ARRAY(
+            SELECT DISTINCT br.build_id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            JOIN   public.build_restrictions br ON br.restriction_id = n.id
+            WHERE  n.name IS DISTINCT FROM o.name
+        );
+    ELSE
+        build_ids := ARRAY(
+            SELECT DISTINCT bt.build_id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.id = n.id
+            JOIN   public.build_types bt ON bt.type_id = n.id
+            WHERE  n.name IS DISTINCT FROM o.name
+        );
+    END IF;
+
+    IF cardinality(build_ids) > 0 THEN
+        PERFORM public.refresh_door_build_summaries(build_ids);
+        PERFORM public.refresh_door_records(build_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+--------------------------------------------------------------------
+--  The triggers refresh every record category now, so they and their
+--  functions no longer carry the "smallest" name.
+--------------------------------------------------------------------
+DROP TRIGGER IF EXISTS builds_refresh_smallest_door_insert ON public.builds;
+DROP TRIGGER IF EXISTS builds_refresh_smallest_door_update ON public.builds;
+DROP TRIGGER IF EXISTS builds_refresh_smallest_door_delete ON public.builds;
+DROP TRIGGER IF EXISTS doors_refresh_smallest_door_insert ON public.doors;
+DROP TRIGGER IF EXISTS doors_refresh_smallest_door_update ON public.doors;
+DROP TRIGGER IF EXISTS doors_refresh_smallest_door_delete ON public.doors;
+DROP TRIGGER IF EXISTS build_types_refresh_smallest_door_insert ON public.build_types;
+DROP TRIGGER IF EXISTS build_types_refresh_smallest_door_update ON public.build_types;
+DROP TRIGGER IF EXISTS build_types_refresh_smallest_door_delete ON public.build_types;
+DROP TRIGGER IF EXISTS build_restrictions_refresh_smallest_door_insert ON public.build_restrictions;
+DROP TRIGGER IF EXISTS build_restrictions_refresh_smallest_door_update ON public.build_restrictions;
+DROP TRIGGER IF EXISTS build_restrictions_refresh_smallest_door_delete ON public.build_restrictions;
+DROP FUNCTION IF EXISTS public.trg_refresh_smallest_door_records_from_builds();
+DROP FUNCTION IF EXISTS public.trg_refresh_smallest_door_records_from_doors();
+DROP FUNCTION IF EXISTS public.trg_refresh_smallest_door_records_from_tags();
+
+CREATE TRIGGER builds_refresh_door_records_insert
+AFTER INSERT ON public.builds
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_builds();
+
+CREATE TRIGGER builds_refresh_door_records_update
+AFTER UPDATE ON public.builds
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_builds();
+
+CREATE TRIGGER builds_refresh_door_records_delete
+AFTER DELETE ON public.builds
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_builds();
+
+CREATE TRIGGER doors_refresh_door_records_insert
+AFTER INSERT ON public.doors
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_doors();
+
+CREATE TRIGGER doors_refresh_door_records_update
+AFTER UPDATE ON public.doors
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_doors();
+
+CREATE TRIGGER doors_refresh_door_records_delete
+AFTER DELETE ON public.doors
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_doors();
+
+CREATE TRIGGER build_types_refresh_door_records_insert
+AFTER INSERT ON public.build_types
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_tags();
+
+CREATE TRIGGER build_types_refresh_door_records_update
+AFTER UPDATE ON public.build_types
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_tags();
+
+CREATE TRIGGER build_types_refresh_door_records_delete
+AFTER DELETE ON public.build_types
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_tags();
+
+CREATE TRIGGER build_restrictions_refresh_door_records_insert
+AFTER INSERT ON public.build_restrictions
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_tags();
+
+CREATE TRIGGER build_restrictions_refresh_door_records_update
+AFTER UPDATE ON public.build_restrictions
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_tags();
+
+CREATE TRIGGER build_restrictions_refresh_door_records_delete
+AFTER DELETE ON public.build_restrictions
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_refresh_door_records_from_tags();
+
+COMMIT;
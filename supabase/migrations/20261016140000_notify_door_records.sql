@@ -0,0 +1,98 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  Announce changes to the door record tables on the door_records
+--  channel, so the bot can title new records and update its search
+--  index as soon as they are created, instead of polling for them.
+--
+--  Payload (JSON):
+--      {"table": "smallest_door_records", "op": "INSERT", "record_ids": [1, 2, 3]}
+--
+--  INSERT announces records that still need a title, UPDATE announces
+--  records whose contents changed (writing a title is not announced,
+--  the bot already knows about it), and DELETE announces removed records.
+--------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.trg_notify_door_records()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    record_ids bigint[];
+    batch_size CONSTANT int := 500;  -- NOTIFY payloads must be shorter than 8000 bytes
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        record_ids := ARRAY(SELECT record_id FROM new_rows WHERE title IS NULL ORDER BY record_id);
+    ELSIF TG_OP = 'DELETE' THEN
+        record_ids := ARRAY(SELECT record_id FROM old_rows ORDER BY record_id);
+    ELSE
+        record_ids := ARRAY(
+            SELECT n.record_id
+            FROM   new_rows n
+            JOIN   old_rows o ON o.record_id = n.record_id
+            WHERE  n.title IS NOT DISTINCT FROM o.title
+              AND  (n.*) IS DISTINCT FROM (o.*)
+            ORDER  BY n.record_id
+        );
+    END IF;
+
+    FOR i IN 1 .. cardinality(record_ids) BY batch_size LOOP
+        PERFORM pg_notify(
+            'door_records',
+            json_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'record_ids', record_ids[i : i + batch_size - 1]
+            )::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE TRIGGER smallest_door_records_notify_insert
+AFTER INSERT ON public.smallest_door_records
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER smallest_door_records_notify_update
+AFTER UPDATE ON public.smallest_door_records
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER smallest_door_records_notify_delete
+AFTER DELETE ON public.smallest_door_records
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER fastest_door_records_notify_insert
+AFTER INSERT ON public.fastest_door_records
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER fastest_door_records_notify_update
+AFTER UPDATE ON public.fastest_door_records
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER fastest_door_records_notify_delete
+AFTER DELETE ON public.fastest_door_records
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER first_door_records_notify_insert
+AFTER INSERT ON public.first_door_records
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER first_door_records_notify_update
+AFTER UPDATE ON public.first_door_records
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+CREATE TRIGGER first_door_records_notify_delete
+AFTER DELETE ON public.first_door_records
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_door_records();
+
+COMMIT;
@@ -0,0 +1,97 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  Publish changes to cached tables on the cache_invalidation channel,
+--  so the bot can cache them indefinitely and drop exactly what changed.
+--
+--  Payload (JSON):
+--      {"table": "versions", "keys": ["Java"]}
+--
+--  The trigger argument names a key column. "keys" holds the distinct
+--  values of that column among the changed rows, so caches keyed by it
+--  can be invalidated precisely. "keys" is null when the table has no
+--  key column, was truncated, or too many keys changed to fit in a
+--  notification; then everything cached from the table is stale.
+--
+--  Identical notifications in one transaction are only delivered once.
+--------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.trg_notify_cache_invalidation()
+RETURNS trigger
+LANGUAGE plpgsql AS
+$$
+DECLARE
+    key_column text := TG_ARGV[0];
+    changed    text;
+    keys       text[];
+    payload    text;
+BEGIN
+    IF TG_OP <> 'TRUNCATE' THEN
+        changed := CASE TG_OP
+            WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+            WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+            ELSE 'SELECT * FROM old_rows UNION ALL SELECT * FROM new_rows'
+        END;
+        IF key_column IS NULL THEN
+            EXECUTE format('SELECT ARRAY(SELECT NULL::text FROM (%s) AS changed LIMIT 1)', changed) INTO keys;
+        ELSE
+            EXECUTE format('SELECT ARRAY(SELECT DISTINCT %I::text FROM (%s) AS changed)', key_column, changed)
+            INTO keys;
+        END IF;
+        IF cardinality(keys) = 0 THEN
+            RETURN NULL;  -- The statement changed no rows
+        END IF;
+    END IF;
+
+    payload := json_build_object('table', TG_TABLE_NAME, 'keys', CASE WHEN key_column IS NULL THEN NULL ELSE keys END)::text;
+    IF octet_length(payload) >= 8000 THEN  -- NOTIFY payloads must be shorter than 8000 bytes
+        payload := json_build_object('table', TG_TABLE_NAME, 'keys', NULL)::text;
+    END IF;
+    PERFORM pg_notify('cache_invalidation', payload);
+    RETURN NULL;
+END;
+$$;
+
+
+DO
+$$
+DECLARE
+    target record;
+    key_arg text;
+BEGIN
+    FOR target IN
+        SELECT * FROM (VALUES
+            ('restrictions',          NULL),
+            ('restriction_aliases',   NULL),
+            ('types',                 NULL),
+            ('versions',              'edition'),
+            ('server_settings',       'server_id'),
+            ('smallest_door_records', NULL)
+        ) AS t (table_name, key_column)
+    LOOP
+        key_arg := CASE WHEN target.key_column IS NULL THEN '' ELSE quote_literal(target.key_column) END;
+
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON public.%I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%s)',
+            target.table_name || '_invalidate_insert', target.table_name, key_arg
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER UPDATE ON public.%I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%s)',
+            target.table_name || '_invalidate_update', target.table_name, key_arg
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON public.%I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%s)',
+            target.table_name || '_invalidate_delete', target.table_name, key_arg
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON public.%I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%s)',
+            target.table_name || '_invalidate_truncate', target.table_name, key_arg
+        );
+    END LOOP;
+END;
+$$;
+
+COMMIT;
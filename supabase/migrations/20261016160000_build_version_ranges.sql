@@ -0,0 +1,50 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  Store the versions a build works in as ranges of version ordinals.
+--
+--  A version ordinal packs the edition and version number into an int,
+--  ordered like the versions themselves:
+--      bit 29       edition (0 = Java, 1 = Bedrock)
+--      bits 22..28  major version
+--      bits 12..21  minor version
+--      bits  0..11  patch number
+--  Ordinals are computed from the version number alone, so adding a new
+--  version never changes existing ordinals, and an open-ended spec like
+--  "1.19+" covers versions released after the build was saved.
+--
+--  Version filters become a GiST-indexed containment check
+--  (version_ranges @> version_ordinal(...)) instead of a join through
+--  build_versions. squid.db.version_resolver mirrors this encoding.
+--------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.version_ordinal(edition text, major int, minor int, patch int)
+RETURNS int
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE AS
+$$
+    SELECT (CASE edition WHEN 'Bedrock' THEN 1 ELSE 0 END << 29) | (major << 22) | (minor << 12) | patch;
+$$;
+
+
+ALTER TABLE public.builds
+    ADD COLUMN version_ranges int4multirange NOT NULL DEFAULT '{}';
+
+-- Existing builds only know their resolved versions, so open-ended specs are
+-- widened the next time the build is saved.
+UPDATE public.builds b
+SET    version_ranges = r.version_ranges
+FROM   (
+    SELECT bv.build_id,
+           range_agg(int4range(o.ordinal, o.ordinal + 1)) AS version_ranges
+    FROM   public.build_versions bv
+    JOIN   public.versions v ON v.id = bv.version_id
+    CROSS  JOIN LATERAL (
+               SELECT public.version_ordinal(v.edition, v.major_version, v.minor_version, v.patch_number) AS ordinal
+           ) AS o
+    GROUP  BY bv.build_id
+) AS r
+WHERE  r.build_id = b.id;
+
+CREATE INDEX builds_version_ranges_idx ON public.builds USING gist (version_ranges);
+
+COMMIT;
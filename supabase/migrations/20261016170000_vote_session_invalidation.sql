@@ -0,0 +1,47 @@
+BEGIN;
+
+--------------------------------------------------------------------
+--  Publish changes to builds, votes and vote sessions on the
+--  cache_invalidation channel (see trg_notify_cache_invalidation).
+--
+--  The bot keeps open vote sessions in memory, and reloads a session
+--  when its build is saved, or when its votes or status are changed by
+--  another process. Cached builds are evicted the same way.
+--------------------------------------------------------------------
+DO
+$$
+DECLARE
+    target record;
+BEGIN
+    FOR target IN
+        SELECT * FROM (VALUES
+            ('builds',        'id'),
+            ('votes',         'vote_session_id'),
+            ('vote_sessions', 'id')
+        ) AS t (table_name, key_column)
+    LOOP
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON public.%I REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%L)',
+            target.table_name || '_invalidate_insert', target.table_name, target.key_column
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER UPDATE ON public.%I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%L)',
+            target.table_name || '_invalidate_update', target.table_name, target.key_column
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER DELETE ON public.%I REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%L)',
+            target.table_name || '_invalidate_delete', target.table_name, target.key_column
+        );
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER TRUNCATE ON public.%I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.trg_notify_cache_invalidation(%L)',
+            target.table_name || '_invalidate_truncate', target.table_name, target.key_column
+        );
+    END LOOP;
+END;
+$$;
+
+COMMIT;
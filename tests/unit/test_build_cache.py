@@ -0,0 +1,106 @@
+import pytest
+
+from squid.db.build_cache import BuildCache
+from squid.db.builds import Build
+from squid.db.schema import BuildCategory, Status
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_build(build_id: int, message_id: int | None = None) -> Build:
+    return Build(
+        id=build_id,
+        submission_status=Status.PENDING,
+        category=BuildCategory.DOOR,
+        door_orientation_type="Door",
+        door_width=2,
+        door_height=2,
+        original_message_id=message_id,
+    )
+
+
+@pytest.mark.unit
+class TestBuildCache:
+    """Tests for the in-process build cache."""
+
+    def test_get_returns_copy(self):
+        """Mutating a build returned by the cache does not change the cached snapshot."""
+        cache = BuildCache()
+        cache.put(make_build(1))
+
+        first = cache.get(1)
+        assert first is not None
+        first.door_width = 5
+        first.door_type.append("Funnel")
+
+        second = cache.get(1)
+        assert second is not None
+        assert second.door_width == 2
+        assert second.door_type == []
+        assert second.lock is not first.lock
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        cache = BuildCache()
+        assert cache.get(1) is None
+        cache.put(make_build(1))
+        assert cache.get(1) is not None
+
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+
+    def test_lookup_by_original_message_id(self):
+        """Builds can be found by the id of their original message."""
+        cache = BuildCache()
+        cache.put(make_build(1, message_id=100))
+
+        build = cache.get_by_message_id(100)
+        assert build is not None
+        assert build.id == 1
+
+        cache.invalidate(1)
+        assert cache.get_by_message_id(100) is None
+
+    def test_lru_eviction(self):
+        """The least recently used build is evicted when the cache is full."""
+        cache = BuildCache(max_size=2)
+        cache.put(make_build(1))
+        cache.put(make_build(2))
+        cache.get(1)
+        cache.put(make_build(3))
+
+        assert 1 in cache
+        assert 2 not in cache
+        assert 3 in cache
+        assert cache.stats.evictions == 1
+
+    def test_ttl_expiry(self):
+        """Builds expire after the time-to-live."""
+        clock = FakeClock()
+        cache = BuildCache(ttl=10, clock=clock)
+        cache.put(make_build(1))
+
+        clock.now = 9.9
+        assert cache.get(1) is not None
+        clock.now = 10
+        assert cache.get(1) is None
+        assert len(cache) == 0
+
+    def test_stale_read_is_discarded(self):
+        """A read that started before a write does not overwrite the written build."""
+        cache = BuildCache()
+        token = cache.token(1)
+        cache.invalidate(1)  # A write happens while the read is in flight
+
+        cache.put(make_build(1), token=token)
+        assert 1 not in cache
+
+        cache.put(make_build(1), token=cache.token(1))
+        assert 1 in cache
@@ -0,0 +1,271 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from squid.db.build_manager import BuildManager, RelationshipChanges
+from squid.db.builds import Build, BuildLock
+from squid.db.schema import BuildCategory, BuildLink, Door, Info, MediaTypeLiteral, Restriction, Status, User
+
+
+def make_user(user_id: int, ign: str) -> User:
+    user = User(ign=ign)
+    user.id = user_id
+    return user
+
+
+@pytest.mark.unit
+class TestGetOrCreateUsers:
+    """Tests for resolving build creators by IGN."""
+
+    async def test_existing_users_single_query(self):
+        """When every IGN exists, only one SELECT is issued and the input order is kept."""
+        session = AsyncMock()
+        session.scalars.return_value = [make_user(2, "Bob"), make_user(1, "Alice")]
+
+        users = await BuildManager._get_or_create_users(session, ["Alice", "Bob", "Alice"])  # pyright: ignore[reportPrivateUsage]
+
+        assert [u.ign for u in users] == ["Alice", "Bob"]
+        assert session.scalars.await_count == 1
+
+    async def test_missing_users_are_inserted_in_one_statement(self):
+        """Missing IGNs are inserted with a single multi-row INSERT."""
+        session = AsyncMock()
+        session.scalars.side_effect = [
+            [make_user(1, "Alice")],
+            [make_user(5, "Carol"), make_user(6, "Dave")],
+        ]
+
+        users = await BuildManager._get_or_create_users(session, ["Dave", "Alice", "Carol"])  # pyright: ignore[reportPrivateUsage]
+
+        assert [u.id for u in users] == [6, 1, 5]
+        assert session.scalars.await_count == 2
+        _, params = session.scalars.await_args_list[1].args
+        assert params == [{"ign": "Dave"}, {"ign": "Carol"}]
+
+    async def test_duplicate_igns_prefer_oldest_user(self):
+        """If the database has duplicate IGNs, the oldest user is used."""
+        session = AsyncMock()
+        session.scalars.return_value = [make_user(1, "Alice"), make_user(9, "Alice")]
+
+        users = await BuildManager._get_or_create_users(session, ["Alice"])  # pyright: ignore[reportPrivateUsage]
+
+        assert [u.id for u in users] == [1]
+
+    async def test_no_igns(self):
+        """No queries are issued when there are no creators."""
+        session = AsyncMock()
+        assert await BuildManager._get_or_create_users(session, []) == []  # pyright: ignore[reportPrivateUsage]
+        session.scalars.assert_not_awaited()
+
+
+def create_link(url: str, media_type: MediaTypeLiteral) -> BuildLink:
+    return BuildLink(url=url, media_type=media_type)
+
+
+def update_media_type(link: BuildLink, media_type: MediaTypeLiteral) -> bool:
+    if link.media_type == media_type:
+        return False
+    link.media_type = media_type
+    return True
+
+
+@pytest.mark.unit
+class TestSyncAssociation:
+    """Tests for diff-based persistence of join table rows."""
+
+    async def test_unchanged_rows_are_not_touched(self):
+        """Saving the same links again writes nothing."""
+        session = AsyncMock()
+        rows = [BuildLink(url="a", media_type="image"), BuildLink(url="b", media_type="video")]
+        desired: dict[str, MediaTypeLiteral] = {"a": "image", "b": "video"}
+
+        changes = await BuildManager._sync_association(  # pyright: ignore[reportPrivateUsage]
+            session,
+            rows,
+            existing_key=lambda row: row.url,
+            desired=desired,
+            create=create_link,
+            update=update_media_type,
+        )
+
+        assert changes == RelationshipChanges()
+        assert changes.rows_touched == 0
+        session.delete.assert_not_awaited()
+
+    async def test_only_differences_are_written(self):
+        """Rows are inserted, updated and deleted only where the desired state differs."""
+        session = AsyncMock()
+        kept = BuildLink(url="a", media_type="image")
+        retyped = BuildLink(url="b", media_type="image")
+        removed = BuildLink(url="c", media_type="image")
+        rows = [kept, retyped, removed]
+        desired: dict[str, MediaTypeLiteral] = {"a": "image", "b": "video", "d": "world-download"}
+
+        changes = await BuildManager._sync_association(  # pyright: ignore[reportPrivateUsage]
+            session,
+            rows,
+            existing_key=lambda row: row.url,
+            desired=desired,
+            create=create_link,
+            update=update_media_type,
+        )
+
+        assert changes == RelationshipChanges(inserted=1, updated=1, deleted=1)
+        assert [row.url for row in rows] == ["a", "b", "d"]
+        assert retyped.media_type == "video"
+        session.delete.assert_awaited_once_with(removed)
+
+
+def make_restriction_map() -> dict[str, Restriction]:
+    restrictions = [
+        Restriction(build_category="Door", name="Seamless", type="component"),
+        Restriction(build_category="Door", name="Flush", type="wiring-placement"),
+    ]
+    return {r.name.lower(): r for r in restrictions}
+
+
+@pytest.mark.unit
+class TestDoorRecordTitle:
+    """Tests for titling door records in bulk from a preloaded restriction map."""
+
+    def make_row(self, **kwargs: object) -> SimpleNamespace:
+        fields = {
+            "record_id": 1,
+            "door_width": 2,
+            "door_height": 2,
+            "door_depth": 1,
+            "types": ["Regular"],
+            "orientation": "Door",
+            "restriction_subset": ["flush", "seamless"],
+        }
+        return SimpleNamespace(**(fields | kwargs))
+
+    def test_restrictions_are_resolved_from_map(self):
+        """Restrictions are matched case-insensitively and use their canonical names."""
+        title = BuildManager._door_record_title("Smallest", self.make_row(), make_restriction_map())  # pyright: ignore[reportPrivateUsage, reportArgumentType]
+
+        assert "Seamless" in title
+        assert "Flush" in title
+        assert title.startswith("Smallest")
+
+    def test_visible_metric(self):
+        """Visible fastest records are titled as such."""
+        row = self.make_row(metric="visible")
+
+        title = BuildManager._door_record_title("Fastest", row, make_restriction_map())  # pyright: ignore[reportPrivateUsage, reportArgumentType]
+
+        assert title.startswith("Fastest Visible ")
+
+    def test_untyped_restriction_is_a_bug(self):
+        """A restriction without a type in the database raises."""
+        restrictions = {"seamless": Restriction(build_category="Door", name="Seamless", type=None)}
+
+        with pytest.raises(RuntimeError):
+            BuildManager._door_record_title("Smallest", self.make_row(), restrictions)  # pyright: ignore[reportPrivateUsage, reportArgumentType]
+
+
+def make_sql_door(build_id: int, extra_info: Info) -> Door:
+    door = Door(
+        submission_status=Status.CONFIRMED,
+        record_category=None,
+        width=None,
+        height=None,
+        depth=None,
+        completion_time=None,
+        category=BuildCategory.DOOR,
+        submitter_id=1,
+        extra_info=extra_info,
+        orientation="Door",
+        door_width=2,
+        door_height=2,
+        door_depth=None,
+        normal_opening_time=None,
+        normal_closing_time=None,
+        visible_opening_time=None,
+        visible_closing_time=None,
+    )
+    door.id = build_id
+    return door
+
+
+def make_saved_build(build_id: int) -> Build:
+    return Build(
+        id=build_id,
+        submission_status=Status.CONFIRMED,
+        category=BuildCategory.DOOR,
+        door_orientation_type="Door",
+        door_width=2,
+        door_height=2,
+        submitter_id=1,
+        component_restrictions=["Not A Restriction"],
+    )
+
+
+@pytest.mark.unit
+class TestSave:
+    """Tests for saving builds through the manager."""
+
+    async def test_save_invalidates_cached_build(self):
+        """The caller's un-normalized build is not cached, the next read goes to the database."""
+        manager = BuildManager(MagicMock())
+        build = make_saved_build(1)
+        manager.cache.put(build)
+
+        with (
+            patch.object(BuildLock, "acquire", AsyncMock(return_value=True)),
+            patch.object(BuildManager, "_update", AsyncMock(return_value=RelationshipChanges())),
+        ):
+            await manager.save(build)
+
+        assert 1 not in manager.cache
+
+    async def test_edited_extra_info_is_written(self):
+        """Edits to extra_info, including unknown restrictions found while saving, reach the database row."""
+        sql_door = make_sql_door(1, {"user": "old notes"})
+        session = AsyncMock()
+        session.execute.return_value = Mock(scalar_one=Mock(return_value=sql_door))
+        session_maker = MagicMock()
+        session_maker.return_value.__aenter__.return_value = session
+        manager = BuildManager(session_maker)
+
+        async def sync_relationships(build: Build, *_: object) -> RelationshipChanges:
+            build.extra_info["unknown_restrictions"] = {"component_restrictions": ["Not A Restriction"]}
+            return RelationshipChanges()
+
+        build = make_saved_build(1)
+        build.extra_info["user"] = "new notes"
+        with (
+            patch.object(BuildLock, "acquire", AsyncMock(return_value=True)),
+            patch.object(BuildManager, "_sync_relationships", AsyncMock(side_effect=sync_relationships)),
+        ):
+            await manager.save(build)
+
+        assert sql_door.extra_info == {
+            "user": "new notes",
+            "unknown_restrictions": {"component_restrictions": ["Not A Restriction"]},
+        }
+        session.commit.assert_awaited_once()
+
+
+@pytest.mark.unit
+class TestStatusChange:
+    """Tests for confirming and denying builds."""
+
+    @pytest.mark.parametrize("method", ["confirm", "deny"])
+    async def test_failed_change_is_not_embedded(self, method: str):
+        """A status change that updated no row does not schedule the build for re-embedding."""
+        session = AsyncMock()
+        session.execute.return_value = Mock(rowcount=0)
+        session_maker = MagicMock()
+        session_maker.return_value.__aenter__.return_value = session
+        manager = BuildManager(session_maker)
+        manager.embedding_pipeline = Mock()
+
+        with (
+            patch.object(BuildLock, "acquire", AsyncMock(return_value=True)),
+            pytest.raises(ValueError, match="Failed to"),
+        ):
+            await getattr(manager, method)(make_saved_build(1))
+
+        manager.embedding_pipeline.enqueue.assert_not_called()
@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from squid.db.build_manager import BuildManager
+from squid.db.build_query import BuildQuery
+from squid.db.builds import Build
+from squid.db.schema import Status
+
+
+def compile_query(query: BuildQuery) -> str:
+    return str(query.to_statement().compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.unit
+class TestBuildQuery:
+    """Tests for the composable build query builder."""
+
+    def test_queries_are_immutable(self):
+        """Builder methods return new queries and leave the original untouched."""
+        base = BuildQuery().where_status(Status.PENDING)
+        limited = base.limit(10)
+
+        assert base.max_rows is None
+        assert limited.max_rows == 10
+        assert limited.statuses == (Status.PENDING,)
+
+    def test_status_filter(self):
+        """Status filters compile to an IN clause on the builds table."""
+        sql = compile_query(BuildQuery().where_status(Status.PENDING, Status.CONFIRMED))
+        assert "builds.submission_status IN (0, 1)" in sql
+
+    def test_door_filters_select_doors(self):
+        """Filtering on door columns selects from the doors table."""
+        query = BuildQuery().where_range("door_width", minimum=2, maximum=3).where_orientation("Trapdoor")
+        assert query.only_doors
+        sql = compile_query(query)
+        assert "doors.door_width >= 2" in sql
+        assert "doors.door_width <= 3" in sql
+        assert "doors.orientation IN ('Trapdoor')" in sql
+
+    def test_invalid_range_field(self):
+        """Only numeric columns can be filtered by range."""
+        with pytest.raises(ValueError, match="range"):
+            BuildQuery().where_range("title")  # type: ignore[arg-type]
+
+    def test_restriction_containment(self):
+        """Each required restriction adds its own EXISTS clause."""
+        sql = compile_query(BuildQuery().with_restrictions("Seamless", "Full Flush").without_restrictions("Redstone"))
+        assert sql.count("EXISTS") == 3
+        assert "'seamless'" in sql
+        assert "'full flush'" in sql
+        assert "NOT (EXISTS" in sql
+
+    def test_keyset_pagination(self):
+        """Paginating by id compares the id alone, since it needs no tiebreaker."""
+        query = BuildQuery().order_by("id", descending=True).limit(25)
+        page = query.after(Build(id=42))
+
+        sql = compile_query(page)
+        assert "builds.id < 42" in sql
+        assert "ORDER BY builds.id DESC" in sql
+        assert "builds.id, builds.id" not in sql
+        assert "LIMIT 25" in sql
+
+    def test_keyset_pagination_keeps_unedited_builds(self):
+        """Builds without an edited time sort first instead of being dropped by the cursor comparison."""
+        query = BuildQuery().order_by("edited_time")
+        page = query.after(Build(id=7, edited_time=None))
+
+        assert page.cursor == (None, 7)
+        sql = compile_query(page)
+        assert "(coalesce(builds.edited_time, '0001-01-01 00:00:00+00:00'), builds.id) > (" in sql
+        assert "ORDER BY coalesce(builds.edited_time, '0001-01-01 00:00:00+00:00') ASC, builds.id ASC" in sql
+
+    def test_negative_limit(self):
+        """A negative limit is rejected."""
+        with pytest.raises(ValueError, match="limit"):
+            BuildQuery().limit(-1)
+
+
+@pytest.mark.unit
+class TestIterBuilds:
+    """Tests for streaming builds in batches."""
+
+    @staticmethod
+    def fake_get_builds(total: int):
+        async def get_builds(query: BuildQuery) -> list[Build]:
+            start = 0 if query.cursor is None else query.cursor[1]
+            end = min(total, start + (query.max_rows or total))
+            return [Build(id=build_id) for build_id in range(start + 1, end + 1)]
+
+        return get_builds
+
+    async def test_walks_all_builds_in_batches(self):
+        """Every build is yielded once, with one query per batch."""
+        manager = BuildManager(Mock())
+        with patch.object(BuildManager, "get_builds", AsyncMock(side_effect=self.fake_get_builds(7))) as get_builds:
+            ids = [build.id async for build in manager.iter_builds(batch_size=3)]
+
+        assert ids == [1, 2, 3, 4, 5, 6, 7]
+        assert get_builds.await_count == 3
+
+    async def test_respects_query_limit(self):
+        """The query's limit caps the total number of builds yielded."""
+        manager = BuildManager(Mock())
+        with patch.object(BuildManager, "get_builds", AsyncMock(side_effect=self.fake_get_builds(100))):
+            ids = [build.id async for build in manager.iter_builds(BuildQuery().limit(5), batch_size=2)]
+
+        assert ids == [1, 2, 3, 4, 5]
+
+    async def test_rejects_invalid_batch_size(self):
+        """The batch size must be positive."""
+        manager = BuildManager(Mock())
+        with pytest.raises(ValueError, match="batch_size"):
+            _ = [build async for build in manager.iter_builds(batch_size=0)]
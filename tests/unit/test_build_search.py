@@ -0,0 +1,52 @@
+import pytest
+
+from squid.db.build_search import fuse_scores, paginate
+from squid.db.vector_store import VectorMatch
+
+
+@pytest.mark.unit
+class TestFuseScores:
+    """Tests for combining semantic and title scores."""
+
+    def test_weighted_sum(self):
+        """The combined score is the weighted sum of both normalized scores."""
+        hits = fuse_scores([VectorMatch(1, 0.0)], [(1, 50.0)], vector_weight=0.5)
+
+        assert len(hits) == 1
+        assert hits[0].vector_score == 1.0
+        assert hits[0].title_score == 0.5
+        assert hits[0].score == pytest.approx(0.75)
+
+    def test_builds_found_by_either_search_are_ranked(self):
+        """A build found by both searches beats one found by only one of them."""
+        hits = fuse_scores([VectorMatch(1, 0.2), VectorMatch(2, 0.2)], [(2, 90.0), (3, 100.0)])
+
+        assert [hit.build_id for hit in hits] == [2, 1, 3]
+
+    def test_invalid_weight(self):
+        """The vector weight must be between 0 and 1."""
+        with pytest.raises(ValueError, match="vector_weight"):
+            fuse_scores([], [], vector_weight=1.5)
+
+
+@pytest.mark.unit
+class TestPaginate:
+    """Tests for paginating search hits."""
+
+    def test_pages(self):
+        """Hits are split into pages of the requested size."""
+        hits = fuse_scores([], [(build_id, 100.0 - build_id) for build_id in range(1, 8)])
+
+        first = paginate(hits, page=1, per_page=3)
+        last = paginate(hits, page=3, per_page=3)
+
+        assert [hit.build_id for hit in first.hits] == [1, 2, 3]
+        assert first.page_count == 3
+        assert first.has_next
+        assert [hit.build_id for hit in last.hits] == [7]
+        assert not last.has_next
+
+    def test_invalid_page(self):
+        """Pages start from 1."""
+        with pytest.raises(ValueError, match="page"):
+            paginate([], page=0, per_page=5)
@@ -0,0 +1,145 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, Mock, patch
+
+import pytest
+
+from squid.db.embeddings import EmbeddingPipeline, QueryEmbeddingCache, embed_texts
+
+
+@pytest.mark.unit
+class TestEmbedTexts:
+    """Tests for batched embedding requests."""
+
+    async def test_single_request_in_input_order(self):
+        """All texts are embedded in one request, and results follow the input order."""
+        client = Mock()
+        client.embeddings.create = AsyncMock(
+            return_value=SimpleNamespace(
+                data=[SimpleNamespace(index=1, embedding=[1.0]), SimpleNamespace(index=0, embedding=[0.0])]
+            )
+        )
+        with patch("squid.db.embeddings.get_embedding_client", return_value=client):
+            result = await embed_texts(["a", "b"])
+
+        assert result == [[0.0], [1.0]]
+        client.embeddings.create.assert_awaited_once_with(input=["a", "b"], model=ANY)
+
+    async def test_no_texts(self):
+        """No request is made when there is nothing to embed."""
+        with patch("squid.db.embeddings.get_embedding_client") as get_client:
+            assert await embed_texts([]) == []
+        get_client.assert_not_called()
+
+
+@pytest.mark.unit
+class TestEmbeddingPipeline:
+    """Tests for the background embedding worker."""
+
+    async def test_pending_builds_are_batched(self):
+        """Enqueued builds are deduplicated and processed in batches."""
+        pipeline = EmbeddingPipeline(Mock(), Mock(), Mock(), batch_size=2, delay=0)
+        with patch.object(pipeline, "process", AsyncMock()) as process:
+            for build_id in [1, 2, 1, 3, 4, 5]:
+                pipeline.enqueue(build_id)
+            assert pipeline.pending == 5
+
+            pipeline.start()
+            await asyncio.sleep(0.01)
+            await pipeline.stop()
+
+        assert [call.args[0] for call in process.await_args_list] == [[1, 2], [3, 4], [5]]
+        assert pipeline.pending == 0
+
+    async def test_failed_batch_does_not_stop_the_worker(self):
+        """A failing batch is logged and the next batch is still processed."""
+        pipeline = EmbeddingPipeline(Mock(), Mock(), Mock(), batch_size=1, delay=0)
+        with patch.object(pipeline, "process", AsyncMock(side_effect=[RuntimeError, None])) as process:
+            pipeline.enqueue(1)
+            pipeline.enqueue(2)
+            pipeline.start()
+            await asyncio.sleep(0.01)
+            await pipeline.stop()
+
+        assert process.await_count == 2
+
+    async def test_failed_batch_is_retried(self):
+        """The builds of a failed batch are enqueued again after a backoff."""
+        pipeline = EmbeddingPipeline(Mock(), Mock(), Mock(), delay=0, retry_delay=0)
+        with patch.object(pipeline, "process", AsyncMock(side_effect=[RuntimeError, None])) as process:
+            pipeline.enqueue(1)
+            pipeline.start()
+            await asyncio.sleep(0.01)
+            await pipeline.stop()
+
+        assert [call.args[0] for call in process.await_args_list] == [[1], [1]]
+
+    async def test_retries_are_bounded(self):
+        """A build that keeps failing is given up on after max_retries retries."""
+        pipeline = EmbeddingPipeline(Mock(), Mock(), Mock(), delay=0, retry_delay=0, max_retries=2)
+        with patch.object(pipeline, "process", AsyncMock(side_effect=RuntimeError)) as process:
+            pipeline.enqueue(1)
+            pipeline.start()
+            await asyncio.sleep(0.05)
+            await pipeline.stop()
+
+        assert process.await_count == 3
+        assert pipeline.pending == 0
+
+
+@pytest.mark.unit
+class TestQueryEmbeddingCache:
+    """Tests for caching the embeddings of search queries."""
+
+    async def test_normalized_queries_share_an_entry(self):
+        """Queries differing only in case and whitespace are embedded once."""
+        cache = QueryEmbeddingCache()
+        with patch("squid.db.embeddings.embed_texts", AsyncMock(return_value=[[1.0]])) as embed:
+            assert await cache.get("Seamless  3x3") == [1.0]
+            assert await cache.get("seamless 3x3") == [1.0]
+
+        embed.assert_awaited_once_with(["seamless 3x3"])
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    async def test_concurrent_misses_share_a_request(self):
+        """Concurrent lookups of the same query only make one request."""
+        cache = QueryEmbeddingCache()
+        with patch("squid.db.embeddings.embed_texts", AsyncMock(return_value=[[1.0]])) as embed:
+            results = await asyncio.gather(cache.get("door"), cache.get("door"))
+
+        assert results == [[1.0], [1.0]]
+        embed.assert_awaited_once()
+
+    async def test_least_recently_used_is_evicted(self):
+        """The cache never grows beyond its size bound."""
+        cache = QueryEmbeddingCache(max_size=2)
+        with patch("squid.db.embeddings.embed_texts", AsyncMock(return_value=[[1.0]])):
+            await cache.get("a")
+            await cache.get("b")
+            await cache.get("a")
+            await cache.get("c")
+
+        assert len(cache) == 2
+        assert "a" in cache
+        assert "b" not in cache
+
+    async def test_failures_are_not_cached(self):
+        """If the query cannot be embedded, the next lookup tries again."""
+        cache = QueryEmbeddingCache()
+        with patch("squid.db.embeddings.embed_texts", AsyncMock(side_effect=[None, [[1.0]]])):
+            assert await cache.get("door") is None
+            assert await cache.get("door") == [1.0]
+
+    async def test_persistence(self, tmp_path: Path):
+        """A saved cache is loaded again on creation."""
+        path = tmp_path / "cache" / "queries.json"
+        cache = QueryEmbeddingCache(path=path)
+        with patch("squid.db.embeddings.embed_texts", AsyncMock(return_value=[[0.5, 0.25]])):
+            await cache.get("door")
+        cache.save()
+
+        restored = QueryEmbeddingCache(path=path)
+        with patch("squid.db.embeddings.embed_texts", AsyncMock()) as embed:
+            assert await restored.get("door") == [0.5, 0.25]
+        embed.assert_not_awaited()
@@ -0,0 +1,72 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from squid.db.invalidation import Invalidation, InvalidationBus
+from squid.db.server_settings import ServerSettingManager
+
+
+@pytest.mark.unit
+class TestInvalidationBus:
+    """Tests for routing table change events to caches."""
+
+    async def test_notification_is_routed_by_table(self):
+        """Only the callbacks registered for the changed table are called, with the changed keys."""
+        bus = InvalidationBus()
+        versions, types = Mock(), Mock()
+        bus.register("versions", versions)
+        bus.register("types", types)
+
+        await bus.handle_notification('{"table": "versions", "keys": ["Java"]}')
+
+        versions.assert_called_once_with(Invalidation("versions", frozenset({"Java"})))
+        types.assert_not_called()
+
+    def test_keys_are_compared_as_text(self):
+        """Keys are sent as text, so integer cache keys still match."""
+        invalidation = Invalidation("server_settings", frozenset({"42"}))
+
+        assert invalidation.affects(42)
+        assert not invalidation.affects(43)
+        assert Invalidation("server_settings").affects(43)
+
+    async def test_async_and_failing_callbacks(self):
+        """Async callbacks are awaited, and a failing callback does not stop the others."""
+        bus = InvalidationBus()
+        failing = Mock(side_effect=RuntimeError)
+        refresh = AsyncMock()
+        bus.register("restrictions", failing)
+        bus.register("restrictions", refresh)
+
+        await bus.handle_notification('{"table": "restrictions", "keys": null}')
+
+        failing.assert_called_once()
+        refresh.assert_awaited_once_with(Invalidation("restrictions"))
+
+    async def test_invalidate_all(self):
+        """Every registered table is fully invalidated, e.g. after missing notifications."""
+        bus = InvalidationBus()
+        versions, types = Mock(), Mock()
+        bus.register("versions", versions)
+        bus.register("types", types)
+
+        await bus.invalidate_all()
+
+        versions.assert_called_once_with(Invalidation("versions"))
+        types.assert_called_once_with(Invalidation("types"))
+
+
+@pytest.mark.unit
+class TestServerSettingCache:
+    """Tests for precise invalidation of cached server settings."""
+
+    async def test_only_changed_servers_are_evicted(self):
+        """A change to one server's settings leaves the others cached."""
+        manager = ServerSettingManager(Mock())
+        bus = InvalidationBus()
+        manager.register_caches(bus)
+        manager._cache = {1: None, 2: None}  # pyright: ignore[reportPrivateUsage]
+
+        await bus.handle_notification('{"table": "server_settings", "keys": ["1"]}')
+
+        assert manager._cache == {2: None}  # pyright: ignore[reportPrivateUsage]
@@ -0,0 +1,110 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from squid.db.listener import NotificationListener
+
+
+def make_connection() -> Mock:
+    connection = Mock()
+    connection.add_listener = AsyncMock()
+    connection.execute = AsyncMock()
+    connection.close = AsyncMock()
+    connection.is_closed.return_value = False
+    return connection
+
+
+async def wait_until(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(1):
+        while not condition():
+            await asyncio.sleep(0)
+
+
+def notify(connection: Mock, channel: str, payload: str) -> None:
+    callback = connection.add_listener.await_args.args[1]
+    callback(connection, 1, channel, payload)
+
+
+@pytest.mark.unit
+class TestNotificationListener:
+    """Tests for dispatching Postgres notifications and recovering from lost connections."""
+
+    async def test_notifications_are_dispatched_in_order(self):
+        """Payloads reach the subscribers of their channel in the order they were sent."""
+        connection = make_connection()
+        received: list[str] = []
+
+        async def on_notification(payload: str) -> None:
+            received.append(payload)
+
+        listener = NotificationListener("postgresql://unused")
+        listener.subscribe("door_records", on_notification)
+        with patch("squid.db.listener.asyncpg.connect", AsyncMock(return_value=connection)):
+            listener.start()
+            await wait_until(lambda: connection.add_listener.await_count == 1)
+            notify(connection, "door_records", "1")
+            notify(connection, "door_records", "2")
+            await wait_until(lambda: len(received) == 2)
+            await listener.stop()
+
+        assert received == ["1", "2"]
+        assert listener.connected is False
+
+    async def test_failing_subscriber_does_not_stop_dispatch(self):
+        """An exception in one subscriber is logged, and later notifications are still handled."""
+        connection = make_connection()
+        received: list[str] = []
+
+        async def on_notification(payload: str) -> None:
+            if payload == "bad":
+                raise ValueError(payload)
+            received.append(payload)
+
+        listener = NotificationListener("postgresql://unused")
+        listener.subscribe("door_records", on_notification)
+        with patch("squid.db.listener.asyncpg.connect", AsyncMock(return_value=connection)):
+            listener.start()
+            await wait_until(lambda: connection.add_listener.await_count == 1)
+            notify(connection, "door_records", "bad")
+            notify(connection, "door_records", "good")
+            await wait_until(lambda: received == ["good"])
+            await listener.stop()
+
+    async def test_reconnect_runs_catch_up(self):
+        """Reconnect callbacks run on the first connection and again after the connection is lost."""
+        connections = [make_connection(), make_connection()]
+        catch_up = AsyncMock()
+        terminate: list[Callable[[Any], None]] = []
+        for connection in connections:
+            connection.add_termination_listener.side_effect = terminate.append
+
+        listener = NotificationListener("postgresql://unused", min_backoff=0)
+        listener.subscribe("door_records", AsyncMock())
+        listener.on_reconnect(catch_up)
+        with patch("squid.db.listener.asyncpg.connect", AsyncMock(side_effect=connections)):
+            listener.start()
+            await wait_until(lambda: catch_up.await_count == 1)
+            terminate[0](connections[0])
+            await wait_until(lambda: catch_up.await_count == 2)
+            await listener.stop()
+
+        connections[0].close.assert_awaited()
+        connections[1].add_listener.assert_awaited_once()
+
+    async def test_connection_failures_back_off(self):
+        """Failed connection attempts are retried until one succeeds."""
+        connection = make_connection()
+        connect = AsyncMock(side_effect=[OSError("refused"), connection])
+        catch_up = AsyncMock()
+
+        listener = NotificationListener("postgresql://unused", min_backoff=0)
+        listener.on_reconnect(catch_up)
+        with patch("squid.db.listener.asyncpg.connect", connect):
+            listener.start()
+            await wait_until(lambda: catch_up.await_count == 1)
+            await listener.stop()
+
+        assert connect.await_count == 2
@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import discord
+import pytest
+
+from squid.bot.message_resolver import MessageResolver
+
+
+def make_bot(channel: Mock) -> Mock:
+    bot = Mock()
+    bot._connection._get_message.return_value = None
+    bot.get_channel.return_value = channel
+    bot.db.message.untrack_message = AsyncMock()
+    return bot
+
+
+def make_channel(fetch_message: AsyncMock) -> Mock:
+    channel = Mock(spec=discord.TextChannel)
+    channel.fetch_message = fetch_message
+    return channel
+
+
+def not_found() -> discord.NotFound:
+    return discord.NotFound(Mock(status=404, reason="Not Found"), "Unknown Message")
+
+
+@pytest.mark.unit
+class TestMessageResolver:
+    """Tests for resolving messages with as few API calls as possible."""
+
+    async def test_discord_cache_is_used_first(self):
+        """Messages in discord.py's cache are not fetched."""
+        fetch_message = AsyncMock()
+        bot = make_bot(make_channel(fetch_message))
+        cached = Mock(id=1)
+        bot._connection._get_message.return_value = cached
+
+        assert await MessageResolver(bot).fetch(10, 1) is cached
+        fetch_message.assert_not_awaited()
+
+    async def test_concurrent_fetches_are_shared(self):
+        """Concurrent requests for one message make a single API call, and later ones hit the cache."""
+        fetch_message = AsyncMock(side_effect=lambda message_id: Mock(id=message_id))
+        resolver = MessageResolver(make_bot(make_channel(fetch_message)))
+
+        first, second = await asyncio.gather(resolver.fetch(10, 1), resolver.fetch(10, 1))
+        third = await resolver.fetch(10, 1)
+
+        assert first is second is third
+        fetch_message.assert_awaited_once_with(1)
+
+    async def test_missing_messages_are_not_fetched_again(self):
+        """A message that was not found is remembered and untracked."""
+        fetch_message = AsyncMock(side_effect=not_found())
+        bot = make_bot(make_channel(fetch_message))
+        resolver = MessageResolver(bot)
+
+        assert await resolver.fetch(10, 1) is None
+        assert await resolver.fetch(10, 1) is None
+
+        fetch_message.assert_awaited_once()
+        bot.db.message.untrack_message.assert_awaited_once_with(1)
+
+    async def test_fetches_per_channel_are_limited(self):
+        """No more than max_concurrency_per_channel messages are fetched at once from a channel."""
+        running = 0
+        peak = 0
+
+        async def fetch_message(message_id: int) -> Mock:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return Mock(id=message_id)
+
+        resolver = MessageResolver(
+            make_bot(make_channel(AsyncMock(side_effect=fetch_message))), max_concurrency_per_channel=3
+        )
+
+        found = await resolver.fetch_many((10, message_id) for message_id in range(20))
+
+        assert sorted(found) == list(range(20))
+        assert peak == 3
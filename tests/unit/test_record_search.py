@@ -0,0 +1,88 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from squid.db.record_search import IndexedRecord, RecordTitleIndex
+
+
+def make_record(
+    record_id: int, title: str, *, orientation: str = "Door", size: tuple[int, int] = (2, 2)
+) -> IndexedRecord:
+    return IndexedRecord(record_id, record_id * 10, title, orientation, size[0], size[1], None)  # type: ignore[arg-type]
+
+
+@pytest.fixture
+def index() -> RecordTitleIndex:
+    index = RecordTitleIndex()
+    index.upsert(
+        [
+            make_record(1, "Smallest 2x2 Piston Door"),
+            make_record(2, "Smallest Seamless 3x3 Piston Door", size=(3, 3)),
+            make_record(3, "Smallest 2x2 Piston Trapdoor", orientation="Trapdoor"),
+            make_record(4, "Smallest Full Flush 3x3 Piston Door", size=(3, 3)),
+        ]
+    )
+    return index
+
+
+@pytest.mark.unit
+class TestRecordTitleIndex:
+    """Tests for the in-memory record title index."""
+
+    def test_search_is_case_insensitive(self, index: RecordTitleIndex):
+        """Titles and queries are normalized before scoring."""
+        results = index.search("SEAMLESS 3X3 piston door", limit=1)
+        assert results[0][0].record_id == 2
+
+    def test_filters_narrow_candidates(self, index: RecordTitleIndex):
+        """Orientation and size filters are applied before scoring."""
+        trapdoors = index.search("piston", orientation="Trapdoor")
+        assert [record.record_id for record, _, _ in trapdoors] == [3]
+
+        three_by_three = index.search("piston door", door_size=(3, 3))
+        assert {record.record_id for record, _, _ in three_by_three} == {2, 4}
+
+        assert index.search("piston", orientation="Trapdoor", door_size=(3, 3)) == []
+
+    def test_remove_keeps_index_consistent(self, index: RecordTitleIndex):
+        """Removing a record moves the last record into its place without corrupting the filters."""
+        index.remove([1, 99])
+
+        assert len(index) == 3
+        assert 1 not in index
+        assert index.get(4) == make_record(4, "Smallest Full Flush 3x3 Piston Door", size=(3, 3))
+        assert {record.record_id for record, _, _ in index.search("door", door_size=(3, 3))} == {2, 4}
+        assert {record.record_id for record, _, _ in index.search("door", door_size=(2, 2))} == {3}
+
+    def test_upsert_replaces_existing_record(self, index: RecordTitleIndex):
+        """Upserting an existing record updates its title and filters."""
+        index.upsert([make_record(1, "Smallest 4x4 Door", size=(4, 4))])
+
+        assert len(index) == 4
+        assert [record.record_id for record, _, _ in index.search("door", door_size=(4, 4))] == [1]
+        assert [record.record_id for record, _, _ in index.search("door", door_size=(2, 2))] == [3]
+
+    async def test_refresh_only_loads_changes(self, index: RecordTitleIndex):
+        """Refreshing removes deleted records and only loads new or retitled ones."""
+        session = MagicMock()
+        session.execute = AsyncMock(
+            side_effect=[
+                MagicMock(
+                    all=MagicMock(return_value=[(2, "Smallest Seamless 3x3 Piston Door"), (3, "Renamed"), (5, "New")])
+                ),
+                MagicMock(
+                    all=MagicMock(
+                        return_value=[(3, 30, "Renamed", "Trapdoor", 2, 2, None), (5, 50, "New", "Door", 5, 5, None)]
+                    )
+                ),
+            ]
+        )
+        session_maker = MagicMock()
+        session_maker.return_value.__aenter__.return_value = session
+
+        await index.refresh(session_maker)
+
+        assert sorted(index._positions) == [2, 3, 5]  # pyright: ignore[reportPrivateUsage]
+        assert index.get(3).title == "Renamed"  # type: ignore[union-attr]
+        assert index.loaded
+        assert session.execute.await_count == 2
@@ -0,0 +1,134 @@
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from squid.db.invalidation import Invalidation, InvalidationBus
+from squid.db.schema import Restriction, Type, Version
+from squid.db.tag_catalog import CONFIDENT_MATCH_SCORE, TagCatalog
+
+
+def scalars_result(items: list[object]) -> Mock:
+    result = Mock()
+    result.scalars.return_value.all.return_value = items
+    return result
+
+
+def rows_result(rows: list[tuple[object, ...]]) -> Mock:
+    result = Mock()
+    result.all.return_value = rows
+    return result
+
+
+def make_restriction(restriction_id: int, name: str, type: str | None) -> Restriction:
+    restriction = Restriction(build_category="Door", name=name, type=type)  # pyright: ignore[reportArgumentType]
+    restriction.id = restriction_id
+    return restriction
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    session = AsyncMock()
+    session.execute.side_effect = [
+        scalars_result(
+            [
+                make_restriction(1, "Seamless", "component"),
+                make_restriction(2, "Flush", "wiring-placement"),
+                make_restriction(3, "Full Seamless", "component"),
+            ]
+        ),
+        rows_result([("Flush Layout", 2)]),
+        scalars_result(
+            [
+                Type(build_category="Door", name="Regular"),
+                Type(build_category="Door", name="Funnel"),
+                Type(build_category="Extender", name="Regular"),
+            ]
+        ),
+        scalars_result(
+            [
+                Version(edition="Java", major_version=1, minor_version=16, patch_number=5),
+                Version(edition="Java", major_version=1, minor_version=20, patch_number=0),
+            ]
+        ),
+    ]
+    return session
+
+
+@pytest.fixture
+async def catalog(session: AsyncMock) -> TagCatalog:
+    session_maker = MagicMock()
+    session_maker.return_value.__aenter__.return_value = session
+    catalog = TagCatalog(session_maker)
+    await catalog.ensure_loaded()
+    return catalog
+
+
+@pytest.mark.unit
+class TestTagCatalog:
+    """Tests for in-memory lookups of build tags."""
+
+    async def test_tables_are_loaded_once(self, catalog: TagCatalog, session: AsyncMock):
+        """Lookups after the first load do not touch the database."""
+        await catalog.ensure_loaded()
+        assert session.execute.await_count == 4
+
+    async def test_restriction_lookup_by_name_or_alias(self, catalog: TagCatalog):
+        """Restrictions are found by exact name or alias, case-insensitively."""
+        flush = catalog.get_restriction("flush layout")
+        assert flush is not None
+        assert flush.id == 2
+        seamless = catalog.get_restriction("SEAMLESS")
+        assert seamless is not None
+        assert seamless.id == 1
+        assert catalog.get_restriction("seam") is None
+
+    async def test_validate_restrictions(self, catalog: TagCatalog):
+        """Restrictions are split by type, keeping the given case and order."""
+        valid, invalid = catalog.validate_restrictions(["full seamless", "Flush", "Nonsense"], "component")
+
+        assert valid == ["full seamless"]
+        assert invalid == ["Flush", "Nonsense"]
+
+    async def test_types_by_category(self, catalog: TagCatalog):
+        """Types are only valid for their own build category."""
+        assert catalog.type_names("Door") == ["Regular", "Funnel"]
+        assert catalog.validate_types(["funnel", "Regular"], "Extender") == (["Regular"], ["funnel"])
+
+    async def test_versions(self, catalog: TagCatalog):
+        """Versions are indexed by edition and by number."""
+        assert [v.minor_version for v in catalog.versions("Java")] == [16, 20]
+        assert catalog.versions("Bedrock") == []
+        assert catalog.get_version("Java", 1, 20, 0) is not None
+
+    async def test_reload_on_invalidation(self, catalog: TagCatalog, session: AsyncMock):
+        """A change to a table reloads only that table."""
+        bus = InvalidationBus()
+        catalog.register_caches(bus)
+        session.execute.side_effect = [rows_result([("Flush Layout", 2), ("Hidden", 1)])]
+
+        await bus.publish(Invalidation("restriction_aliases"))
+
+        hidden = catalog.get_restriction("hidden")
+        assert hidden is not None
+        assert hidden.id == 1
+
+    async def test_resolve_restriction_tolerates_typos(self, catalog: TagCatalog):
+        """A misspelled name still finds the intended restriction, ranked first."""
+        matches = catalog.resolve_restriction("seemless", limit=2)
+
+        assert matches[0].restriction.name == "Seamless"
+        assert matches[0].score >= CONFIDENT_MATCH_SCORE - 10
+
+    async def test_resolve_restriction_by_alias(self, catalog: TagCatalog):
+        """Aliases resolve to their restriction, which is only returned once."""
+        matches = catalog.resolve_restriction("flush", limit=5)
+
+        assert [m.restriction.id for m in matches].count(2) == 1
+        assert matches[0].restriction.id == 2
+        assert matches[0].score == 100
+        assert matches[0].is_alias is False
+
+    async def test_resolve_restriction_cutoff(self, catalog: TagCatalog):
+        """Nothing is returned when no restriction is close enough."""
+        assert catalog.resolve_restriction("zzzz", score_cutoff=CONFIDENT_MATCH_SCORE) == []
+        assert catalog.resolve_restriction("") == []
@@ -0,0 +1,62 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from squid.db.schema import BuildCategory, Status
+from squid.db.vector_store import VectorMatch, VectorStore
+
+
+@pytest.fixture
+def collection() -> Mock:
+    collection = Mock()
+    collection.query.return_value = [("3", 0.25), ("1", 0.5)]
+    return collection
+
+
+@pytest.fixture
+def store(collection: Mock) -> VectorStore:
+    store = VectorStore("postgresql://unused", default_top_k=7)
+    store._collection = collection  # pyright: ignore[reportPrivateUsage]
+    return store
+
+
+@pytest.mark.unit
+class TestVectorStore:
+    """Tests for the pooled vector store client."""
+
+    async def test_query_without_filters(self, store: VectorStore, collection: Mock):
+        """Results are parsed into matches, and the default top-k is used."""
+        matches = await store.query([0.1, 0.2])
+
+        assert matches == [VectorMatch(3, 0.25), VectorMatch(1, 0.5)]
+        kwargs = collection.query.call_args.kwargs
+        assert kwargs["limit"] == 7
+        assert kwargs["filters"] is None
+        assert kwargs["include_value"] is True
+
+    async def test_query_with_metadata_filters(self, store: VectorStore, collection: Mock):
+        """Status and category filters are combined with $and."""
+        await store.query([0.1], top_k=2, status=Status.CONFIRMED, category=BuildCategory.DOOR)
+
+        kwargs = collection.query.call_args.kwargs
+        assert kwargs["limit"] == 2
+        assert kwargs["filters"] == {"$and": [{"status": {"$eq": 1}}, {"category": {"$eq": "Door"}}]}
+
+    async def test_upsert_uses_string_ids(self, store: VectorStore, collection: Mock):
+        """Build ids are stored as strings, alongside their metadata."""
+        await store.upsert([(5, [0.5], {"status": 0})])
+
+        collection.upsert.assert_called_once_with(records=[("5", [0.5], {"status": 0})])
+
+    async def test_client_is_created_once(self):
+        """Concurrent operations share a single client."""
+        store = VectorStore("postgresql://unused")
+        client = Mock()
+        client.get_or_create_collection.return_value = Mock(query=Mock(return_value=[]))
+        with patch("squid.db.vector_store.vecs.create_client", return_value=client) as create_client:
+            await store.query([0.1])
+            await store.query([0.2])
+
+        create_client.assert_called_once()
+        await store.close()
+        client.disconnect.assert_called_once()
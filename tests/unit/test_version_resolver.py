@@ -0,0 +1,130 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from squid.db.builds import Build
+from squid.db.schema import Version
+from squid.db.version_resolver import Edition, VersionResolver, merge_ranges, version_ordinal, version_ranges
+
+
+def make_versions(edition: Edition, *numbers: tuple[int, int, int]) -> list[Version]:
+    return [
+        Version(edition=edition, major_version=major, minor_version=minor, patch_number=patch)
+        for major, minor, patch in numbers
+    ]
+
+
+@pytest.fixture
+def fetch_versions() -> AsyncMock:
+    versions = {
+        "Java": make_versions("Java", (1, 16, 0), (1, 16, 5), (1, 17, 0), (1, 17, 1), (1, 20, 0)),
+        "Bedrock": make_versions("Bedrock", (1, 19, 0), (1, 20, 0), (1, 20, 10)),
+    }
+    return AsyncMock(side_effect=lambda edition: versions[edition])
+
+
+@pytest.mark.unit
+class TestVersionResolver:
+    """Tests for compiled, memoized version spec resolution."""
+
+    async def test_range_without_patch_ends_at_last_patch(self, fetch_versions: AsyncMock):
+        """A range end without a patch number includes every patch of that minor version."""
+        resolver = VersionResolver(fetch_versions)
+
+        assert await resolver.resolve("1.16.5 - 1.17") == ["Java 1.16.5", "Java 1.17.0", "Java 1.17.1"]
+
+    async def test_mixed_editions(self, fetch_versions: AsyncMock):
+        """Each part uses its own edition, or the edition of the part before it."""
+        resolver = VersionResolver(fetch_versions)
+
+        result = await resolver.resolve("Java 1.17.1, 1.20, Bedrock 1.20+")
+
+        assert result == ["Java 1.17.1", "Java 1.20.0", "Bedrock 1.20.0", "Bedrock 1.20.10"]
+
+    async def test_overlapping_parts_are_deduplicated(self, fetch_versions: AsyncMock):
+        """Versions matched by several parts are only listed once."""
+        resolver = VersionResolver(fetch_versions)
+
+        assert await resolver.resolve("1.17, 1.17.1, 1.17+") == ["Java 1.17.0", "Java 1.17.1", "Java 1.20.0"]
+
+    async def test_resolved_specs_are_memoized(self, fetch_versions: AsyncMock):
+        """Repeated specs, up to whitespace, are answered without fetching the versions again."""
+        resolver = VersionResolver(fetch_versions)
+
+        first = await resolver.resolve("1.16 - 1.17")
+        first.append("mutated")
+        second = await resolver.resolve("1.16  -  1.17")
+
+        assert "mutated" not in second
+        assert fetch_versions.await_count == 1
+
+    async def test_invalidate_only_affects_edition(self, fetch_versions: AsyncMock):
+        """Invalidating an edition refetches it, but keeps specs of the other edition."""
+        resolver = VersionResolver(fetch_versions)
+        await resolver.resolve("Java 1.20")
+        await resolver.resolve("Bedrock 1.20")
+
+        resolver.invalidate(["Bedrock"])
+        await resolver.resolve("Java 1.20")
+        await resolver.resolve("Bedrock 1.20")
+
+        assert [call.args[0] for call in fetch_versions.await_args_list] == ["Java", "Bedrock", "Bedrock"]
+
+    async def test_invalid_range(self, fetch_versions: AsyncMock):
+        """A range with more than two ends is rejected."""
+        resolver = VersionResolver(fetch_versions)
+
+        with pytest.raises(ValueError, match="Invalid version range"):
+            await resolver.resolve("1.14 - 1.15 - 1.16")
+
+
+@pytest.mark.unit
+class TestVersionRanges:
+    """Tests for the version ordinal ranges stored on builds."""
+
+    def test_ordinals_sort_like_versions(self):
+        """Ordinals order by edition, then by version number."""
+        ordinals = [
+            version_ordinal("Java", 1, 9, 4),
+            version_ordinal("Java", 1, 16, 0),
+            version_ordinal("Java", 1, 16, 5),
+            version_ordinal("Bedrock", 1, 0, 0),
+        ]
+        assert ordinals == sorted(ordinals)
+
+    def test_open_range_includes_future_versions(self):
+        """An open-ended part covers every later version of its edition, but not the other edition."""
+        ((start, stop),) = VersionResolver.compile_ranges("1.19+")
+
+        assert start == version_ordinal("Java", 1, 19, 0)
+        assert start <= version_ordinal("Java", 1, 99, 999) < stop
+        assert version_ordinal("Bedrock", 1, 0, 0) >= stop
+
+    def test_minor_version_includes_every_patch(self):
+        """A part without a patch number covers every patch of that minor version."""
+        ((start, stop),) = VersionResolver.compile_ranges("1.17")
+
+        assert start == version_ordinal("Java", 1, 17, 0)
+        assert stop == version_ordinal("Java", 1, 18, 0)
+
+    def test_adjacent_ranges_are_merged(self):
+        """Touching or overlapping ranges collapse into one, and empty ranges are dropped."""
+        merged = merge_ranges([(10, 12), (1, 3), (3, 5), (4, 6), (8, 8)])
+
+        assert [(r.lower, r.upper) for r in merged] == [(1, 6), (10, 12)]
+
+    def test_invalid_spec_falls_back_to_versions(self):
+        """An unparsable spec is ignored, and the resolved versions are still stored."""
+        ordinal = version_ordinal("Java", 1, 16, 5)
+
+        ranges = version_ranges("1.14 - 1.15 - 1.16", ["Java 1.16.5"])
+
+        assert [(r.lower, r.upper) for r in ranges] == [(ordinal, ordinal + 1)]
+
+    def test_build_works_in_versions_released_later(self):
+        """A build with an open-ended spec works in versions that did not exist when it was resolved."""
+        build = Build(version_spec="1.19+", versions=["Java 1.19.0", "Java 1.19.1"])
+
+        assert build.works_in("Java 1.21.4")
+        assert not build.works_in("Java 1.18.2")
+        assert not build.works_in("Bedrock 1.21.4")
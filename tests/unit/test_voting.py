@@ -0,0 +1,430 @@
+import asyncio
+import random
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import discord
+import pytest
+
+from squid.bot.voting.journal import VoteJournal
+from squid.bot.voting.registry import VoteSessionRegistry
+from squid.bot.voting.vote_session import BuildVoteSession
+from squid.db.invalidation import Invalidation, InvalidationBus
+
+type VoteSessionFactory = Callable[..., Awaitable[BuildVoteSession]]
+
+
+def make_session(session_id: int, *message_ids: int) -> Mock:
+    return Mock(id=session_id, message_ids=set(message_ids), is_closed=False)
+
+
+def make_message(message_id: int = 10) -> Mock:
+    """A discord message that a vote session is rendered to."""
+    return Mock(id=message_id, edit=AsyncMock(), add_reaction=AsyncMock())
+
+
+def rendered_counts(message: Mock) -> tuple[str, str]:
+    """The (accept, deny) vote counts of the last embed rendered to a message."""
+    embed: discord.Embed = message.edit.await_args.kwargs["embed"]
+    return embed.fields[1].value or "", embed.fields[2].value or ""
+
+
+async def make_registry() -> VoteSessionRegistry:
+    """A registry hydrated from a database with no open vote sessions."""
+    registry = VoteSessionRegistry()
+    with (
+        patch("squid.bot.voting.registry.BuildVoteSession.get_open_vote_sessions", AsyncMock(return_value=[])),
+        patch("squid.bot.voting.registry.DeleteLogVoteSession.get_open_vote_sessions", AsyncMock(return_value=[])),
+    ):
+        await registry.hydrate(Mock())
+    return registry
+
+
+async def make_bot() -> Mock:
+    """A bot with a real vote session registry and vote journal, but no discord or database connection."""
+    bot = Mock(vote_sessions=await make_registry(), vote_journal=VoteJournal(AsyncMock(), flush_interval=0.001))
+    bot.for_build.return_value.generate_embed = AsyncMock(return_value=discord.Embed(title="Build"))
+    bot.db.async_session = MagicMock()
+    bot.db.async_session.return_value.__aenter__.return_value = AsyncMock()
+    return bot
+
+
+def database_session(bot: Mock) -> AsyncMock:
+    """The database session that the bot made by `make_bot` hands out."""
+    return bot.db.async_session.return_value.__aenter__.return_value
+
+
+@pytest.fixture
+async def registry() -> VoteSessionRegistry:
+    return await make_registry()
+
+
+@pytest.fixture
+async def bot() -> Mock:
+    return await make_bot()
+
+
+@pytest.fixture
+def create_vote_session(bot: Mock) -> Iterator[VoteSessionFactory]:
+    """Creates build vote sessions with BuildVoteSession.create, tracked in a mocked database as session 1."""
+    database = MagicMock()
+    database.return_value.async_session.return_value.__aenter__.return_value = AsyncMock()
+
+    async def create(
+        *,
+        bot: Mock = bot,
+        message: Mock | None = None,
+        build: Mock | None = None,
+        pass_threshold: int = 3,
+        fail_threshold: int = -3,
+    ) -> BuildVoteSession:
+        message = message or make_message()
+        build = build or Mock(id=1, confirm=AsyncMock(), deny=AsyncMock())
+        session = await BuildVoteSession.create(bot, [message], 1, build, "add", pass_threshold, fail_threshold)
+        message.edit.reset_mock()  # Forget the render done by create()
+        return session
+
+    with (
+        patch("squid.bot.voting.vote_session.track_vote_session", AsyncMock(return_value=1)),
+        patch("squid.bot.voting.vote_session.DatabaseManager", database),
+        patch.object(BuildVoteSession, "render_delay", 0.01),
+    ):
+        yield create
+
+
+@pytest.mark.unit
+class TestVoteSessionRegistry:
+    """Tests for routing messages to their open vote sessions."""
+
+    async def test_lookup_by_any_message(self, registry: VoteSessionRegistry):
+        """Every message of a session finds it, other messages find nothing."""
+        session = make_session(1, 10, 11)
+        registry.add(session)
+
+        assert await registry.get(10) is session
+        assert await registry.get(11) is session
+        assert await registry.get(12) is None
+
+    async def test_closed_sessions_are_removed(self, registry: VoteSessionRegistry):
+        """Removing a session forgets all of its messages."""
+        session = make_session(1, 10, 11)
+        registry.add(session)
+
+        registry.remove(session)
+
+        assert await registry.get(10) is None
+        assert len(registry) == 0
+
+    async def test_new_messages_of_a_session(self, registry: VoteSessionRegistry):
+        """Adding a session again registers the messages it gained."""
+        session = make_session(1, 10)
+        registry.add(session)
+        session.message_ids.add(20)
+
+        registry.add(session)
+
+        assert await registry.get(20) is session
+        assert len(registry) == 1
+
+    async def test_hydrate_keeps_sessions_created_during_startup(self):
+        """Sessions registered while loading are not replaced by their database copies."""
+        registry = VoteSessionRegistry()
+        created = make_session(1, 10)
+        registry.add(created)
+        loaded = [make_session(1, 10), make_session(2, 30)]
+
+        with (
+            patch("squid.bot.voting.registry.BuildVoteSession.get_open_vote_sessions", AsyncMock(return_value=loaded)),
+            patch("squid.bot.voting.registry.DeleteLogVoteSession.get_open_vote_sessions", AsyncMock(return_value=[])),
+        ):
+            await registry.hydrate(Mock())
+
+        assert registry.hydrated
+        assert await registry.get(10) is created
+        assert await registry.get(30) is loaded[1]
+
+
+@pytest.mark.unit
+class TestVoteSessionRendering:
+    """Tests for coalescing vote message renders."""
+
+    async def test_burst_of_votes_renders_once(self, create_vote_session: VoteSessionFactory):
+        """Renders requested within the delay are done as a single render, showing every vote."""
+        message = make_message()
+        session = await create_vote_session(message=message)
+        for user_id in range(2):
+            session[user_id] = 1
+            for _ in range(10):
+                session.schedule_render()
+        await asyncio.sleep(0.1)
+
+        message.edit.assert_awaited_once()
+        assert rendered_counts(message) == ("2/3", "0/3")
+
+    async def test_render_requested_while_rendering_is_not_lost(self, create_vote_session: VoteSessionFactory):
+        """A vote arriving during a render causes another render afterwards."""
+        message = make_message()
+        session = await create_vote_session(message=message)
+
+        async def vote_during_render(**_: Any) -> None:
+            if message.edit.await_count == 1:
+                session[1] = -1
+                session.schedule_render()
+
+        message.edit.side_effect = vote_during_render
+        session.schedule_render()
+        await asyncio.sleep(0.1)
+
+        assert message.edit.await_count == 2
+        assert rendered_counts(message) == ("0/3", "1/3")
+
+    async def test_failed_render_is_logged(
+        self, create_vote_session: VoteSessionFactory, caplog: pytest.LogCaptureFixture
+    ):
+        """A render that fails in the background is logged, and the next render still happens."""
+        message = make_message()
+        session = await create_vote_session(message=message)
+        message.edit.side_effect = [discord.HTTPException(Mock(status=500), "Internal Server Error"), None]
+
+        session.schedule_render()
+        await asyncio.sleep(0.1)
+        session.schedule_render()
+        await asyncio.sleep(0.1)
+
+        assert "Failed to render vote session 1." in caplog.text
+        assert message.edit.await_count == 2
+
+
+@pytest.mark.unit
+class TestVoteJournal:
+    """Tests for batching vote writes."""
+
+    async def test_votes_are_written_in_one_batch(self):
+        """Votes recorded close together are written with a single call, keeping each user's last vote."""
+        write = AsyncMock()
+        journal = VoteJournal(write, flush_interval=0.01)
+
+        journal.record(1, 100, 1)
+        journal.record(1, 100, 0)
+        journal.record(1, 200, -3)
+        journal.record(2, 100, None)
+        await asyncio.sleep(0.05)
+
+        write.assert_awaited_once()
+        assert write.await_args is not None
+        assert sorted(write.await_args.args[0], key=str) == sorted([(1, 100, 0), (1, 200, -3), (2, 100, None)], key=str)
+        assert len(journal) == 0
+
+    async def test_flush_one_session(self):
+        """Flushing a session leaves the votes of other sessions pending."""
+        write = AsyncMock()
+        journal = VoteJournal(write, flush_interval=60)
+        journal.record(1, 100, 1)
+        journal.record(2, 100, 1)
+
+        await journal.flush(1)
+        await journal.close()
+
+        assert [call.args[0] for call in write.await_args_list] == [[(1, 100, 1)], [(2, 100, 1)]]
+
+    async def test_failed_write_keeps_newer_votes(self):
+        """Votes that failed to be written are retried, unless the user voted again since."""
+        journal = VoteJournal(AsyncMock(), flush_interval=60)
+        journal.record(1, 100, 1)
+        journal.record(1, 200, 1)
+
+        async def vote_again_then_fail(_: object) -> None:
+            journal.record(1, 100, -1)
+            raise ConnectionError
+
+        journal.write = AsyncMock(side_effect=vote_again_then_fail)
+        with pytest.raises(ConnectionError):
+            await journal.flush()
+        assert len(journal) == 2
+
+        journal.write = retry = AsyncMock()
+        await journal.close()
+
+        retry.assert_awaited_once_with([(1, 100, -1), (1, 200, 1)])
+
+
+@pytest.mark.unit
+class TestVoteSessionReload:
+    """Tests for applying database changes made elsewhere to the registered vote sessions."""
+
+    @pytest.fixture
+    def bus(self, bot: Mock) -> InvalidationBus:
+        bus = InvalidationBus()
+        bot.vote_sessions.register_caches(bus)
+        return bus
+
+    async def test_saved_build_is_rendered(
+        self, bot: Mock, bus: InvalidationBus, create_vote_session: VoteSessionFactory
+    ):
+        """Saving the build being voted on re-renders the vote messages with the saved build."""
+        message = make_message()
+        session = await create_vote_session(message=message)
+        saved = Mock(id=1)
+        bot.db.build.get_by_id = AsyncMock(return_value=saved)
+
+        await bus.publish(Invalidation("builds", frozenset({"1"})))
+        await asyncio.sleep(0.1)
+
+        assert session.build is saved
+        bot.for_build.assert_called_with(saved)
+        message.edit.assert_awaited_once()
+
+    async def test_votes_from_another_process_are_counted(
+        self, bot: Mock, bus: InvalidationBus, create_vote_session: VoteSessionFactory
+    ):
+        """Votes written by another process are loaded, and votes that were not written yet are kept."""
+        session = await create_vote_session(pass_threshold=100, fail_threshold=-100)
+        bot.vote_journal = VoteJournal(AsyncMock(), flush_interval=60)
+        session[300] = 1
+        result = Mock()
+        result.tuples.return_value.all.return_value = [(100, 3), (200, -1), (300, -1)]
+        database_session(bot).execute.return_value = result
+
+        await bus.publish(Invalidation("votes", frozenset({"1"})))
+
+        assert (session[100], session[200], session[300]) == (3, -1, 1)
+        assert (session.upvotes, session.downvotes) == (4, 1)
+
+    async def test_session_closed_elsewhere_stops_taking_votes(
+        self, bot: Mock, bus: InvalidationBus, create_vote_session: VoteSessionFactory
+    ):
+        """A session closed by another process is unregistered, and is not closed a second time here."""
+        build = Mock(id=1, confirm=AsyncMock(), deny=AsyncMock())
+        session = await create_vote_session(build=build)
+        database_session(bot).scalar.return_value = "closed"
+
+        await bus.publish(Invalidation("vote_sessions", frozenset({"1"})))
+        await session.set_vote(100, 3)
+
+        assert session.is_closed
+        assert await bot.vote_sessions.get(10) is None
+        assert session[100] is None
+        build.confirm.assert_not_awaited()
+
+
+@pytest.fixture
+def database_close() -> Iterator[AsyncMock]:
+    """Simulates the conditional UPDATE of close_vote_session: only the first close of a session succeeds.
+
+    A close is rolled back if on_close raises.
+    """
+    closed: set[int] = set()
+
+    async def close(vote_session_id: int, _: object, *, on_close: Callable[[], Awaitable[None]] | None = None) -> bool:
+        await asyncio.sleep(0)
+        if vote_session_id in closed:
+            return False
+        closed.add(vote_session_id)
+        if on_close is not None:
+            try:
+                await on_close()
+            except BaseException:
+                closed.discard(vote_session_id)  # Rolled back
+                raise
+        return True
+
+    with patch("squid.bot.voting.vote_session.close_vote_session", AsyncMock(side_effect=close)) as mock:
+        yield mock
+
+
+@pytest.mark.unit
+class TestVoteTally:
+    """Tests for tallying votes and closing vote sessions under concurrent votes."""
+
+    async def test_running_sums(self, create_vote_session: VoteSessionFactory):
+        """Changing and removing votes keeps the sums equal to the votes."""
+        session = await create_vote_session(pass_threshold=100, fail_threshold=-100)
+        session[1] = 3
+        session[2] = -1
+        session[3] = None
+        session[1] = -3
+        session[2] = None
+        session[4] = 1
+
+        assert (session[1], session[2], session[3], session[4]) == (-3, None, None, 1)
+        assert (session.upvotes, session.downvotes, session.net_votes) == (1, 3, -2)
+
+    async def test_concurrent_votes_are_tallied(
+        self, create_vote_session: VoteSessionFactory, database_close: AsyncMock
+    ):
+        """Thousands of concurrent votes and toggles leave the sums equal to the final votes."""
+        session = await create_vote_session(pass_threshold=10**9, fail_threshold=-(10**9))
+        rng = random.Random(24)
+        votes = [(rng.randrange(500), rng.choice([3, 1, 0, -1, -3, None])) for _ in range(5000)]
+
+        await asyncio.gather(*(session.set_vote(user_id, weight) for user_id, weight in votes))
+
+        final = [weight for user_id in range(500) if (weight := session[user_id]) is not None]
+        assert session.upvotes == sum(w for w in final if w > 0)
+        assert session.downvotes == -sum(w for w in final if w < 0)
+        database_close.assert_not_awaited()
+
+    async def test_session_closes_exactly_once(
+        self, create_vote_session: VoteSessionFactory, database_close: AsyncMock
+    ):
+        """Concurrent votes past the threshold, from two processes holding the same session, close it once."""
+        build = Mock(id=1, confirm=AsyncMock(), deny=AsyncMock())
+        first = await create_vote_session(build=build, pass_threshold=50)
+        second = await create_vote_session(bot=await make_bot(), build=build, pass_threshold=50)
+
+        await asyncio.gather(
+            *(first.set_vote(user_id, 1) for user_id in range(2000)),
+            *(second.set_vote(user_id, 1) for user_id in range(2000)),
+        )
+
+        assert first.is_closed
+        assert second.is_closed
+        build.confirm.assert_awaited_once()
+        build.deny.assert_not_awaited()
+        assert database_close.await_count == 2
+
+    async def test_failed_close_keeps_the_session_open(
+        self, bot: Mock, create_vote_session: VoteSessionFactory, database_close: AsyncMock
+    ):
+        """If the votes cannot be written before closing, the session stays open and the next vote closes it."""
+        build = Mock(id=1, confirm=AsyncMock(), deny=AsyncMock())
+        session = await create_vote_session(build=build, pass_threshold=2)
+        await session.set_vote(1, 1)
+        bot.vote_journal.write = AsyncMock(side_effect=ConnectionError)
+
+        with pytest.raises(ConnectionError):
+            await session.set_vote(2, 1)
+
+        assert not session.is_closed
+        assert await bot.vote_sessions.get(10) is session
+        database_close.assert_not_awaited()
+
+        bot.vote_journal.write = AsyncMock()
+        await session.set_vote(3, 1)
+
+        assert session.is_closed
+        build.confirm.assert_awaited_once()
+        assert len(bot.vote_journal) == 0
+
+    async def test_failed_result_keeps_the_session_open(
+        self, bot: Mock, create_vote_session: VoteSessionFactory, database_close: AsyncMock
+    ):
+        """If the build cannot be confirmed, the close is rolled back and the next vote closes it."""
+        build = Mock(
+            id=1, confirm=AsyncMock(side_effect=[ValueError("Failed to confirm build 1"), None]), deny=AsyncMock()
+        )
+        session = await create_vote_session(build=build, pass_threshold=2)
+        await session.set_vote(1, 1)
+
+        with pytest.raises(ValueError, match="Failed to confirm"):
+            await session.set_vote(2, 1)
+
+        assert not session.is_closed
+        assert await bot.vote_sessions.get(10) is session
+
+        await session.set_vote(3, 1)
+
+        assert session.is_closed
+        assert build.confirm.await_count == 2
+        assert database_close.await_count == 2